@@ -0,0 +1,77 @@
+r"""
+Runs the benchmark suite, e.g.
+
+    python -m benchmarks --output results.json --plots plots/
+    python -m benchmarks -k "solver_*" --compare baseline.json
+
+writing the timings, run metadata and fitted scaling exponents to a JSON
+report, and optionally log-log scaling plots (requires matplotlib). With
+--compare, exits with status 1 if any case is slower than in the baseline
+report by more than the threshold factor.
+"""
+
+import argparse
+import json
+import sys
+
+from . import harness
+from . import (  # noqa: F401, registers the benchmarks
+    bench_solver,
+    bench_coulomb,
+    bench_workspace,
+    bench_ensemble,
+    bench_quasielastic,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument(
+        "-k", "--filter", default="*", help="glob pattern of benchmark names"
+    )
+    parser.add_argument("-o", "--output", default="benchmarks.json")
+    parser.add_argument("--plots", help="directory for scaling plots")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--min-time", type=float, default=0.05, help="minimum time per repeat [s]"
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="only the two smallest of each parameter"
+    )
+    parser.add_argument("--list", action="store_true", help="list the benchmarks")
+    parser.add_argument("--compare", help="baseline JSON report")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, bench in harness.registry.items():
+            print(name, bench.params)
+        return 0
+
+    results = harness.run(args.filter, args.quick, args.repeat, args.min_time)
+    report = harness.save(args.output, results)
+    for fit in report["scaling"]:
+        if fit["exponent"] is not None:
+            print(
+                f"{fit['name']} {fit['fixed']}: "
+                f"time ~ {fit['param']}^{fit['exponent']:.2f}"
+            )
+    if args.plots is not None:
+        try:
+            harness.plot_scaling(report["scaling"], args.plots)
+        except ImportError:
+            print("matplotlib is not available, skipping the scaling plots")
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = harness.compare(baseline, results, args.threshold)
+        for name, params, t0, t in regressions:
+            print(f"REGRESSION {name} {params}: {t0 * 1e3:.4g} -> {t * 1e3:.4g} ms")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
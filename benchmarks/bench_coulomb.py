@@ -0,0 +1,39 @@
+import numpy as np
+
+from jitr.utils.free_solutions import (
+    H_plus,
+    H_minus,
+    H_plus_prime,
+    H_minus_prime,
+    coulomb_hankel_sequence,
+)
+
+from .harness import benchmark
+
+# p + Ca48 at 14 MeV, at a channel radius of 8 pi
+s, eta = 8 * np.pi, 1.2
+
+
+@benchmark("coulomb_per_l", scaling="lmax", lmax=[5, 10, 20, 40])
+def coulomb_per_l(lmax):
+    r"""H+, H- and their derivatives for each l from mpmath, as in
+    `ProjectileTargetSystem.get_partial_wave_channels`"""
+
+    def run():
+        for l in range(lmax + 1):
+            H_plus(s, l, eta)
+            H_minus(s, l, eta)
+            H_plus_prime(s, l, eta)
+            H_minus_prime(s, l, eta)
+
+    return run
+
+
+@benchmark("coulomb_sequence", scaling="lmax", lmax=[5, 10, 20, 40])
+def coulomb_sequence(lmax):
+    r"""H+, H- and their derivatives for all l by recurrence"""
+
+    def run():
+        coulomb_hankel_sequence(s, lmax, eta)
+
+    return run
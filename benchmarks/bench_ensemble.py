@@ -0,0 +1,40 @@
+import numpy as np
+
+from jitr import rmatrix, ensemble
+from jitr.batch.omp import GlobalOMP
+from jitr.xs.elastic import DifferentialWorkspace
+
+from .harness import benchmark
+from .systems import Ca48, projectiles, system, system_kinematics
+
+angles = np.linspace(0.01, np.pi, 180)
+
+
+@benchmark(
+    "kduq_propagate",
+    scaling="nsamples",
+    nsamples=[8, 32, 128, 416],
+    projectile=["n", "p"],
+)
+def kduq_propagate(nsamples, projectile):
+    r"""streams KDUQ samples through `ensemble.propagate`, including the
+    evaluation of the global parameters for each sample"""
+    projectile = projectiles[projectile]
+    sys = system(projectile, Ca48, 30)
+    kin = system_kinematics(sys, 14.1)
+    ws = DifferentialWorkspace.build_from_system(
+        projectile, Ca48, sys, kin, rmatrix.Solver(40), angles
+    )
+    omp = GlobalOMP("KDUQ", nsamples)
+    interaction_scalar, interaction_spin_orbit = omp.interactions(projectile)
+
+    def run():
+        samples = (
+            omp.params(projectile, i, *Ca48, kin.mu, 14.1, kin.k)
+            for i in range(nsamples)
+        )
+        ensemble.propagate(
+            ws, interaction_scalar, interaction_spin_orbit, samples, seed=0
+        )
+
+    return run
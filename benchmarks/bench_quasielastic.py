@@ -0,0 +1,59 @@
+import numpy as np
+
+from jitr import rmatrix
+from jitr.reactions import KDGlobal, KD_scalar, KD_spin_orbit, coulomb_charged_sphere
+from jitr.utils import kinematics
+from jitr.xs import quasielastic_pn
+
+from .harness import benchmark
+from .systems import Ca48, Sc48, neutron, proton
+
+
+@benchmark("quasielastic_pn_tmatrix", scaling="lmax", lmax=[10, 20, 40])
+def quasielastic_pn_tmatrix(lmax):
+    r"""`quasielastic_pn.Workspace.tmatrix` for Ca48(p,n) to the IAS at 35
+    MeV, without early termination"""
+    Elab, Ex_IAS = 35.0, 6.67
+    kinp, kinn, Elab_n, _, _ = quasielastic_pn.kinematics(Ca48, Sc48, Elab, Ex_IAS)
+    sys = quasielastic_pn.System(
+        channel_radius_fm=16.0,
+        lmax=lmax,
+        target=Ca48,
+        analog=Sc48,
+        mass_target=kinematics.mass(*Ca48),
+        mass_analog=kinematics.mass(*Sc48),
+        kp=kinp.k,
+        kn=kinn.k,
+    )
+    ws = quasielastic_pn.Workspace(
+        sys,
+        kinp,
+        kinn,
+        Elab,
+        Elab_n,
+        rmatrix.Solver(30),
+        angles=np.linspace(0, np.pi, 180),
+        tmatrix_abs_tol=0,
+    )
+    coulomb_p, scalar_p, spin_orbit_p = KDGlobal(proton).get_params(
+        *Ca48, kinp.mu, Elab, kinp.k
+    )
+    _, scalar_n, spin_orbit_n = KDGlobal(neutron).get_params(
+        *Sc48, kinn.mu, Elab_n, kinn.k
+    )
+
+    def run():
+        ws.tmatrix(
+            coulomb_charged_sphere,
+            KD_scalar,
+            KD_spin_orbit,
+            KD_scalar,
+            KD_spin_orbit,
+            args_p_coulomb=coulomb_p,
+            args_p_scalar=scalar_p,
+            args_p_spin_orbit=spin_orbit_p,
+            args_n_scalar=scalar_n,
+            args_n_spin_orbit=spin_orbit_n,
+        )
+
+    return run
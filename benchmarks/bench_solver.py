@@ -0,0 +1,199 @@
+import numpy as np
+
+from jitr import rmatrix
+from jitr.rmatrix.core import solve_smatrix_with_inverse
+from jitr.reactions import ProjectileTargetSystem
+from jitr.reactions.potentials import (
+    woods_saxon_potential,
+    surface_peaked_gaussian_potential,
+)
+from jitr.utils import kinematics
+from jitr.utils.numerov import NumerovIntegrator
+
+from .harness import benchmark
+from .systems import Ca48, neutron, system, system_kinematics
+
+
+def coupled_interaction(r, V, W, R0, a0, coupling_matrix):
+    r"""a Woods-Saxon in each channel with surface peaked couplings"""
+    nch = coupling_matrix.shape[0]
+    diagonal = np.eye(nch)[..., np.newaxis] * woods_saxon_potential(r, V, W, R0, a0)
+    off_diagonal = coupling_matrix[..., np.newaxis] * surface_peaked_gaussian_potential(
+        r, V, W, R0, a0
+    )
+    return -diagonal - off_diagonal
+
+
+def coupled_system(nch: np.int32, nbasis: np.int32, Elab: np.float64 = 14.1):
+    rng = np.random.default_rng(nch)
+    coupling_matrix = np.triu(rng.uniform(0, 0.2, (nch, nch)), 1)
+    coupling_matrix += coupling_matrix.T
+    sys = ProjectileTargetSystem(
+        channel_radius=6 * np.pi,
+        lmax=0,
+        mass_target=kinematics.mass(*Ca48),
+        mass_projectile=kinematics.mass(*neutron),
+        coupling=lambda l: coupling_matrix,
+    )
+    kin = system_kinematics(sys, Elab)
+    channels, asymptotics = sys.get_partial_wave_channels(*kin)
+    args = (42.0, 10.0, 4.5, 0.6, coupling_matrix)
+    return rmatrix.Solver(nbasis), channels[0], asymptotics[0], args
+
+
+@benchmark("solver_solve_nbasis", scaling="nbasis", nbasis=[20, 40, 80, 160, 320])
+def solver_solve_nbasis(nbasis):
+    r"""a single channel solve, with the free matrix and boundary values
+    precomputed as in the workspaces"""
+    sys = system(neutron, Ca48, lmax=0)
+    kin = system_kinematics(sys, 14.1)
+    channels, asymptotics = sys.get_partial_wave_channels(*kin)
+    channels, asymptotics = channels[0].decouple()[0], asymptotics[0].decouple()[0]
+    solver = rmatrix.Solver(nbasis)
+    free_matrix = solver.free_matrix(channels.a, channels.l, coupled=True)
+    basis_boundary = solver.precompute_boundaries(channels.a)
+    workspace = solver.workspace(1)
+    args = (42.0, 10.0, 4.5, 0.6)
+
+    def run():
+        solver.solve(
+            channels,
+            asymptotics,
+            woods_saxon_potential,
+            args,
+            free_matrix=free_matrix,
+            basis_boundary=basis_boundary,
+            workspace=workspace,
+        )
+
+    return run
+
+
+@benchmark("solver_solve_nch", scaling="nch", nch=[1, 2, 4, 8, 16], nbasis=[40])
+def solver_solve_nch(nch, nbasis):
+    r"""a coupled channel solve, including the interaction matrix"""
+    solver, channels, asymptotics, args = coupled_system(nch, nbasis)
+    free_matrix = solver.free_matrix(channels.a, channels.l, coupled=True)
+    basis_boundary = solver.precompute_boundaries(channels.a)
+    workspace = solver.workspace(nch)
+
+    def run():
+        solver.solve(
+            channels,
+            asymptotics,
+            coupled_interaction,
+            args,
+            free_matrix=free_matrix,
+            basis_boundary=basis_boundary,
+            workspace=workspace,
+        )
+
+    return run
+
+
+@benchmark(
+    "solve_smatrix_with_inverse",
+    scaling="nch",
+    nch=[1, 2, 4, 8],
+    nbasis=[40],
+)
+def smatrix_with_inverse(nch, nbasis):
+    r"""the dense inverse based kernel on the assembled Bloch-Schrödinger
+    matrix"""
+    solver, channels, asymptotics, args = coupled_system(nch, nbasis)
+    A = (
+        solver.free_matrix(channels.a, channels.l, coupled=True)
+        + solver.interaction_matrix(
+            channels.k[0],
+            channels.E[0],
+            channels.a,
+            nch,
+            coupled_interaction,
+            args,
+        )
+    ).todense()
+    b = solver.precompute_boundaries(channels.a)
+    weights = np.zeros(nch, dtype=np.complex128)
+    weights[0] = 1
+
+    def run():
+        solve_smatrix_with_inverse(
+            A,
+            b,
+            asymptotics.Hp,
+            asymptotics.Hm,
+            asymptotics.Hpp,
+            asymptotics.Hmp,
+            weights,
+            channels.a,
+            nch,
+            nbasis,
+        )
+
+    return run
+
+
+@benchmark(
+    "propagation_nsectors",
+    scaling="nsectors",
+    nsectors=[2, 4, 8, 16, 32],
+    nbasis=[15],
+)
+def propagation_nsectors(nsectors, nbasis):
+    r"""a single channel solve by R-matrix propagation, with the channel
+    radius growing with the number of sectors at a fixed sector width"""
+    sys = system(neutron, Ca48, lmax=0, channel_radius=2 * np.pi * nsectors)
+    kin = system_kinematics(sys, 14.1)
+    channels, asymptotics = sys.get_partial_wave_channels(*kin)
+    channels, asymptotics = channels[0].decouple()[0], asymptotics[0].decouple()[0]
+    solver = rmatrix.PropagationSolver(nbasis, nsectors)
+    args = (42.0, 10.0, 4.5, 0.6)
+
+    def run():
+        solver.solve(channels, asymptotics, woods_saxon_potential, args)
+
+    return run
+
+
+@benchmark("numerov_samples", scaling="nsamples", nsamples=[1, 4, 16, 64])
+def numerov_samples(nsamples):
+    r"""the compiled Numerov reference integrator over all partial waves up
+    to lmax = 20 for a batch of interaction samples"""
+    sys = system(neutron, Ca48, lmax=20)
+    kin = system_kinematics(sys, 14.1)
+    integrator = NumerovIntegrator(sys.channel_radius, 2000)
+    args = [(42.0 + 0.1 * i, 10.0, 4.5, 0.6) for i in range(nsamples)]
+
+    def run():
+        integrator.rmatrix(kin.k, kin.Ecm, sys.l, woods_saxon_potential, args)
+
+    return run
+
+
+@benchmark("dwba_local_batch", scaling="npairs", npairs=[10, 100, 1000], nbasis=[40])
+def dwba_local_batch(npairs, nbasis):
+    r"""local DWBA matrix elements for npairs (bra, ket, multipole)
+    combinations drawn from 20 bras, 20 kets and 4 form factors"""
+    rng = np.random.default_rng(npairs)
+    kernel = rmatrix.Solver(nbasis).kernel
+    bras = rng.normal(size=(20, nbasis)) + 1j * rng.normal(size=(20, nbasis))
+    kets = rng.normal(size=(20, nbasis)) + 1j * rng.normal(size=(20, nbasis))
+    form_factors = np.array(
+        [
+            kernel.matrix_local(surface_peaked_gaussian_potential, 6 * np.pi, args)
+            for args in [(42.0 + lam, 10.0, 4.5, 0.6) for lam in range(4)]
+        ]
+    )
+    pairs = np.stack(
+        [
+            rng.integers(0, 20, npairs),
+            rng.integers(0, 20, npairs),
+            rng.integers(0, 4, npairs),
+        ],
+        axis=1,
+    )
+
+    def run():
+        kernel.dwba_local_batch(bras, kets, form_factors, pairs)
+
+    return run
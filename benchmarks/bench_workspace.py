@@ -0,0 +1,88 @@
+import numpy as np
+
+from jitr import rmatrix
+from jitr.reactions import KD_scalar, KD_spin_orbit
+from jitr.batch.omp import KD_scalar_coulomb
+from jitr.xs.elastic import IntegralWorkspace, DifferentialWorkspace
+
+from .harness import benchmark
+from .systems import Ca48, projectiles, system, system_kinematics, kd_params
+
+angles = np.linspace(0.01, np.pi, 180)
+
+
+@benchmark(
+    "partial_wave_channels",
+    scaling="lmax",
+    lmax=[10, 20, 40],
+    projectile=["n", "p"],
+)
+def partial_wave_channels(lmax, projectile):
+    sys = system(projectiles[projectile], Ca48, lmax)
+    kin = system_kinematics(sys, 14.1)
+
+    def run():
+        sys.get_partial_wave_channels(*kin)
+
+    return run
+
+
+@benchmark(
+    "workspace_construction",
+    scaling="lmax",
+    lmax=[10, 20, 40],
+    projectile=["n", "p"],
+    nbasis=[40],
+)
+def workspace_construction(lmax, projectile, nbasis):
+    r"""a DifferentialWorkspace from scratch, including the Coulomb
+    functions for charged projectiles"""
+    projectile = projectiles[projectile]
+    sys = system(projectile, Ca48, lmax)
+    kin = system_kinematics(sys, 14.1)
+    solver = rmatrix.Solver(nbasis)
+
+    def run():
+        DifferentialWorkspace.build_from_system(
+            projectile, Ca48, sys, kin, solver, angles
+        )
+
+    return run
+
+
+@benchmark(
+    "differential_xs",
+    scaling="nbasis",
+    nbasis=[20, 40, 80],
+    projectile=["n", "p"],
+)
+def differential_xs(nbasis, projectile):
+    r"""`DifferentialWorkspace.xs` with the Koning-Delaroche potential"""
+    projectile = projectiles[projectile]
+    sys = system(projectile, Ca48, 30)
+    kin = system_kinematics(sys, 14.1)
+    ws = DifferentialWorkspace.build_from_system(
+        projectile, Ca48, sys, kin, rmatrix.Solver(nbasis), angles
+    )
+    scalar, spin_orbit = kd_params(projectile, Ca48, kin, 14.1)
+    interaction = KD_scalar_coulomb if projectile[1] > 0 else KD_scalar
+
+    def run():
+        ws.xs(interaction, KD_spin_orbit, scalar, spin_orbit)
+
+    return run
+
+
+@benchmark("integral_xs", scaling="nbasis", nbasis=[20, 40, 80], projectile=["n"])
+def integral_xs(nbasis, projectile):
+    r"""`IntegralWorkspace.xs` with the Koning-Delaroche potential"""
+    projectile = projectiles[projectile]
+    sys = system(projectile, Ca48, 30)
+    kin = system_kinematics(sys, 14.1)
+    ws = IntegralWorkspace(projectile, Ca48, sys, kin, rmatrix.Solver(nbasis))
+    scalar, spin_orbit = kd_params(projectile, Ca48, kin, 14.1)
+
+    def run():
+        ws.xs(KD_scalar, KD_spin_orbit, scalar, spin_orbit)
+
+    return run
@@ -0,0 +1,248 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+
+registry = {}
+
+
+class Benchmark:
+    r"""
+    A parametrized benchmark. `setup(**params)` does the untimed preparation
+    for one case and returns a callable, which is the timed work.
+    """
+
+    def __init__(self, name: str, setup, params: dict, scaling: str = None):
+        self.name = name
+        self.setup = setup
+        self.params = params
+        self.scaling = scaling
+
+    def cases(self, quick: bool = False):
+        names = list(self.params.keys())
+        values = [self.params[n] for n in names]
+        if quick:
+            values = [v[:2] for v in values]
+        return [dict(zip(names, p)) for p in product(*values)]
+
+
+def benchmark(name: str, scaling: str = None, **params):
+    r"""
+    registers a benchmark over the product of the values of each keyword
+    argument; `scaling` names the parameter against which the time is
+    plotted and fit with a power law
+    """
+
+    def register(setup):
+        registry[name] = Benchmark(name, setup, params, scaling)
+        return setup
+
+    return register
+
+
+def measure(
+    fn,
+    repeat: np.int32 = 5,
+    min_time: np.float64 = 0.05,
+    max_number: np.int32 = 10000,
+):
+    r"""
+    Times fn, after one untimed call to trigger any JIT compilation and fill
+    caches. The number of calls per repeat is calibrated so that each repeat
+    takes at least min_time.
+
+    @returns:
+        the time per call [s] of each repeat, and the number of calls per
+        repeat
+    """
+    fn()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= max_number:
+            break
+        number = min(
+            max_number, max(2 * number, int(1.2 * number * min_time / elapsed))
+        )
+    times = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return np.array(times), number
+
+
+def run(
+    pattern: str = "*",
+    quick: bool = False,
+    repeat: np.int32 = 5,
+    min_time: np.float64 = 0.05,
+    log=print,
+):
+    r"""
+    runs all registered benchmarks with names matching the glob pattern
+
+    @returns:
+        a list of dicts with the name, params and timings of each case
+    """
+    results = []
+    for name, bench in registry.items():
+        if not fnmatch(name, pattern):
+            continue
+        for params in bench.cases(quick):
+            fn = bench.setup(**params)
+            times, number = measure(fn, repeat, min_time)
+            result = {
+                "name": name,
+                "params": params,
+                "number": number,
+                "times": times.tolist(),
+                "min": float(np.min(times)),
+                "median": float(np.median(times)),
+                "mean": float(np.mean(times)),
+                "std": float(np.std(times)),
+            }
+            results.append(result)
+            if log is not None:
+                log(f"{name} {params}: {result['median'] * 1e3:.4g} ms")
+    return results
+
+
+def scaling(results: list):
+    r"""
+    fits the median time of each scaling benchmark to a power law in its
+    scaling parameter, separately for each value of the other parameters
+
+    @returns:
+        a list of dicts with the benchmark name, scaling parameter, fixed
+        parameters and fitted exponent
+    """
+    fits = []
+    for name, bench in registry.items():
+        if bench.scaling is None:
+            continue
+        series = {}
+        for r in results:
+            if r["name"] != name:
+                continue
+            fixed = tuple((k, v) for k, v in r["params"].items() if k != bench.scaling)
+            series.setdefault(fixed, []).append(
+                (r["params"][bench.scaling], r["median"])
+            )
+        for fixed, points in series.items():
+            x, t = np.array(sorted(points)).T
+            exponent = (
+                float(np.polyfit(np.log(x), np.log(t), 1)[0]) if x.size > 1 else None
+            )
+            fits.append(
+                {
+                    "name": name,
+                    "param": bench.scaling,
+                    "fixed": dict(fixed),
+                    "x": x.tolist(),
+                    "median": t.tolist(),
+                    "exponent": exponent,
+                }
+            )
+    return fits
+
+
+def metadata():
+    import numba
+    import scipy
+    import jitr
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "jitr": getattr(jitr, "__version__", ""),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "numba": numba.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def save(filename, results: list):
+    report = {
+        "metadata": metadata(),
+        "results": results,
+        "scaling": scaling(results),
+    }
+    with open(filename, "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def compare(baseline: dict, results: list, threshold: np.float64 = 1.2):
+    r"""
+    @returns the cases whose median time is more than threshold times that in
+    the baseline report, as (name, params, baseline median, median)
+    """
+    reference = {
+        (r["name"], json.dumps(r["params"], sort_keys=True)): r["median"]
+        for r in baseline["results"]
+    }
+    regressions = []
+    for r in results:
+        t0 = reference.get((r["name"], json.dumps(r["params"], sort_keys=True)))
+        if t0 is not None and r["median"] > threshold * t0:
+            regressions.append((r["name"], r["params"], t0, r["median"]))
+    return regressions
+
+
+def plot_scaling(fits: list, output_dir):
+    r"""
+    writes a log-log plot of time against the scaling parameter for each
+    scaling benchmark to output_dir/{name}.png
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from matplotlib import pyplot as plt
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name in sorted({f["name"] for f in fits}):
+        fig, ax = plt.subplots()
+        for f in fits:
+            if f["name"] != name:
+                continue
+            label = ", ".join(f"{k}={v}" for k, v in f["fixed"].items())
+            if f["exponent"] is not None:
+                label += rf" ($\propto$ {f['param']}$^{{{f['exponent']:.2f}}}$)"
+            ax.plot(f["x"], f["median"], "o-", label=label)
+            param = f["param"]
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel(param)
+        ax.set_ylabel("time per call [s]")
+        ax.set_title(name)
+        ax.legend(fontsize="small")
+        fig.tight_layout()
+        fig.savefig(output_dir / f"{name}.png", dpi=150)
+        plt.close(fig)
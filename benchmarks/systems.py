@@ -0,0 +1,56 @@
+import numpy as np
+
+from jitr.reactions import (
+    ProjectileTargetSystem,
+    spin_half_orbit_coupling,
+    KDGlobal,
+)
+from jitr.utils import kinematics
+
+Ca48 = (48, 20)
+Sc48 = (48, 21)
+Pb208 = (208, 82)
+neutron = (1, 0)
+proton = (1, 1)
+
+projectiles = {"n": neutron, "p": proton}
+
+
+def system(
+    projectile: tuple,
+    target: tuple,
+    lmax: np.int32,
+    channel_radius: np.float64 = 8 * np.pi,
+):
+    r"""
+    @returns the spin-orbit coupled ProjectileTargetSystem for projectile
+    and target
+    """
+    return ProjectileTargetSystem(
+        channel_radius=channel_radius,
+        lmax=lmax,
+        mass_target=kinematics.mass(*target),
+        mass_projectile=kinematics.mass(*projectile),
+        Ztarget=target[1],
+        Zproj=projectile[1],
+        coupling=spin_half_orbit_coupling,
+    )
+
+
+def system_kinematics(sys: ProjectileTargetSystem, Elab: np.float64):
+    return kinematics.classical_kinematics(
+        sys.mass_target, sys.mass_projectile, Elab, Zz=sys.Zproj * sys.Ztarget
+    )
+
+
+def kd_params(projectile: tuple, target: tuple, kin, Elab: np.float64):
+    r"""
+    @returns the Koning-Delaroche (scalar, spin-orbit) args, with the Coulomb
+    args appended to the scalar ones for charged projectiles
+    """
+    coulomb, scalar, spin_orbit = KDGlobal(projectile).get_params(
+        *target, kin.mu, Elab, kin.k
+    )
+    if projectile[1] > 0:
+        scalar = tuple(scalar) + tuple(coulomb)
+    return tuple(scalar), tuple(spin_orbit)
@@ -10,6 +10,7 @@ from jitr.reactions.potentials import (
     coulomb_charged_sphere,
 )
 from jitr.utils import delta, smatrix, schrodinger_eqn_ivp_order1, kinematics
+from jitr.utils.numerov import NumerovIntegrator
 
 # target (A,Z)
 Ca48 = (48, 20)
@@ -229,6 +230,9 @@ def rmse_RK_LM():
 
     params = (V0, W0, R0, a0, proton[1] * Ca48[1], RC)
 
+    # compiled Numerov reference integrator on the same channel radius
+    integrator = NumerovIntegrator(sys.channel_radius)
+
     # use same interaction for all channels (no spin-orbit coupling)
     error_matrix = np.zeros((n_partial_waves, len(egrid)))
 
@@ -252,6 +256,18 @@ def rmse_RK_LM():
             local_args=params,
         )
 
+        # Numerov solve for all partial waves at once
+        R_rk = integrator.rmatrix(
+            channels[0].k[0], channels[0].E[0], sys.l, interaction, [params]
+        )[0]
+        S_rk = integrator.smatrix(
+            R_rk,
+            *[
+                np.array([getattr(asymptotics[l], H)[0] for l in sys.l])
+                for H in ["Hp", "Hm", "Hpp", "Hmp"]
+            ],
+        )
+
         for l in sys.l:
             # Lagrange-Legendre R-Matrix solve for this partial wave
             R_lm, S_lm, uext_boundary = solver.solve(
@@ -262,25 +278,9 @@ def rmse_RK_LM():
                 interaction_matrix=im,
             )
 
-            # Runge-Kutta solve for this partial wave
-            rk_solver_info = make_channel_data(channels[l])[0]
-            domain, init_con = rk_solver_info.initial_conditions()
-            sol_rk = solve_ivp(
-                lambda s, y: schrodinger_eqn_ivp_order1(
-                    s, y, rk_solver_info, interaction, params
-                ),
-                domain,
-                init_con,
-                dense_output=True,
-                atol=1.0e-12,
-                rtol=1.0e-9,
-            ).sol
-
-            a = domain[1]
-            R_rk = sol_rk(a)[0] / (a * sol_rk(a)[1])
-            S_rk = smatrix(R_rk, a, l, rk_solver_info.eta)
-
-            error_matrix[l, i] = np.absolute(S_rk - S_lm[0, 0]) / np.absolute(S_rk)
+            error_matrix[l, i] = np.absolute(S_rk[l] - S_lm[0, 0]) / np.absolute(
+                S_rk[l]
+            )
 
     lines = []
     for l in sys.l:
@@ -1,6 +1,14 @@
+from . import profiling
 from . import quadrature
 from . import reactions
 from . import rmatrix
 from . import utils
 from . import xs
+from . import emulate
+from . import ensemble
+from . import parallel
+from . import cache
+from . import batch
+from . import tuning
+from . import bound
 from .__version__ import __version__
@@ -0,0 +1,5 @@
+from .omp import GlobalOMP, KD_scalar_coulomb, WLH_coulomb
+from .spec import JobSpec
+from .driver import BatchDriver, ChunkEvaluator
+from .transmission import transmission_tables
+from . import cli
@@ -0,0 +1,125 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from ..tuning import RecommendationTable, tune_table
+from .driver import BatchDriver
+from .spec import JobSpec
+from .transmission import transmission_tables
+
+
+def parser():
+    p = argparse.ArgumentParser(
+        prog="jitr",
+        description="Checkpointed batch campaigns of elastic cross sections",
+    )
+    commands = p.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="start or resume a job from a JSON spec")
+    run.add_argument("spec", help="path to the JSON job spec")
+    run.add_argument("-o", "--output", required=True, help="output directory")
+    run.add_argument("-j", "--nworkers", type=int, default=None)
+    run.add_argument("-q", "--quiet", action="store_true")
+
+    resume = commands.add_parser("resume", help="resume a job in an output directory")
+    resume.add_argument("output", help="output directory of the job")
+    resume.add_argument("-j", "--nworkers", type=int, default=None)
+    resume.add_argument("-q", "--quiet", action="store_true")
+
+    status = commands.add_parser("status", help="report the progress of a job")
+    status.add_argument("output", help="output directory of the job")
+
+    collect = commands.add_parser(
+        "collect", help="gather the chunks of a job into a single npz file"
+    )
+    collect.add_argument("output", help="output directory of the job")
+    collect.add_argument("-o", "--file", required=True, help="npz file to write")
+    collect.add_argument(
+        "--partial", action="store_true", help="fill missing chunks with NaN"
+    )
+
+    tables = commands.add_parser(
+        "tlj",
+        help="generate Hauser-Feshbach transmission coefficient tables for the "
+        "projectiles, targets and energies of a JSON spec",
+    )
+    tables.add_argument("spec", help="path to the JSON job spec")
+    tables.add_argument("-o", "--file", required=True, help="table file to write")
+    tables.add_argument("-j", "--nworkers", type=int, default=None)
+    tables.add_argument("--tol", type=float, default=1e-6, help="|1 - S| cutoff")
+
+    tune = commands.add_parser(
+        "tune",
+        help="find the smallest converged basis size and channel radius for the "
+        "projectiles and targets of a JSON spec, in each energy band holding "
+        "one of its energies",
+    )
+    tune.add_argument("spec", help="path to the JSON job spec")
+    tune.add_argument(
+        "-o", "--file", required=True, help="recommendation table to write or update"
+    )
+    tune.add_argument("--rtol", type=float, default=1e-3, help="observable tolerance")
+    tune.add_argument(
+        "--atol", type=float, default=1e-4, help="S-matrix element tolerance"
+    )
+    return p
+
+
+def tune_spec(spec: JobSpec, filename, rtol: float, smatrix_atol: float):
+    r"""
+    tunes the projectiles and targets of a spec over the energy bands that
+    its energies fall in, adding them to the table in filename
+    """
+    if os.path.exists(filename):
+        table = RecommendationTable.load(filename)
+    else:
+        table = RecommendationTable()
+    bands = sorted({table.band(E) for E in spec.energies} - {None})
+    tune_table(
+        spec.projectiles,
+        spec.targets,
+        bands,
+        table,
+        omp=spec.global_omp(),
+        rtol=rtol,
+        smatrix_atol=smatrix_atol,
+    )
+    table.save(filename)
+    return table
+
+
+def main(argv=None):
+    args = parser().parse_args(argv)
+    if args.command == "tune":
+        tune_spec(JobSpec.load(args.spec), args.file, args.rtol, args.atol)
+        return 0
+    if args.command == "tlj":
+        transmission_tables(JobSpec.load(args.spec), args.file, args.nworkers, args.tol)
+        return 0
+    if args.command == "run":
+        driver = BatchDriver(JobSpec.load(args.spec), args.output)
+    else:
+        driver = BatchDriver.resume(args.output)
+
+    if args.command in ("run", "resume"):
+        done, total = driver.status()
+
+        def report(chunk):
+            nonlocal done
+            done += 1
+            if not args.quiet:
+                print(f"chunk {chunk} done ({done}/{total})", flush=True)
+
+        driver.run(args.nworkers, report)
+    elif args.command == "status":
+        done, total = driver.status()
+        print(f"{done}/{total} chunks complete")
+    elif args.command == "collect":
+        np.savez(args.file, **driver.collect(partial=args.partial))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+import multiprocessing
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from ..ensemble import evaluate_batch
+from ..reactions import ProjectileTargetSystem, spin_half_orbit_coupling
+from ..rmatrix import Solver
+from ..utils import kinematics
+from ..xs.elastic import IntegralWorkspace, DifferentialWorkspace
+from .spec import JobSpec
+
+
+class ChunkEvaluator:
+    r"""
+    Evaluates chunks of a `JobSpec` and writes each to its own npz file,
+    keeping the workspaces of the most recently used cases, so that
+    consecutive chunks of the same case don't rebuild them
+    """
+
+    def __init__(self, spec: JobSpec, output_dir, max_workspaces: np.int32 = 4):
+        self.spec = spec
+        self.output_dir = Path(output_dir)
+        self.omp = spec.global_omp()
+        self.solvers = {spec.nbasis: Solver(spec.nbasis)}
+        self.recommendations = spec.recommendations()
+        self.max_workspaces = max_workspaces
+        self.workspaces = OrderedDict()
+        self.differential = any(obs in ("dsdo", "Ay") for obs in spec.observables)
+
+    def workspace(self, case: np.int32):
+        ws = self.workspaces.get(case)
+        if ws is not None:
+            self.workspaces.move_to_end(case)
+            return ws
+        projectile, target, Elab = self.spec.cases[case]
+        mass_target = kinematics.mass(*target)
+        mass_projectile = kinematics.mass(*projectile)
+        kin = kinematics.classical_kinematics(
+            mass_target, mass_projectile, Elab, Zz=projectile[1] * target[1]
+        )
+        nbasis, channel_radius = self.spec.nbasis, self.spec.channel_radius
+        lmax = self.spec.lmax
+        if self.recommendations is not None:
+            rec = self.recommendations.lookup(projectile, target, Elab)
+            if rec is not None:
+                nbasis, channel_radius = rec.nbasis, rec.channel_radius(kin.k)
+                # the recommendation was only validated with at least its lmax
+                lmax = max(rec.lmax, lmax)
+        if nbasis not in self.solvers:
+            self.solvers[nbasis] = Solver(nbasis)
+        solver = self.solvers[nbasis]
+
+        sys = ProjectileTargetSystem(
+            channel_radius=channel_radius,
+            lmax=lmax,
+            mass_target=mass_target,
+            mass_projectile=mass_projectile,
+            Ztarget=target[1],
+            Zproj=projectile[1],
+            coupling=spin_half_orbit_coupling,
+        )
+        if self.differential:
+            ws = DifferentialWorkspace.build_from_system(
+                projectile, target, sys, kin, solver, self.spec.angles_rad
+            )
+        else:
+            ws = IntegralWorkspace(projectile, target, sys, kin, solver)
+        self.workspaces[case] = ws
+        if len(self.workspaces) > self.max_workspaces:
+            self.workspaces.popitem(last=False)
+        return ws
+
+    def evaluate(self, chunk: tuple):
+        r"""
+        @returns a dict of the requested observables over the samples of
+        the chunk, each with a leading sample axis
+        """
+        case, start, stop = chunk
+        projectile, target, Elab = self.spec.cases[case]
+        ws = self.workspace(case)
+        interaction_scalar, interaction_spin_orbit = self.omp.interactions(projectile)
+        batch = [
+            self.omp.params(projectile, i, *target, ws.mu, Elab, ws.k)
+            for i in range(start, stop)
+        ]
+        values = dict(
+            zip(
+                ("dsdo", "Ay", "t", "rxn"),
+                evaluate_batch(ws, interaction_scalar, interaction_spin_orbit, batch),
+            )
+        )
+        return {obs: values[obs] for obs in self.spec.observables}
+
+    def __call__(self, chunk: tuple):
+        path = chunk_path(self.output_dir, chunk)
+        values = self.evaluate(chunk)
+        values["samples"] = np.arange(chunk[1], chunk[2])
+        # write-then-rename, so a chunk file is either complete or absent
+        tmp = path.with_name(f".{path.stem}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **values)
+        os.replace(tmp, path)
+        return chunk
+
+
+def chunk_path(output_dir: Path, chunk: tuple):
+    case, start, stop = chunk
+    return Path(output_dir) / "chunks" / f"case{case:05d}_{start:07d}-{stop:07d}.npz"
+
+
+evaluator = None
+
+
+def initialize_worker(spec: dict, output_dir: str):
+    global evaluator
+    evaluator = ChunkEvaluator(JobSpec(**spec), output_dir)
+
+
+def run_chunk(chunk: tuple):
+    return evaluator(chunk)
+
+
+class BatchDriver:
+    r"""
+    Checkpointed, resumable driver for a campaign described by a `JobSpec`.
+    The work is split into chunks of OMP samples for each (projectile,
+    target, energy) case, which are scheduled across a process pool. Each
+    completed chunk is written atomically to its own npz file under
+    `output_dir/chunks`, which serves as its checkpoint: the store is
+    append-only, and a job that is killed and rerun on the same output
+    directory only computes the chunks that are missing. The spec is saved
+    alongside the chunks, and a rerun with a different spec is refused.
+    """
+
+    def __init__(self, spec: JobSpec, output_dir):
+        r"""
+        @parameters:
+            spec (JobSpec) : the campaign
+            output_dir : directory for the results, created if needed
+        """
+        self.spec = spec
+        self.output_dir = Path(output_dir)
+        spec_path = self.output_dir / "spec.json"
+        if spec_path.exists():
+            if JobSpec.load(spec_path).to_dict() != spec.to_dict():
+                raise ValueError(
+                    f"{self.output_dir} holds the results of a different job spec"
+                )
+        else:
+            (self.output_dir / "chunks").mkdir(parents=True, exist_ok=True)
+            spec.save(spec_path)
+        self.omp = spec.global_omp()
+        self.chunks = spec.chunks(self.omp.nsamples)
+
+    @classmethod
+    def resume(cls, output_dir):
+        r"""
+        @returns the driver for the job previously started in output_dir
+        """
+        return cls(JobSpec.load(Path(output_dir) / "spec.json"), output_dir)
+
+    def pending(self):
+        r"""
+        @returns the chunks that have not been completed
+        """
+        return [c for c in self.chunks if not chunk_path(self.output_dir, c).exists()]
+
+    def status(self):
+        r"""
+        @returns the number of completed and total chunks
+        """
+        return len(self.chunks) - len(self.pending()), len(self.chunks)
+
+    def run(self, nworkers: np.int32 = None, callback=None):
+        r"""
+        computes all pending chunks
+
+        @parameters:
+            nworkers (int) : number of worker processes; defaults to the
+                number of CPUs, and 1 runs in this process
+            callback (callable) : called with each chunk (case, first
+                sample, last sample) once it is written, e.g. for progress
+                reporting
+        @returns:
+            the number of chunks computed
+        """
+        for tmp in (self.output_dir / "chunks").glob(".*.tmp"):
+            tmp.unlink()
+        pending = self.pending()
+        nworkers = nworkers if nworkers is not None else os.cpu_count()
+        if nworkers == 1 or len(pending) <= 1:
+            evaluate = ChunkEvaluator(self.spec, self.output_dir)
+            done = map(evaluate, pending)
+            pool = None
+        else:
+            pool = multiprocessing.get_context().Pool(
+                nworkers,
+                initializer=initialize_worker,
+                initargs=(self.spec.to_dict(), str(self.output_dir)),
+            )
+            done = pool.imap_unordered(run_chunk, pending)
+        try:
+            for chunk in done:
+                if callback is not None:
+                    callback(chunk)
+        except BaseException:
+            # completed chunks are already on disk, for the next run
+            if pool is not None:
+                pool.terminate()
+            raise
+        if pool is not None:
+            pool.close()
+            pool.join()
+        return len(pending)
+
+    def collect(self, partial: bool = False):
+        r"""
+        gathers the chunks into one array per observable
+
+        @parameters:
+            partial (bool) : if True, samples in missing chunks are filled
+                with NaN; otherwise missing chunks raise a RuntimeError
+        @returns:
+            a dict with the array of cases (projectile A, Z, target A, Z,
+            Elab), the angles, and each observable, with shape (ncases,
+            nsamples, ...)
+        """
+        pending = self.pending()
+        if pending and not partial:
+            raise RuntimeError(
+                f"{len(pending)} of {len(self.chunks)} chunks are not complete"
+            )
+        ncases, nsamples = len(self.spec.cases), self.omp.nsamples
+        out = {
+            "cases": np.array([p + t + (E,) for p, t, E in self.spec.cases]),
+            "angles": self.spec.angles_rad,
+            "samples": np.array(
+                [-1 if s is None else s for s in self.omp.samples], dtype=np.int64
+            ),
+        }
+        for chunk in self.chunks:
+            path = chunk_path(self.output_dir, chunk)
+            if not path.exists():
+                continue
+            case, start, stop = chunk
+            with np.load(path) as data:
+                for obs in self.spec.observables:
+                    values = data[obs]
+                    if obs not in out:
+                        out[obs] = np.full(
+                            (ncases, nsamples) + values.shape[1:], np.nan
+                        )
+                    out[obs][case, start:stop] = values
+        return out
@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import numpy as np
+
+from ..reactions.kduq import KDGlobal, KD_scalar, KD_spin_orbit
+from ..reactions.wlh import WLHGlobal, WLH, WLH_so
+from ..reactions.potentials import coulomb_charged_sphere
+
+DATA_DIR = Path(__file__).parent.resolve() / Path("./../../data")
+
+
+def KD_scalar_coulomb(r, *args):
+    r"""Koning-Delaroche scalar interaction plus a charged sphere Coulomb
+    interaction, with the Coulomb (zz, r_c) args last"""
+    return KD_scalar(r, *args[:-2]) + coulomb_charged_sphere(r, *args[-2:])
+
+
+def WLH_coulomb(r, *args):
+    r"""WLH scalar interaction plus a charged sphere Coulomb interaction,
+    with the Coulomb (zz, r_c) args last"""
+    return WLH(r, *args[:-2]) + coulomb_charged_sphere(r, *args[-2:])
+
+
+class GlobalOMP:
+    r"""
+    A global optical potential with one or more parameter samples, by name:
+        "KD" : Koning-Delaroche, with the default parameters
+        "WLH" : Whitehead-Lim-Holt, with the mean parameters
+        "KDUQ" : samples from the KDUQ posterior ("Federal" or "Democratic")
+    """
+
+    models = {
+        "KD": (KDGlobal, KD_scalar, KD_scalar_coulomb, KD_spin_orbit),
+        "KDUQ": (KDGlobal, KD_scalar, KD_scalar_coulomb, KD_spin_orbit),
+        "WLH": (WLHGlobal, WLH, WLH_coulomb, WLH_so),
+    }
+
+    def __init__(self, model: str, samples=None, posterior: str = "Federal"):
+        r"""
+        @parameters:
+            model (str) : "KD", "WLH" or "KDUQ"
+            samples : for KDUQ, the indices of the posterior samples to use,
+                or their number (the first samples are used), or None for all
+                of them
+            posterior (str) : for KDUQ, "Federal" or "Democratic"
+        """
+        if model not in self.models:
+            raise ValueError(
+                f"Unknown OMP {model}, expected one of {list(self.models)}"
+            )
+        self.model = model
+        self.posterior = posterior
+        if model == "KDUQ":
+            available = sorted(
+                int(p.name) for p in (DATA_DIR / f"KDUQ{posterior}").iterdir()
+            )
+            if samples is None:
+                samples = available
+            elif np.isscalar(samples):
+                samples = available[: int(samples)]
+            self.samples = [int(i) for i in samples]
+        else:
+            self.samples = [None]
+        self.globals = {}
+
+    @property
+    def nsamples(self):
+        return len(self.samples)
+
+    def param_fpath(self, sample):
+        if sample is None:
+            return None
+        return DATA_DIR / f"KDUQ{self.posterior}" / str(sample) / "parameters.json"
+
+    def interactions(self, projectile: tuple):
+        r"""
+        @returns the scalar and spin-orbit interactions for the projectile,
+        the former including the Coulomb interaction for charged projectiles
+        """
+        _, scalar, scalar_coulomb, spin_orbit = self.models[self.model]
+        return (scalar_coulomb if projectile[1] > 0 else scalar), spin_orbit
+
+    def params(self, projectile: tuple, i: np.int32, A, Z, mu, Elab, k):
+        r"""
+        @returns the args of the scalar and spin-orbit interactions (see
+        `interactions`) for the i-th sample
+        """
+        key = (tuple(projectile), i)
+        omp = self.globals.get(key)
+        if omp is None:
+            omp_class = self.models[self.model][0]
+            omp = omp_class(tuple(projectile), self.param_fpath(self.samples[i]))
+            self.globals[key] = omp
+        coulomb, scalar, spin_orbit = omp.get_params(A, Z, mu, Elab, k)
+        if projectile[1] > 0:
+            scalar = tuple(scalar) + tuple(coulomb)
+        return tuple(scalar), tuple(spin_orbit)
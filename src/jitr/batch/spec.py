@@ -0,0 +1,99 @@
+import json
+from dataclasses import dataclass, field, asdict
+from itertools import product
+
+import numpy as np
+
+from ..tuning.table import RecommendationTable
+from .omp import GlobalOMP
+
+OBSERVABLES = ("dsdo", "Ay", "t", "rxn")
+
+
+@dataclass
+class JobSpec:
+    r"""
+    Specification of a batch campaign of elastic observables over the grid of
+    projectiles x targets x lab energies x OMP samples, read from JSON, e.g.
+
+        {
+            "projectiles": [[1, 0], [1, 1]],
+            "targets": [[48, 20], [208, 82]],
+            "energies": [10.0, 20.0, 40.0],
+            "omp": {"model": "KDUQ", "samples": 416, "posterior": "Federal"},
+            "observables": ["dsdo", "Ay", "rxn"],
+            "angles": [1.0, 179.0, 90]
+        }
+
+    where the angles are (min, max, number) in degrees, and the omp entry
+    takes the arguments of `GlobalOMP`. If `tuning` is the path of a
+    `RecommendationTable` (see `jitr.tuning`), the cases it covers use its
+    basis size and channel radius instead of nbasis and channel_radius.
+    """
+
+    projectiles: list
+    targets: list
+    energies: list
+    omp: dict = field(default_factory=lambda: {"model": "KD"})
+    observables: list = field(default_factory=lambda: list(OBSERVABLES))
+    angles: list = field(default_factory=lambda: [1.0, 179.0, 179])
+    nbasis: int = 40
+    channel_radius: float = 8 * np.pi
+    lmax: int = 30
+    chunk_size: int = 16
+    tuning: str = None
+
+    def __post_init__(self):
+        self.projectiles = [tuple(p) for p in self.projectiles]
+        self.targets = [tuple(t) for t in self.targets]
+        self.energies = [float(e) for e in self.energies]
+        for obs in self.observables:
+            if obs not in OBSERVABLES:
+                raise ValueError(
+                    f"Unknown observable {obs}, expected one of {OBSERVABLES}"
+                )
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename) as f:
+            return cls(**json.load(f))
+
+    def save(self, filename):
+        with open(filename, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def to_dict(self):
+        return json.loads(json.dumps(asdict(self)))
+
+    def global_omp(self):
+        return GlobalOMP(**self.omp)
+
+    def recommendations(self):
+        r"""
+        @returns the RecommendationTable, or None if the spec has none
+        """
+        if self.tuning is None:
+            return None
+        return RecommendationTable.load(self.tuning)
+
+    @property
+    def angles_rad(self):
+        lo, hi, n = self.angles
+        return np.linspace(lo, hi, int(n)) * np.pi / 180
+
+    @property
+    def cases(self):
+        r"""
+        (projectile, target, Elab) for each case
+        """
+        return list(product(self.projectiles, self.targets, self.energies))
+
+    def chunks(self, nsamples: np.int32):
+        r"""
+        (case index, first sample, last sample) for each chunk of work
+        """
+        return [
+            (c, start, min(start + self.chunk_size, nsamples))
+            for c in range(len(self.cases))
+            for start in range(0, nsamples, self.chunk_size)
+        ]
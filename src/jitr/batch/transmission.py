@@ -0,0 +1,89 @@
+import multiprocessing
+import os
+
+import numpy as np
+
+from ..reactions import ProjectileTargetSystem, spin_half_orbit_coupling
+from ..rmatrix import Solver
+from ..utils import kinematics
+from ..xs.elastic import MultiEnergyWorkspace
+from ..xs.transmission import transmission_table, write_tables
+from .spec import JobSpec
+
+
+def spec_transmission_table(spec: JobSpec, case: tuple, smatrix_abs_tol):
+    r"""
+    @returns the TransmissionTable for case = (projectile, target) on the
+    energies of the spec, for the first sample of its OMP
+    """
+    projectile, target = case
+    Elab = np.array(spec.energies)
+    omp = spec.global_omp()
+    sys = ProjectileTargetSystem(
+        channel_radius=spec.channel_radius,
+        lmax=spec.lmax,
+        mass_target=kinematics.mass(*target),
+        mass_projectile=kinematics.mass(*projectile),
+        Ztarget=target[1],
+        Zproj=projectile[1],
+        coupling=spin_half_orbit_coupling,
+    )
+    kin = kinematics.classical_kinematics(
+        sys.mass_target, sys.mass_projectile, Elab, Zz=projectile[1] * target[1]
+    )
+    ws = MultiEnergyWorkspace(
+        projectile, target, sys, kin, Solver(spec.nbasis), np.zeros(0)
+    )
+    params = [
+        omp.params(projectile, 0, *target, ws.mu[e], Elab[e], ws.k[e])
+        for e in range(Elab.size)
+    ]
+    return transmission_table(
+        ws,
+        Elab,
+        *omp.interactions(projectile),
+        [scalar for scalar, _ in params],
+        [spin_orbit for _, spin_orbit in params],
+        smatrix_abs_tol,
+    )
+
+
+def run_case(task: tuple):
+    spec, case, smatrix_abs_tol = task
+    return spec_transmission_table(JobSpec(**spec), case, smatrix_abs_tol)
+
+
+def transmission_tables(
+    spec: JobSpec,
+    filename=None,
+    nworkers: np.int32 = None,
+    smatrix_abs_tol: np.float64 = 1e-6,
+):
+    r"""
+    Generates the Hauser-Feshbach transmission coefficient tables for every
+    (projectile, target) of a `JobSpec`, on its energy grid, for the first
+    sample of its OMP, with each table computed in batched multi-energy
+    solves on a process pool.
+
+    @parameters:
+        spec (JobSpec) : the projectiles, targets, energies, OMP and numerical
+            parameters; the angles and observables are ignored
+        filename : if given, the tables are written to it (see
+            `write_tables`)
+        nworkers (int) : number of worker processes; defaults to the number
+            of CPUs, and 1 runs in this process
+        smatrix_abs_tol (float) : partial wave truncation tolerance
+    @returns:
+        the list of TransmissionTables
+    """
+    cases = [(p, t) for p in spec.projectiles for t in spec.targets]
+    tasks = [(spec.to_dict(), case, smatrix_abs_tol) for case in cases]
+    nworkers = nworkers if nworkers is not None else os.cpu_count()
+    if nworkers == 1 or len(cases) <= 1:
+        tables = list(map(run_case, tasks))
+    else:
+        with multiprocessing.get_context().Pool(nworkers) as pool:
+            tables = pool.map(run_case, tasks)
+    if filename is not None:
+        write_tables(filename, tables)
+    return tables
@@ -0,0 +1 @@
+from .solver import BoundStateSolver, BoundStates, spin_orbit_coupling
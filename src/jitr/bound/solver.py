@@ -0,0 +1,201 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..quadrature import (
+    LagrangeLaguerreQuadrature,
+    generate_laguerre_quadrature,
+    laguerre,
+)
+from ..reactions.system import spin_half_orbit_coupling
+from ..utils.constants import HBARC
+
+
+def spin_orbit_coupling(l: np.int32, j: np.float64):
+    r"""
+    @returns the coefficient of the spin-orbit interaction for a spin-1/2
+    particle with orbital and total angular momentum l and j, picked out of
+    the couplings of `spin_half_orbit_coupling`
+    """
+    assert j in (l + 0.5, l - 0.5) and j > 0
+    # the j = l + 1/2 channel comes first
+    return np.diag(spin_half_orbit_coupling(l))[0 if j > l else 1]
+
+
+@dataclass
+class BoundStates:
+    r"""
+    The eigenstates of a stack of (l, j, parameter set) problems, with
+    energies of shape (..., nbasis) in ascending order, and the normalized
+    eigenvectors as the columns of the coefficients, of shape (..., nbasis,
+    nbasis), in the Lagrange-Laguerre basis. The leading dimensions are those
+    of the problem stack. In each problem, the bound states are those with
+    negative energy, with the nth of them having n nodes; the others
+    discretize the continuum.
+    """
+
+    energies: np.ndarray
+    coeffs: np.ndarray
+    r: np.ndarray
+    solver: "BoundStateSolver"
+
+    def binding_energies(self, n: np.int32 = 0):
+        r"""
+        @returns the binding energy [MeV] of the state with n nodes in each
+        problem, or nan where that state is not bound
+        """
+        E = self.energies[..., n]
+        return np.where(E < 0, -E, np.nan)
+
+    def wavefunction_on_mesh(self, n: np.int32 = 0):
+        r"""
+        @returns the reduced radial wavefunction u(r) [fm^-1/2] of the state
+        with n nodes in each problem, at the mesh points `r`, normalized to
+        1 and with u > 0 near the origin
+        """
+        c = self.coeffs[..., :, n]
+        c = c * np.sign(c[..., :1])
+        return c / np.sqrt(self.solver.scale * self.solver.lambdas)
+
+    def wavefunction(self, r: np.ndarray, n: np.int32 = 0):
+        r"""
+        @returns the reduced radial wavefunction u(r) [fm^-1/2] of the state
+        with n nodes in each problem, at arbitrary radii r [fm], from its
+        expansion in the Lagrange-Laguerre basis
+        """
+        c = self.coeffs[..., :, n]
+        c = c * np.sign(c[..., :1])
+        return c @ self.solver.basis(r)
+
+
+class BoundStateSolver:
+    r"""
+    Single-particle bound states of local interactions, with spin-orbit
+    coupling, on a Lagrange-Laguerre mesh r_i = h x_i (Ch. 3.3 of Baye,
+    2015). The mesh Hamiltonian of every (l, j, parameter set) problem is
+    diagonalized in a single batched `eigh` call, in the Gauss
+    approximation, in which the basis is orthonormal.
+    """
+
+    def __init__(self, nbasis: np.int32 = 40, scale: np.float64 = 0.3):
+        r"""
+        @parameters:
+            nbasis (int) : size of the basis
+            scale (float) : the scale h [fm] of the mesh; the largest mesh
+                point, at about 4 h nbasis, should be well beyond the range
+                of the wavefunctions of interest
+        """
+        self.nbasis = nbasis
+        self.scale = scale
+        x, w = generate_laguerre_quadrature(nbasis)
+        self.quadrature = LagrangeLaguerreQuadrature(x, w)
+        self.r = scale * x
+        # Gauss weights of the Lagrange functions, f_i(x_j) = delta_ij / sqrt(lambda_i)
+        self.lambdas = w * np.exp(x)
+        self.kinetic_matrices = {}
+
+    def __getstate__(self):
+        # the numba jitclass quadrature can't be pickled
+        return {"nbasis": self.nbasis, "scale": self.scale}
+
+    def __setstate__(self, state):
+        self.__init__(state["nbasis"], state["scale"])
+
+    def kinetic_matrix(self, l: np.int32):
+        r"""
+        @returns the matrix of -d^2/dr^2 + l (l + 1) / r^2 [fm^-2] on the mesh
+        """
+        l = int(l)
+        if l not in self.kinetic_matrices:
+            self.kinetic_matrices[l] = np.real(
+                self.quadrature.kinetic_matrix(self.scale, l)
+            )
+        return self.kinetic_matrices[l]
+
+    def basis(self, r: np.ndarray):
+        r"""
+        @returns the (nbasis, nr) values of the normalized Lagrange-Laguerre
+        functions at r [fm]
+        """
+        r = np.atleast_1d(r)
+        return np.array(
+            [
+                laguerre(n, self.scale, r, self.quadrature)
+                for n in range(1, self.nbasis + 1)
+            ]
+        ) / np.sqrt(self.scale)
+
+    def hamiltonians(
+        self,
+        mu: np.float64,
+        ls: np.ndarray,
+        couplings: np.ndarray,
+        v_scalar: np.ndarray,
+        v_spin_orbit: np.ndarray,
+    ):
+        r"""
+        @returns the stack of (nbasis, nbasis) mesh Hamiltonians [MeV] of
+        shape (nsamples, nch, nbasis, nbasis)
+        @parameters:
+            mu (float) : reduced mass [MeV]
+            ls (np.ndarray) : orbital angular momentum of each of nch channels
+            couplings (np.ndarray) : spin-orbit coefficient in each channel
+            v_scalar (np.ndarray) : (nsamples, nbasis) scalar interaction
+                [MeV] on the mesh
+            v_spin_orbit (np.ndarray) : (nsamples, nbasis) spin-orbit
+                interaction [MeV] on the mesh
+        """
+        T = HBARC**2 / (2 * mu) * np.array([self.kinetic_matrix(l) for l in ls])
+        V = (
+            v_scalar[:, np.newaxis, :]
+            + couplings[np.newaxis, :, np.newaxis] * v_spin_orbit[:, np.newaxis, :]
+        )
+        H = np.broadcast_to(T, V.shape[:2] + T.shape[1:]).copy()
+        i = np.arange(self.nbasis)
+        H[..., i, i] += V
+        return H
+
+    def solve(
+        self,
+        mu: np.float64,
+        channels: list,
+        interaction_scalar,
+        args_scalar: list,
+        interaction_spin_orbit=None,
+        args_spin_orbit: list = None,
+    ):
+        r"""
+        Finds the bound states of each (l, j) channel for each interaction
+        parameter sample
+
+        @parameters:
+            mu (float) : reduced mass [MeV]
+            channels (list) : (l, j) of each of nch channels
+            interaction_scalar (callable) : real valued function of r and
+                *args
+            args_scalar (list) : args for interaction_scalar for each of
+                nsamples samples
+            interaction_spin_orbit (callable) : real valued function of r and
+                *args, multiplied by `spin_orbit_coupling` in each channel
+            args_spin_orbit (list) : args for interaction_spin_orbit for each
+                sample
+        @returns:
+            the BoundStates, with leading dimensions (nsamples, nch)
+        """
+        ls = np.array([l for l, _ in channels], dtype=np.int64)
+        couplings = np.array([spin_orbit_coupling(l, j) for l, j in channels])
+        v_scalar = np.array([interaction_scalar(self.r, *args) for args in args_scalar])
+        if interaction_spin_orbit is None:
+            v_spin_orbit = np.zeros_like(v_scalar)
+        else:
+            v_spin_orbit = np.array(
+                [interaction_spin_orbit(self.r, *args) for args in args_spin_orbit]
+            )
+        if np.any(np.imag(v_scalar) != 0) or np.any(np.imag(v_spin_orbit) != 0):
+            raise ValueError("Bound states require real valued interactions")
+
+        H = self.hamiltonians(
+            mu, ls, couplings, np.real(v_scalar), np.real(v_spin_orbit)
+        )
+        energies, coeffs = np.linalg.eigh(H)
+        return BoundStates(energies, coeffs, self.r, self)
@@ -0,0 +1,3 @@
+from .fingerprint import fingerprint, workspace_key
+from .store import ResultCache
+from .cached import CachedWorkspace
@@ -0,0 +1,42 @@
+from .fingerprint import fingerprint, workspace_key
+from .store import ResultCache
+
+
+class CachedWorkspace:
+    r"""
+    Opt-in caching wrapper around an `IntegralWorkspace`, a
+    `DifferentialWorkspace` or a `quasielastic_pn.Workspace`, which looks up
+    the results of `smatrix`, `xs` and `tmatrix` in a `ResultCache` before
+    computing them. Results are keyed by the fingerprint of the workspace
+    (system, kinematics, basis, channel radius and angles; see
+    `workspace_key`), the method, the interactions (by name and bytecode) and
+    the bytes of their parameters, so identical points are never recomputed,
+    across processes and restarted jobs. All other attributes are forwarded
+    to the wrapped workspace.
+    """
+
+    cached_methods = ("smatrix", "xs", "tmatrix")
+
+    def __init__(self, workspace, cache: ResultCache):
+        r"""
+        @parameters:
+            workspace : the workspace to wrap
+            cache (ResultCache) : where to store results
+        """
+        self.workspace = workspace
+        self.cache = cache
+        self.key = workspace_key(workspace)
+
+    def __getattr__(self, name):
+        # only called for attributes not found on the wrapper itself
+        if name in ("workspace", "cache", "key"):
+            raise AttributeError(name)
+        attr = getattr(self.workspace, name)
+        if name not in self.cached_methods:
+            return attr
+
+        def cached(*args, **kwargs):
+            key = fingerprint(self.key, name, args, kwargs)
+            return self.cache.get_or_compute(key, lambda: attr(*args, **kwargs))
+
+        return cached
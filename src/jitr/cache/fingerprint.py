@@ -0,0 +1,160 @@
+import hashlib
+import struct
+from types import FunctionType
+
+import numpy as np
+
+from ..xs.elastic import IntegralWorkspace, DifferentialWorkspace
+from ..xs.quasielastic_pn import Workspace as QuasielasticWorkspace
+
+
+def fingerprint(*parts):
+    r"""
+    @returns a stable hex digest of the given parts, identical across
+    processes and interpreter sessions (unlike `hash`). Supports None, bools,
+    numbers, strings, bytes, numpy arrays, tuples, lists, dicts, functions
+    (including numba dispatchers) and plain objects (by their attributes).
+    Python and numpy integers and floats are all hashed as float64, so e.g. a
+    parameter vector given as a tuple or an array hashes the same.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        update(h, part)
+    return h.hexdigest()
+
+
+def update(h, obj):
+    if obj is None:
+        h.update(b"N")
+    elif isinstance(obj, (bool, np.bool_)):
+        h.update(b"B1" if obj else b"B0")
+    elif isinstance(obj, (int, float, np.integer, np.floating)):
+        h.update(b"F" + struct.pack("<d", float(obj)))
+    elif isinstance(obj, (complex, np.complexfloating)):
+        h.update(b"C" + struct.pack("<dd", obj.real, obj.imag))
+    elif isinstance(obj, str):
+        update_bytes(h, b"S", obj.encode())
+    elif isinstance(obj, bytes):
+        update_bytes(h, b"Y", obj)
+    elif isinstance(obj, np.ndarray):
+        a = np.ascontiguousarray(obj)
+        if a.dtype.kind in "iuf":
+            a = a.astype(np.float64)
+        update_bytes(h, b"A", str((a.dtype.str, a.shape)).encode())
+        update_bytes(h, b"", a.tobytes())
+    elif isinstance(obj, (tuple, list)) and len(obj) > 0 and all(map(is_real, obj)):
+        update(h, np.array(obj, dtype=np.float64))
+    elif isinstance(obj, (tuple, list)):
+        h.update(b"T" + struct.pack("<q", len(obj)))
+        for item in obj:
+            update(h, item)
+    elif isinstance(obj, dict):
+        h.update(b"D" + struct.pack("<q", len(obj)))
+        for key in sorted(obj, key=str):
+            update(h, str(key))
+            update(h, obj[key])
+    elif callable(obj) and hasattr(obj, "__qualname__"):
+        update_function(h, getattr(obj, "py_func", obj))
+    elif hasattr(obj, "__dict__"):
+        update_bytes(h, b"O", type(obj).__qualname__.encode())
+        update(h, vars(obj))
+    else:
+        raise TypeError(f"Can't fingerprint object of type {type(obj)}")
+
+
+def is_real(x):
+    return isinstance(x, (int, float, np.integer, np.floating)) and not isinstance(
+        x, (bool, np.bool_)
+    )
+
+
+def update_bytes(h, tag: bytes, data: bytes):
+    h.update(tag + struct.pack("<q", len(data)))
+    h.update(data)
+
+
+def update_function(h, f, seen: set = None):
+    r"""
+    functions are identified by name and by their bytecode, constants and
+    closure, and, recursively, those of the global functions they reference
+    (e.g. a potential called by an interaction), so that editing an
+    interaction or anything it calls invalidates its cached results
+    """
+    update_bytes(h, b"f", f"{f.__module__}.{f.__qualname__}".encode())
+    if isinstance(f, FunctionType):
+        seen = set() if seen is None else seen
+        seen.add(f)
+        update_code(h, f.__code__, f.__globals__, seen)
+        if f.__closure__ is not None:
+            update(h, [cell.cell_contents for cell in f.__closure__])
+
+
+def update_code(h, code, globals_: dict, seen: set):
+    update_bytes(h, b"", code.co_code)
+    update(h, [c for c in code.co_consts if not hasattr(c, "co_code")])
+    # nested functions and lambdas
+    for c in code.co_consts:
+        if hasattr(c, "co_code"):
+            update_code(h, c, globals_, seen)
+    for name in code.co_names:
+        g = globals_.get(name)
+        g = getattr(g, "py_func", g)
+        if isinstance(g, FunctionType) and g not in seen:
+            update_bytes(h, b"G", name.encode())
+            update_function(h, g, seen)
+
+
+def solver_key(solver):
+    return (
+        solver.kernel.quadrature.nbasis,
+        solver.kernel.basis,
+        solver.mixed_precision,
+    )
+
+
+def workspace_key(workspace):
+    r"""
+    @returns the fingerprint of everything that determines the results of a
+    workspace for given interactions: the projectile-target system (channel
+    radius, partial waves, couplings, masses and charges), the kinematics,
+    the solver basis, the partial wave truncation and, for differential
+    observables, the angles
+    """
+    if isinstance(workspace, IntegralWorkspace):
+        return fingerprint(
+            "IntegralWorkspace",
+            workspace.projectile,
+            workspace.target,
+            workspace.sys,
+            solver_key(workspace.solver),
+            workspace.mu,
+            workspace.Ecm,
+            workspace.k,
+            workspace.eta,
+            workspace.smatrix_abs_tol,
+            workspace.semiclassical,
+            workspace.lmax_margin,
+            workspace.potential_tol,
+        )
+    elif isinstance(workspace, DifferentialWorkspace):
+        return fingerprint(
+            "DifferentialWorkspace",
+            workspace_key(workspace.integral_workspace),
+            workspace.angles,
+        )
+    elif isinstance(workspace, QuasielasticWorkspace):
+        return fingerprint(
+            "QuasielasticWorkspace",
+            workspace.sys,
+            solver_key(workspace.solver),
+            workspace.kinematics_entrance,
+            workspace.kinematics_exit,
+            workspace.Elab_entrance,
+            workspace.Elab_exit,
+            workspace.angles,
+            workspace.tmatrix_abs_tol,
+            workspace.semiclassical,
+            workspace.lmax_margin,
+            workspace.potential_tol,
+        )
+    raise TypeError(f"Unsupported workspace type {type(workspace)}")
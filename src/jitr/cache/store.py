@@ -0,0 +1,263 @@
+import os
+import pickle
+import sqlite3
+import time
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    nbytes INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access);
+CREATE TABLE IF NOT EXISTS claims (
+    key TEXT PRIMARY KEY,
+    pid INTEGER NOT NULL,
+    claimed REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO metrics VALUES ('hits', 0), ('misses', 0), ('evictions', 0);
+"""
+
+
+class ResultCache:
+    r"""
+    Persistent, content-addressed cache of results (e.g. S-matrices and
+    cross sections), stored in a local sqlite database and keyed by a
+    fingerprint of their inputs (see `fingerprint`). Values are pickled.
+
+    The cache is safe to share between concurrent processes, e.g. the
+    workers of a `ParallelExecutor` or overlapping jobs on a node: the
+    database runs in write-ahead-logging mode, so readers don't block
+    writers, and `get_or_compute` claims a key before computing it, so that
+    a process missing on a key that another process is already computing
+    waits for that result rather than recomputing it. Claims left behind by
+    a killed process expire after `claim_timeout` seconds.
+
+    The total size of the stored values is bounded by `max_bytes`, beyond
+    which the least recently used entries are evicted. Hits, misses and
+    evictions are counted both for this process (`hits`, `misses`,
+    `evictions`) and across all processes sharing the database (`metrics`).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: np.int64 = 2**30,
+        claim_timeout: np.float64 = 600.0,
+        poll_interval: np.float64 = 0.01,
+    ):
+        r"""
+        @parameters:
+            path (str) : path to the sqlite database, created if it doesn't
+                exist
+            max_bytes (int) : maximum total size of the stored values
+            claim_timeout (float) : seconds after which a claim on a key that
+                was never filled is considered abandoned
+            poll_interval (float) : seconds between checks while waiting on
+                a key claimed by another process
+        """
+        self.path = os.fspath(path)
+        self.max_bytes = max_bytes
+        self.claim_timeout = claim_timeout
+        self.poll_interval = poll_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.connection = None
+        self.pid = None
+        self.connect().executescript(SCHEMA)
+
+    def __getstate__(self):
+        # each process opens its own connection
+        state = self.__dict__.copy()
+        state["connection"] = None
+        state["pid"] = None
+        return state
+
+    def connect(self):
+        if self.connection is None or self.pid != os.getpid():
+            self.connection = sqlite3.connect(
+                self.path, timeout=60.0, isolation_level=None
+            )
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.pid = os.getpid()
+        return self.connection
+
+    def close(self):
+        if self.connection is not None and self.pid == os.getpid():
+            self.connection.close()
+        self.connection = None
+
+    def count(self, name: str, n: np.int64 = 1):
+        self.connect().execute(
+            "UPDATE metrics SET value = value + ? WHERE name = ?", (n, name)
+        )
+
+    def lookup(self, key: str):
+        r"""
+        @returns the pickled value stored under key, marking it as recently
+        used, or None if there is none
+        """
+        db = self.connect()
+        row = db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        db.execute(
+            "UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key)
+        )
+        return row[0]
+
+    def record(self, hit: bool):
+        if hit:
+            self.hits += 1
+            self.count("hits")
+        else:
+            self.misses += 1
+            self.count("misses")
+
+    def get(self, key: str, default=None):
+        r"""
+        @returns the value stored under key, or default if there is none
+        """
+        blob = self.lookup(key)
+        self.record(blob is not None)
+        if blob is None:
+            return default
+        return pickle.loads(blob)
+
+    def __contains__(self, key: str):
+        row = (
+            self.connect()
+            .execute("SELECT 1 FROM entries WHERE key = ?", (key,))
+            .fetchone()
+        )
+        return row is not None
+
+    def put(self, key: str, value):
+        r"""
+        stores value under key, then evicts least recently used entries
+        until the cache is within max_bytes
+        """
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        db = self.connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+            db.execute("DELETE FROM claims WHERE key = ?", (key,))
+            self.evict(db)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def evict(self, db):
+        excess = db.execute("SELECT SUM(nbytes) FROM entries").fetchone()[0]
+        excess = (excess or 0) - self.max_bytes
+        if excess <= 0:
+            return
+        keys = []
+        for key, nbytes in db.execute(
+            "SELECT key, nbytes FROM entries ORDER BY last_access"
+        ):
+            keys.append((key,))
+            excess -= nbytes
+            if excess <= 0:
+                break
+        db.executemany("DELETE FROM entries WHERE key = ?", keys)
+        self.evictions += len(keys)
+        self.count("evictions", len(keys))
+
+    def claim(self, key: str):
+        r"""
+        attempts to claim key for computation
+        @returns True if this process should compute the value for key
+        """
+        db = self.connect()
+        now = time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            if key in self:
+                claimed = False
+            else:
+                db.execute(
+                    "DELETE FROM claims WHERE key = ? AND claimed < ?",
+                    (key, now - self.claim_timeout),
+                )
+                claimed = (
+                    db.execute(
+                        "INSERT OR IGNORE INTO claims VALUES (?, ?, ?)",
+                        (key, os.getpid(), now),
+                    ).rowcount
+                    == 1
+                )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return claimed
+
+    def release(self, key: str):
+        self.connect().execute(
+            "DELETE FROM claims WHERE key = ? AND pid = ?", (key, os.getpid())
+        )
+
+    def get_or_compute(self, key: str, compute):
+        r"""
+        @returns the value stored under key, or else stores and returns
+        compute(). If another process is already computing the value for
+        key, waits for it instead.
+        """
+        blob = self.lookup(key)
+        while blob is None and not self.claim(key):
+            time.sleep(self.poll_interval)
+            blob = self.lookup(key)
+        # waiting on another process counts as a hit, as nothing is recomputed
+        self.record(blob is not None)
+        if blob is not None:
+            return pickle.loads(blob)
+        try:
+            value = compute()
+        except BaseException:
+            self.release(key)
+            raise
+        self.put(key, value)
+        return value
+
+    @property
+    def metrics(self):
+        r"""
+        @returns a dict of the hits, misses and evictions across all
+        processes using the database, along with its current number of
+        entries and total size of the stored values in bytes
+        """
+        db = self.connect()
+        metrics = dict(db.execute("SELECT name, value FROM metrics"))
+        entries, nbytes = db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM entries"
+        ).fetchone()
+        metrics["entries"] = entries
+        metrics["nbytes"] = nbytes
+        return metrics
+
+    def clear(self):
+        r"""
+        removes all entries and resets the metrics
+        """
+        db = self.connect()
+        db.execute("DELETE FROM entries")
+        db.execute("DELETE FROM claims")
+        db.execute("UPDATE metrics SET value = 0")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
@@ -0,0 +1,7 @@
+from .reduced_basis import (
+    pod_basis,
+    deim_indices,
+    EmpiricalInterpolation,
+    ReducedBasisChannels,
+)
+from .elastic import ElasticEmulator
@@ -0,0 +1,237 @@
+from copy import copy
+
+import numpy as np
+
+from ..xs.elastic import DifferentialWorkspace, ElasticXS, differential_elastic_xs
+from .reduced_basis import EmpiricalInterpolation, ReducedBasisChannels
+
+
+class ElasticEmulator:
+    r"""
+    Reduced basis (eigenvector continuation) emulator for elastic scattering
+    observables with local scalar and spin-orbit interactions, trained from
+    high-fidelity `Solver.solve` runs at a set of parameter samples, with an
+    online API mirroring `DifferentialWorkspace.xs`.
+
+    Offline, the interactions are decomposed affinely on the Lagrange mesh by
+    empirical interpolation over the training samples, so that online they
+    need only be evaluated at a handful of interpolation points. The
+    Bloch-Schrödinger matrix in each (l, j) channel is projected onto the POD
+    basis of the training solutions in that channel (see
+    `ReducedBasisChannels`). Online evaluation then costs a few small dense
+    solves, independent of the basis size.
+    """
+
+    def __init__(
+        self,
+        workspace: DifferentialWorkspace,
+        interaction_scalar,
+        interaction_spin_orbit,
+        training_args_scalar: list,
+        training_args_spin_orbit: list,
+        interpolation_tol: np.float64 = 1e-9,
+        basis_tol: np.float64 = 1e-10,
+    ):
+        r"""
+        @parameters:
+            workspace (DifferentialWorkspace) : high-fidelity workspace for
+                the system, kinematics and angles to emulate
+            interaction_scalar (callable) : scalar interaction, a function of
+                r and *args
+            interaction_spin_orbit (callable) : spin-orbit interaction, a
+                function of r and *args
+            training_args_scalar (list) : args for interaction_scalar at each
+                training sample
+            training_args_spin_orbit (list) : args for interaction_spin_orbit
+                at each training sample
+            interpolation_tol (float) : relative singular value cutoff for
+                the empirical interpolation of the interactions
+            basis_tol (float) : relative singular value cutoff for the
+                reduced basis in each channel
+        """
+        assert len(training_args_scalar) == len(training_args_spin_orbit)
+        self.workspace = workspace
+        self.interaction_scalar = interaction_scalar
+        self.interaction_spin_orbit = interaction_spin_orbit
+        iw = workspace.integral_workspace
+        solver = iw.solver
+
+        # scaling in the (decoupled) channels, which all share k, E and a
+        ch0 = iw.channels[0][0]
+        self.k0 = ch0.k[0]
+        self.E0 = ch0.E[0]
+        self.a = ch0.a
+        self.r = solver.kernel.quadrature.abscissa * self.a / self.k0
+
+        # high-fidelity interactions on the mesh at the training samples
+        v_scalar = np.array(
+            [self.interaction_scalar(self.r, *args) for args in training_args_scalar]
+        )
+        v_spin_orbit = np.array(
+            [
+                self.interaction_spin_orbit(self.r, *args)
+                for args in training_args_spin_orbit
+            ]
+        )
+        self.eim_scalar = EmpiricalInterpolation(v_scalar, interpolation_tol)
+        self.eim_spin_orbit = EmpiricalInterpolation(v_spin_orbit, interpolation_tol)
+        self.r_scalar = self.r[self.eim_scalar.indices]
+        self.r_spin_orbit = self.r[self.eim_spin_orbit.indices]
+
+        # emulate all partial waves up to the largest one needed by any of
+        # the training samples before the S-matrix converges to 1; the
+        # semiclassical estimate is not used, as it may cut off partial waves
+        # that other parameters need
+        full = copy(iw)
+        full.semiclassical = False
+        self.nl = max(
+            full.smatrix(interaction_scalar, interaction_spin_orbit, s, so)[0].size
+            for s, so in zip(training_args_scalar, training_args_spin_orbit)
+        )
+
+        # (l, index of j = l +/- 1/2, l dot s) for each channel
+        self.channels = [(0, 0, 0.0)]
+        for l in range(1, self.nl):
+            lds = iw.l_dot_s[l - 1]
+            self.channels += [(l, 0, lds[0]), (l, 1, lds[1])]
+        lds = np.array([c[2] for c in self.channels])
+
+        # high-fidelity snapshots in each channel: the wavefunction
+        # coefficients, which in a single channel are multiples of the
+        # solution A^{-1} b and so span the same space
+        solver_workspace = solver.workspace(1)
+        nsamples = len(training_args_scalar)
+        snapshots = np.zeros(
+            (len(self.channels), iw.nbasis, nsamples), dtype=np.complex128
+        )
+        for i in range(nsamples):
+            V_scalar = np.diag(v_scalar[i] / self.E0)
+            V_spin_orbit = np.diag(v_spin_orbit[i] / self.E0)
+            for c, (l, j, lds_c) in enumerate(self.channels):
+                _, _, x, _ = solver.solve(
+                    iw.channels[l][j],
+                    iw.asymptotics[l][j],
+                    free_matrix=iw.free_matrices[l],
+                    interaction_matrix=V_scalar + lds_c * V_spin_orbit,
+                    basis_boundary=iw.basis_boundary,
+                    wavefunction=True,
+                    workspace=solver_workspace,
+                )
+                snapshots[c, :, i] = x[0]
+
+        # affine terms: the scalar interpolation basis in every channel, then
+        # the spin-orbit interpolation basis times l dot s
+        affine_terms = np.concatenate(
+            [
+                np.broadcast_to(
+                    self.eim_scalar.basis.T[:, np.newaxis, :],
+                    (self.eim_scalar.size, lds.size, iw.nbasis),
+                ),
+                self.eim_spin_orbit.basis.T[:, np.newaxis, :]
+                * lds[np.newaxis, :, np.newaxis],
+            ]
+        )
+        asym = [iw.asymptotics[l][j] for (l, j, _) in self.channels]
+        self.reduced_basis = ReducedBasisChannels(
+            np.array([iw.free_matrices[l] for (l, _, _) in self.channels]),
+            affine_terms / self.E0,
+            iw.basis_boundary,
+            snapshots,
+            self.a,
+            np.array([asym_c.Hp[0] for asym_c in asym]),
+            np.array([asym_c.Hm[0] for asym_c in asym]),
+            np.array([asym_c.Hpp[0] for asym_c in asym]),
+            np.array([asym_c.Hmp[0] for asym_c in asym]),
+            basis_tol=basis_tol,
+        )
+        self.lds = lds
+        self.plus = np.array([j == 0 for (_, j, _) in self.channels])
+        self.ls_plus = np.array([l for (l, j, _) in self.channels if j == 0])
+        self.ls_minus = np.array([l for (l, j, _) in self.channels if j == 1])
+
+    def affine_coefficients(self, args_scalar=None, args_spin_orbit=None):
+        r"""
+        @returns the affine coefficients of the emulated interaction: the
+        interactions evaluated at their empirical interpolation points
+        """
+        # interactions that vanished in training have no interpolation points
+        # and are not evaluated at all
+        g_scalar, g_spin_orbit = np.zeros(0), np.zeros(0)
+        if self.eim_scalar.size > 0:
+            g_scalar = self.interaction_scalar(self.r_scalar, *args_scalar)
+        if self.eim_spin_orbit.size > 0:
+            g_spin_orbit = self.interaction_spin_orbit(
+                self.r_spin_orbit, *args_spin_orbit
+            )
+        return np.concatenate([g_scalar, g_spin_orbit])
+
+    def smatrix(self, args_scalar=None, args_spin_orbit=None):
+        r"""
+        returns the emulated partial wave S-matrix elements as two arrays over
+        partial wave l, one for for the l+1/2 and a second for the l-1/2
+        partial waves (see `IntegralWorkspace.smatrix`)
+        """
+        S = self.reduced_basis.smatrix(
+            self.affine_coefficients(args_scalar, args_spin_orbit)
+        )
+        splus = np.zeros(self.nl, dtype=np.complex128)
+        sminus = np.zeros(self.nl, dtype=np.complex128)
+        splus[self.ls_plus] = S[self.plus]
+        sminus[self.ls_minus] = S[~self.plus]
+        return splus, sminus
+
+    def xs(self, args_scalar=None, args_spin_orbit=None, angles=None):
+        r"""
+        returns the emulated ElasticXS for the given interaction parameters
+        (see `DifferentialWorkspace.xs`)
+        """
+        ws = self.workspace
+        if angles is None:
+            angles = ws.angles
+            P_l_costheta = ws.P_l_costheta
+            P_1_l_costheta = ws.P_1_l_costheta
+            f_c = ws.f_c
+            rutherford = ws.rutherford
+        else:
+            P_l_costheta, P_1_l_costheta, f_c, rutherford = ws.angular_factors(angles)
+
+        splus, sminus = self.smatrix(args_scalar, args_spin_orbit)
+        return ElasticXS(
+            *differential_elastic_xs(
+                ws.k,
+                angles,
+                splus,
+                sminus,
+                ws.ls,
+                P_l_costheta,
+                P_1_l_costheta,
+                f_c,
+                ws.sigma_l,
+            ),
+            rutherford,
+        )
+
+    def error_estimate(self, args_scalar=None, args_spin_orbit=None):
+        r"""
+        @returns the relative residuals ||b - A X|| / ||b|| of the emulated
+        solution in the full Lagrange basis, as two arrays over partial wave
+        l for the l+1/2 and l-1/2 partial waves. The residual is evaluated
+        with the exact (not interpolated) interactions, so it accounts for
+        both the empirical interpolation and the reduced basis truncation.
+        It costs a full evaluation of the interactions on the mesh, so it is
+        intended for validation and for adaptively enriching the training
+        set rather than for every online evaluation.
+        """
+        g = self.affine_coefficients(args_scalar, args_spin_orbit)
+        coefficients = self.reduced_basis.coefficients(g)
+        v_scalar = self.interaction_scalar(self.r, *args_scalar)
+        v_spin_orbit = self.interaction_spin_orbit(self.r, *args_spin_orbit)
+        diagonals = (
+            v_scalar[np.newaxis, :] + self.lds[:, np.newaxis] * v_spin_orbit
+        ) / self.E0
+        residual = self.reduced_basis.residual(diagonals, coefficients)
+        rplus = np.zeros(self.nl, dtype=np.float64)
+        rminus = np.zeros(self.nl, dtype=np.float64)
+        rplus[self.ls_plus] = residual[self.plus]
+        rminus[self.ls_minus] = residual[~self.plus]
+        return rplus, rminus
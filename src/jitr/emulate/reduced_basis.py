@@ -0,0 +1,280 @@
+import numpy as np
+from numba import njit
+
+
+def pod_basis(snapshots: np.ndarray, tol: np.float64 = 1e-10):
+    r"""
+    @returns the orthonormal proper orthogonal decomposition (POD) basis of a
+    set of snapshots, truncated to the left singular vectors with singular
+    values above tol times the largest one
+    @parameters:
+        snapshots (np.ndarray) : (n, nsamples) array with a snapshot in each
+            column
+        tol (float) : relative singular value cutoff
+    """
+    U, s, _ = np.linalg.svd(snapshots, full_matrices=False)
+    if s.size == 0 or s[0] == 0:
+        return U[:, :0]
+    rank = max(1, np.count_nonzero(s > tol * s[0]))
+    return U[:, :rank]
+
+
+def deim_indices(U: np.ndarray):
+    r"""
+    @returns the interpolation indices chosen greedily by the discrete
+    empirical interpolation method (DEIM) for the basis U (Chaturantabut and
+    Sorensen, 2010)
+    """
+    indices = [np.argmax(np.absolute(U[:, 0]))]
+    for j in range(1, U.shape[1]):
+        c = np.linalg.solve(U[indices, :j], U[indices, j])
+        residual = U[:, j] - U[:, :j] @ c
+        indices.append(np.argmax(np.absolute(residual)))
+    return np.array(indices, dtype=np.int32)
+
+
+class EmpiricalInterpolation:
+    r"""
+    Empirical interpolation of a family of functions on a mesh, f(x; theta),
+    from a set of training samples. The function is approximated as
+
+        f(x; theta) ~ sum_k f(x_k; theta) u_k(x)
+
+    where the x_k are a small number of interpolation points selected from the
+    mesh, and the u_k are cardinal functions on the mesh (u_k(x_j) =
+    delta_kj). This gives an affine decomposition of f in terms of its values
+    at the interpolation points, so that e.g. an interaction that depends
+    non-linearly on its parameters can be emulated with an online cost that
+    is independent of the mesh size.
+    """
+
+    def __init__(self, samples: np.ndarray, tol: np.float64 = 1e-9):
+        r"""
+        @parameters:
+            samples (np.ndarray) : (nsamples, n) array of the function
+                evaluated on the mesh for each training sample
+            tol (float) : relative singular value cutoff for the POD basis
+                of the samples
+        """
+        U = pod_basis(np.asarray(samples).T, tol)
+        if U.shape[1] == 0:
+            # the function vanishes at every training sample (e.g. a
+            # spin-orbit term that is identically zero), so it is
+            # interpolated by zero, from no interpolation points
+            self.indices = np.zeros(0, dtype=np.int32)
+            self.basis = np.zeros((U.shape[0], 0), dtype=U.dtype)
+            return
+        self.indices = deim_indices(U)
+        self.basis = U @ np.linalg.inv(U[self.indices, :])
+
+    @property
+    def size(self):
+        r"""number of interpolation points"""
+        return self.indices.size
+
+    def __call__(self, values: np.ndarray):
+        r"""
+        @returns the interpolant on the full mesh, given the function values
+        at the interpolation points
+        """
+        return self.basis @ values
+
+
+class ReducedBasisChannels:
+    r"""
+    Galerkin reduced basis emulator for the R and S-matrices in a set of
+    independent single channels that share a channel radius and basis, with
+    Bloch-Schrödinger matrices that are affine in a set of coefficients g:
+
+        A_c(g) = F_c + sum_k g_k diag(v_ck)
+
+    Each channel's solution X_c = A_c^{-1} b is expanded in the orthonormal
+    POD basis Phi_c of its high-fidelity snapshots. Because A_c is complex
+    symmetric (A_c^T = A_c), the reduced system uses the transpose rather
+    than the conjugate transpose,
+
+        Phi_c^T A_c Phi_c x_c = Phi_c^T b,
+
+    which is the Petrov-Galerkin projection onto the test space conj(Phi_c),
+    and makes the emulated R-matrix stationary with respect to errors in the
+    reduced solution (the Kohn variational principle), so that errors in R
+    are quadratic in the error of the reduced solution. All of the projected
+    matrices are computed offline, so the online cost is independent of the
+    basis size.
+
+    The POD basis in each channel is truncated separately, so e.g. high
+    partial waves that barely feel the interaction get very few basis
+    vectors. Reduced quantities are stored zero padded to the largest rank,
+    except for the projected affine terms, which dominate the online cost and
+    are packed contiguously at each channel's own rank.
+    """
+
+    def __init__(
+        self,
+        free_matrices: np.ndarray,
+        affine_terms: np.ndarray,
+        basis_boundary: np.ndarray,
+        snapshots: np.ndarray,
+        a: np.float64,
+        Hp: np.ndarray,
+        Hm: np.ndarray,
+        Hpp: np.ndarray,
+        Hmp: np.ndarray,
+        basis_tol: np.float64 = 1e-10,
+    ):
+        r"""
+        @parameters:
+            free_matrices (np.ndarray) : (nch, nbasis, nbasis) free matrix F_c
+                in each channel
+            affine_terms (np.ndarray) : (nterms, nch, nbasis) diagonals of the
+                affine interaction terms v_ck in each channel
+            basis_boundary (np.ndarray) : (nbasis,) Lagrange function values
+                at the channel radius
+            snapshots (np.ndarray) : (nch, nbasis, nsamples) high-fidelity
+                solutions A_c^{-1} b at the training samples, or any multiples
+                of them, e.g. the wavefunction coefficients
+            a (float) : dimensionless channel radius
+            Hp, Hm, Hpp, Hmp (np.ndarray) : (nch,) asymptotic outgoing and
+                incoming wavefunctions and their derivatives at the channel
+                radius
+            basis_tol (float) : relative singular value cutoff for the POD
+                basis of the snapshots in each channel
+        """
+        nch, nbasis, _ = snapshots.shape
+        self.nchannels = nch
+        self.nbasis = nbasis
+        self.a = a
+        self.Hp = Hp
+        self.Hm = Hm
+        self.Hpp = Hpp
+        self.Hmp = Hmp
+
+        bases = [pod_basis(snapshots[c], basis_tol) for c in range(nch)]
+        self.ranks = np.array([Phi.shape[1] for Phi in bases])
+        n = np.max(self.ranks)
+        self.size = n
+
+        # zero padded POD bases
+        self.basis = np.zeros((nch, nbasis, n), dtype=np.complex128)
+        for c, Phi in enumerate(bases):
+            self.basis[c, :, : Phi.shape[1]] = Phi
+
+        # full space operators applied to the basis, for residuals
+        self.free_basis = free_matrices @ self.basis
+        self.basis_boundary = basis_boundary
+
+        # offline projection
+        Phi_T = np.transpose(self.basis, (0, 2, 1))
+        self.free_reduced = Phi_T @ self.free_basis
+        self.boundary_reduced = Phi_T @ basis_boundary
+
+        # projected affine terms, packed as (nterms, rank, rank) per channel
+        self.terms_offsets = np.zeros(nch + 1, dtype=np.int64)
+        self.terms_offsets[1:] = np.cumsum(affine_terms.shape[0] * self.ranks**2)
+        self.terms_reduced = np.zeros(self.terms_offsets[-1], dtype=np.complex128)
+        for c, Phi in enumerate(bases):
+            self.terms_reduced[self.terms_offsets[c] : self.terms_offsets[c + 1]] = (
+                np.einsum("ia,ki,ib->kab", Phi, affine_terms[:, c, :], Phi).ravel()
+            )
+
+    def coefficients(self, g: np.ndarray):
+        r"""
+        @returns the (nch, n) coefficients of the reduced solution in each
+        channel for the affine coefficients g
+        """
+        return reduced_coefficients(
+            np.asarray(g, dtype=np.complex128),
+            self.free_reduced,
+            self.terms_reduced,
+            self.terms_offsets,
+            self.boundary_reduced,
+            self.ranks,
+        )
+
+    def rmatrix(self, g: np.ndarray, coefficients: np.ndarray = None):
+        r"""
+        @returns the (nch,) emulated R-matrix in each channel
+        """
+        if coefficients is None:
+            coefficients = self.coefficients(g)
+        return np.sum(self.boundary_reduced * coefficients, axis=1) / self.a**2
+
+    def smatrix(self, g: np.ndarray, coefficients: np.ndarray = None):
+        r"""
+        @returns the (nch,) emulated S-matrix in each channel
+        """
+        R = self.rmatrix(g, coefficients)
+        # Eqns 16 and 17 in Descouvemont, 2016, for a single channel
+        return (self.Hm - self.a * self.Hmp * R) / (self.Hp - self.a * self.Hpp * R)
+
+    def residual(self, diagonals: np.ndarray, coefficients: np.ndarray):
+        r"""
+        @returns the (nch,) relative residual ||b - A_c Phi_c x_c|| / ||b||
+        of the reduced solution in the full space, for a full space
+        interaction with the given diagonals (nch, nbasis). This costs
+        O(nbasis x n) per channel and requires no factorization.
+        """
+        x = self.basis @ coefficients[..., np.newaxis]
+        Ax = self.free_basis @ coefficients[..., np.newaxis]
+        r = self.basis_boundary - (Ax[..., 0] + diagonals * x[..., 0])
+        return np.linalg.norm(r, axis=1) / np.linalg.norm(self.basis_boundary)
+
+
+@njit
+def reduced_coefficients(
+    g: np.ndarray,
+    free_reduced: np.ndarray,
+    terms_reduced: np.ndarray,
+    terms_offsets: np.ndarray,
+    boundary_reduced: np.ndarray,
+    ranks: np.ndarray,
+):
+    r"""
+    Assembles and solves the reduced system in each channel. The systems are
+    small, so they are solved directly by Gaussian elimination with partial
+    pivoting rather than through LAPACK.
+    """
+    nch, n, _ = free_reduced.shape
+    nterms = g.shape[0]
+    x = np.zeros((nch, n), dtype=np.complex128)
+    for c in range(nch):
+        m = ranks[c]
+        A = np.empty(m * m, dtype=np.complex128)
+        for i in range(m):
+            for j in range(m):
+                A[i * m + j] = free_reduced[c, i, j]
+        offset = terms_offsets[c]
+        for k in range(nterms):
+            gk = g[k]
+            for ij in range(m * m):
+                A[ij] += gk * terms_reduced[offset + ij]
+            offset += m * m
+        for i in range(m):
+            x[c, i] = boundary_reduced[c, i]
+        gaussian_elimination(A.reshape((m, m)), x[c], m)
+    return x
+
+
+@njit
+def gaussian_elimination(A: np.ndarray, b: np.ndarray, m: np.int32):
+    r"""
+    Solves the leading m x m block of A x = b in place, overwriting A and b
+    """
+    for i in range(m):
+        p = i
+        for r in range(i + 1, m):
+            if np.abs(A[r, i]) > np.abs(A[p, i]):
+                p = r
+        if p != i:
+            for j in range(i, m):
+                A[i, j], A[p, j] = A[p, j], A[i, j]
+            b[i], b[p] = b[p], b[i]
+        for r in range(i + 1, m):
+            f = A[r, i] / A[i, i]
+            for j in range(i + 1, m):
+                A[r, j] -= f * A[i, j]
+            b[r] -= f * b[i]
+    for i in range(m - 1, -1, -1):
+        for j in range(i + 1, m):
+            b[i] -= A[i, j] * b[j]
+        b[i] /= A[i, i]
@@ -0,0 +1,2 @@
+from .reducer import OnlineMoments, QuantileSketch, EnsembleReducer
+from .propagate import ElasticXSEnsemble, elastic_ensemble, evaluate_batch, propagate
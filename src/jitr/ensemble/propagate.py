@@ -0,0 +1,187 @@
+from dataclasses import dataclass
+from itertools import islice
+
+import numpy as np
+
+from ..xs.elastic import IntegralWorkspace, DifferentialWorkspace, MultiEnergyWorkspace
+from .reducer import EnsembleReducer
+
+
+@dataclass
+class ElasticXSEnsemble:
+    r"""
+    Streaming ensemble summaries of the elastic observables: differential
+    cross section, analyzing power, total and reaction cross section (dsdo
+    and Ay are None for integral observables only)
+    """
+
+    dsdo: EnsembleReducer
+    Ay: EnsembleReducer
+    t: EnsembleReducer
+    rxn: EnsembleReducer
+
+    def reducers(self):
+        return [r for r in (self.dsdo, self.Ay, self.t, self.rxn) if r is not None]
+
+    def merge(self, other):
+        r"""
+        merges in another ElasticXSEnsemble accumulated over a disjoint set of
+        samples, e.g. on another worker, with the same observables of the
+        same shapes
+        """
+        if (self.dsdo is None) != (other.dsdo is None):
+            raise ValueError(
+                "Can't merge an ensemble of differential observables with one "
+                "of integral observables only"
+            )
+        for field in ["dsdo", "Ay", "t", "rxn"]:
+            mine, theirs = getattr(self, field), getattr(other, field)
+            if mine is not None and mine.moments.shape != theirs.moments.shape:
+                raise ValueError(
+                    f"Can't merge ensembles with {field} of shapes "
+                    f"{mine.moments.shape} and {theirs.moments.shape}"
+                )
+        for mine, theirs in zip(self.reducers(), other.reducers()):
+            mine.merge(theirs)
+        return self
+
+    @property
+    def count(self):
+        return self.t.count
+
+
+def elastic_ensemble(
+    shape: tuple,
+    differential: bool = True,
+    covariance: bool = False,
+    capacity: int = 256,
+    seed=None,
+    integral_shape: tuple = None,
+):
+    r"""
+    @returns an empty ElasticXSEnsemble
+    @parameters:
+        shape (tuple) : shape of the differential observables, e.g.
+            (nangles,), or (nenergies, nangles) for a MultiEnergyWorkspace;
+            ignored if differential is False
+        differential (bool) : whether to summarize dsdo and Ay
+        covariance (bool) : whether to track the full covariance of each
+            observable, e.g. between all energies and angles, at O(nobs^2)
+            memory; by default only the variances are tracked, so that
+            memory is O(nobs)
+        capacity (int) : capacity of each level of the quantile sketches
+        seed : seed for the quantile sketches
+        integral_shape (tuple) : shape of the integrated cross sections,
+            e.g. () or (nenergies,); defaults to shape[:-1]
+    """
+    rng = np.random.default_rng(seed)
+    if integral_shape is None:
+        integral_shape = shape[:-1]
+
+    def reducer(s):
+        return EnsembleReducer(s, covariance, capacity, rng.integers(2**32))
+
+    return ElasticXSEnsemble(
+        reducer(shape) if differential else None,
+        reducer(shape) if differential else None,
+        reducer(integral_shape),
+        reducer(integral_shape),
+    )
+
+
+def evaluate_batch(
+    workspace,
+    interaction_scalar,
+    interaction_spin_orbit,
+    batch: list,
+):
+    r"""
+    @returns dsdo, Ay, t and rxn for a batch of (args_scalar, args_spin_orbit)
+    samples, each with a leading sample axis (dsdo and Ay are None for an
+    IntegralWorkspace)
+    """
+    args_scalar = [s for s, _ in batch]
+    args_spin_orbit = [so for _, so in batch]
+    if isinstance(workspace, DifferentialWorkspace):
+        xs = workspace.xs_batch(
+            interaction_scalar, interaction_spin_orbit, args_scalar, args_spin_orbit
+        )
+        return xs.dsdo, xs.Ay, xs.t, xs.rxn
+    elif isinstance(workspace, MultiEnergyWorkspace):
+        xs = [
+            workspace.xs(interaction_scalar, interaction_spin_orbit, s, so)
+            for s, so in batch
+        ]
+        return tuple(
+            np.array([getattr(x, field) for x in xs])
+            for field in ["dsdo", "Ay", "t", "rxn"]
+        )
+    elif isinstance(workspace, IntegralWorkspace):
+        t, rxn = np.array(
+            [
+                workspace.xs(interaction_scalar, interaction_spin_orbit, s, so)
+                for s, so in batch
+            ]
+        ).T
+        return None, None, t, rxn
+    raise TypeError(f"Unsupported workspace type {type(workspace)}")
+
+
+def propagate(
+    workspace,
+    interaction_scalar,
+    interaction_spin_orbit,
+    samples,
+    batch_size: int = 64,
+    ensemble: ElasticXSEnsemble = None,
+    covariance: bool = False,
+    capacity: int = 256,
+    seed=None,
+):
+    r"""
+    Propagates an ensemble of interaction parameter samples to elastic
+    observables, streaming the samples through the workspace in batches and
+    accumulating the online mean, variance (or, on request, covariance) and
+    quantile sketches of each observable, so that memory does not grow with
+    the number of samples.
+
+    @parameters:
+        workspace : a DifferentialWorkspace, MultiEnergyWorkspace or
+            IntegralWorkspace
+        interaction_scalar (callable) : scalar interaction
+        interaction_spin_orbit (callable) : spin-orbit interaction
+        samples (iterable) : (args_scalar, args_spin_orbit) for each sample,
+            consumed lazily, so this may be a generator. For a
+            MultiEnergyWorkspace, each may be a list with one tuple per
+            energy (see `MultiEnergyWorkspace.smatrix`).
+        batch_size (int) : number of samples evaluated at once
+        ensemble (ElasticXSEnsemble) : existing summaries to update, e.g.
+            from a previous call; if None, a new one is created
+        covariance, capacity, seed : see `elastic_ensemble`
+    @returns:
+        the updated ElasticXSEnsemble
+    """
+    samples = iter(samples)
+    while True:
+        batch = list(islice(samples, batch_size))
+        if len(batch) == 0:
+            break
+        dsdo, Ay, t, rxn = evaluate_batch(
+            workspace, interaction_scalar, interaction_spin_orbit, batch
+        )
+        if ensemble is None:
+            differential = dsdo is not None
+            ensemble = elastic_ensemble(
+                dsdo.shape[1:] if differential else None,
+                differential,
+                covariance,
+                capacity,
+                seed,
+                integral_shape=t.shape[1:],
+            )
+        if dsdo is not None:
+            ensemble.dsdo.update(dsdo)
+            ensemble.Ay.update(Ay)
+        ensemble.t.update(t)
+        ensemble.rxn.update(rxn)
+    return ensemble
@@ -0,0 +1,253 @@
+import numpy as np
+
+
+class OnlineMoments:
+    r"""
+    Streaming mean and (co)variance of an array-valued quantity over samples,
+    updated in batches with the parallel form of Welford's algorithm (Chan,
+    Golub and LeVeque, 1979). Two instances accumulated over disjoint sets of
+    samples (e.g. on different workers) can be merged exactly.
+
+    Memory is independent of the number of samples: O(nobs) for the mean
+    and variance, where nobs is the number of elements of the quantity. The
+    full covariance, O(nobs^2), is only tracked on request.
+    """
+
+    def __init__(self, shape: tuple, covariance: bool = False):
+        r"""
+        @parameters:
+            shape (tuple) : shape of a single sample of the quantity
+            covariance (bool) : whether to track the full covariance between
+                all elements, at O(nobs^2) memory, rather than only their
+                variances
+        """
+        self.shape = tuple(shape)
+        self.nobs = int(np.prod(self.shape))
+        self.track_covariance = covariance
+        self.count = 0
+        self.mean_flat = np.zeros(self.nobs, dtype=np.float64)
+        if covariance:
+            self.M2 = np.zeros((self.nobs, self.nobs), dtype=np.float64)
+        else:
+            self.M2 = np.zeros(self.nobs, dtype=np.float64)
+
+    def update(self, batch: np.ndarray):
+        r"""
+        adds a batch of samples, of shape (nsamples, *shape)
+        """
+        batch = np.asarray(batch, dtype=np.float64).reshape(-1, self.nobs)
+        nb = batch.shape[0]
+        if nb == 0:
+            return
+        mean_b = np.mean(batch, axis=0)
+        centered = batch - mean_b
+        if self.track_covariance:
+            M2_b = centered.T @ centered
+        else:
+            M2_b = np.sum(centered**2, axis=0)
+        self.combine(nb, mean_b, M2_b)
+
+    def merge(self, other):
+        r"""
+        merges in the state of another OnlineMoments accumulated over a
+        disjoint set of samples
+        """
+        assert other.shape == self.shape
+        assert other.track_covariance == self.track_covariance
+        if other.count > 0:
+            self.combine(other.count, other.mean_flat, other.M2)
+        return self
+
+    def combine(self, nb: int, mean_b: np.ndarray, M2_b: np.ndarray):
+        na = self.count
+        n = na + nb
+        delta = mean_b - self.mean_flat
+        self.mean_flat += delta * nb / n
+        if self.track_covariance:
+            self.M2 += M2_b + np.outer(delta, delta) * na * nb / n
+        else:
+            self.M2 += M2_b + delta**2 * na * nb / n
+        self.count = n
+
+    @property
+    def mean(self):
+        return self.mean_flat.reshape(self.shape)
+
+    @property
+    def variance(self):
+        r"""unbiased sample variance"""
+        M2 = np.diagonal(self.M2) if self.track_covariance else self.M2
+        return (M2 / max(self.count - 1, 1)).reshape(self.shape)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    @property
+    def covariance(self):
+        r"""
+        unbiased sample covariance, of shape (nobs, nobs) over the flattened
+        elements, or None if not tracked
+        """
+        if not self.track_covariance:
+            return None
+        return self.M2 / max(self.count - 1, 1)
+
+
+class QuantileSketch:
+    r"""
+    Mergeable streaming quantile sketch of an array-valued quantity over
+    samples, in the style of the KLL sketch (Karnin, Lang and Liberty, 2016),
+    vectorized over the elements of the quantity.
+
+    Samples are appended to a buffer at level 0. Whenever the buffer at level
+    h holds `capacity` samples, each element's column is sorted, and every
+    other sample, starting at a random offset, is promoted to level h + 1,
+    where it carries weight 2^(h + 1). Because every column holds the same
+    number of samples at each level, all elements are compacted at once.
+    Memory is O(capacity log(nsamples / capacity)) per element, and the rank
+    error of a quantile is O(log(nsamples / capacity) / capacity).
+    """
+
+    def __init__(self, shape: tuple, capacity: int = 256, seed=None):
+        r"""
+        @parameters:
+            shape (tuple) : shape of a single sample of the quantity
+            capacity (int) : number of samples held at each level before
+                compaction; larger is more accurate
+            seed : seed for the random compaction offsets
+        """
+        assert capacity >= 2
+        self.shape = tuple(shape)
+        self.nobs = int(np.prod(self.shape))
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        self.levels = [np.zeros((0, self.nobs), dtype=np.float64)]
+        self.count = 0
+
+    def update(self, batch: np.ndarray):
+        r"""
+        adds a batch of samples, of shape (nsamples, *shape)
+        """
+        batch = np.asarray(batch, dtype=np.float64).reshape(-1, self.nobs)
+        self.count += batch.shape[0]
+        self.levels[0] = np.concatenate([self.levels[0], batch])
+        self.compact()
+
+    def merge(self, other):
+        r"""
+        merges in the state of another QuantileSketch accumulated over a
+        disjoint set of samples
+        """
+        assert other.shape == self.shape
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.zeros((0, self.nobs), dtype=np.float64))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.count += other.count
+        self.compact()
+        return self
+
+    def compact(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if items.shape[0] >= self.capacity:
+                # an odd sample out stays at this level
+                m = items.shape[0] - items.shape[0] % 2
+                promoted = np.sort(items[:m], axis=0)[self.rng.integers(2) :: 2]
+                self.levels[h] = items[m:]
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.zeros((0, self.nobs), dtype=np.float64))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def quantile(self, q):
+        r"""
+        @returns the estimated quantiles q (in [0, 1]) of each element, of
+        shape (len(q), *shape), by linear interpolation of the weighted
+        empirical CDF
+        """
+        if self.count == 0:
+            raise ValueError("Can't estimate quantiles of an empty sketch")
+        q = np.atleast_1d(q)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(items.shape[0], 2.0**h) for h, items in enumerate(self.levels)]
+        )
+        order = np.argsort(values, axis=0)
+        values = np.take_along_axis(values, order, axis=0)
+        cdf = np.cumsum(weights[order], axis=0)
+        # midpoint CDF of each retained sample, as in np.percentile's default
+        cdf = (cdf - 0.5 * weights[order]) / cdf[-1]
+        out = np.empty((q.size, self.nobs), dtype=np.float64)
+        for j in range(self.nobs):
+            out[:, j] = np.interp(q, cdf[:, j], values[:, j])
+        return out.reshape((q.size,) + self.shape)
+
+    @property
+    def nbytes(self):
+        return sum(items.nbytes for items in self.levels)
+
+
+class EnsembleReducer:
+    r"""
+    Streaming summary of an array-valued quantity over an ensemble of
+    samples: online mean and variance, and optionally covariance
+    (`OnlineMoments`), together with quantile sketches (`QuantileSketch`) for
+    credible intervals. The state is mergeable across workers.
+    """
+
+    def __init__(
+        self,
+        shape: tuple,
+        covariance: bool = False,
+        capacity: int = 256,
+        seed=None,
+    ):
+        r"""
+        @parameters:
+            shape (tuple) : shape of a single sample of the quantity
+            covariance (bool) : whether to track the full covariance, at
+                O(nobs^2) memory; by default only the variances are tracked
+            capacity (int) : capacity of each level of the quantile sketch
+            seed : seed for the quantile sketch
+        """
+        self.moments = OnlineMoments(shape, covariance)
+        self.sketch = QuantileSketch(shape, capacity, seed)
+
+    def update(self, batch: np.ndarray):
+        self.moments.update(batch)
+        self.sketch.update(batch)
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def count(self):
+        return self.moments.count
+
+    @property
+    def mean(self):
+        return self.moments.mean
+
+    @property
+    def std(self):
+        return self.moments.std
+
+    @property
+    def covariance(self):
+        return self.moments.covariance
+
+    def quantile(self, q):
+        return self.sketch.quantile(q)
+
+    def credible_interval(self, level: np.float64 = 0.68):
+        r"""
+        @returns the lower and upper bounds of the central credible interval
+        with the given probability content
+        """
+        lower, upper = self.quantile([(1 - level) / 2, (1 + level) / 2])
+        return lower, upper
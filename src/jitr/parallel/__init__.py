@@ -0,0 +1,3 @@
+from .shared import SharedArray, SharedObject, allocate, release
+from .executor import ParallelExecutor, ElasticModel
+from . import mpi
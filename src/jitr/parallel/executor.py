@@ -0,0 +1,245 @@
+import multiprocessing
+import os
+
+import numpy as np
+
+from ..xs.elastic import IntegralWorkspace
+from .shared import SharedObject, allocate, release, detach
+
+
+class WorkerState:
+    r"""
+    Per-process state of a `ParallelExecutor` worker: the workspaces and
+    model, unpickled once around views of the shared workspace arrays, and
+    the per-run shared blocks currently attached
+    """
+
+    def __init__(self, workspaces: list, model):
+        self.workspaces = workspaces
+        self.model = model
+        self.run_blocks = ()
+
+
+worker = None
+
+
+def initialize_worker(shared: SharedObject, warmup_sample: np.ndarray):
+    global worker
+    workspaces, model = shared.load()
+    worker = WorkerState(workspaces, model)
+    # compile the numba kernels now rather than in the first task
+    if warmup_sample is not None:
+        for workspace in workspaces:
+            model(workspace, warmup_sample)
+
+
+def run_task(task: tuple):
+    r"""
+    evaluates the model for a contiguous range of samples on one workspace,
+    writing directly into the shared output
+    """
+    w, start, stop, samples, output = task
+    blocks = (samples.name, output.name)
+    if blocks != worker.run_blocks:
+        for name in worker.run_blocks:
+            detach(name)
+        worker.run_blocks = blocks
+    workspace = worker.workspaces[w]
+    x = samples.array()
+    out = output.array(writeable=True)
+    for i in range(start, stop):
+        out[i] = worker.model(workspace, x[i])
+    return stop - start
+
+
+class ParallelExecutor:
+    r"""
+    Evaluates a model over (sample, workspace) tasks on a pool of worker
+    processes, where each workspace typically corresponds to an (energy,
+    target) pair, e.g. for ensemble propagation or a likelihood over a
+    corpus of data sets.
+
+    The workspaces are sent to the workers once, when the pool starts: their
+    large read-only arrays (free matrices, Legendre tables, asymptotics,
+    ...) are stored in a single `multiprocessing.shared_memory` block shared
+    by all workers, and the rest of their state is unpickled in each worker
+    around zero-copy views of that block (see `SharedObject`). Each worker is
+    warm-started by evaluating the model once on every workspace, so that
+    the numba kernels are compiled before any tasks are timed.
+
+    For each run, the samples and the outputs live in shared memory too, so
+    a task is just (workspace index, first sample, last sample) plus the
+    handles of the two blocks, and workers write their results directly
+    into the shared output array. Nothing is serialized per sample.
+    """
+
+    def __init__(
+        self,
+        workspaces,
+        model,
+        nworkers: np.int32 = None,
+        warmup_sample: np.ndarray = None,
+        min_shared_bytes: np.int32 = 1024,
+        start_method: str = None,
+    ):
+        r"""
+        @parameters:
+            workspaces (list or dict) : workspaces to evaluate the model on. If
+                a dict, e.g. keyed by (target, energy), `run` returns a dict
+                with the same keys.
+            model (callable) : picklable function of (workspace, sample)
+                returning an array of fixed shape for each workspace, e.g. an
+                `ElasticModel`. Functions must be importable by the workers,
+                i.e. not defined in __main__ or a closure.
+            nworkers (int) : number of worker processes, defaults to the
+                number of CPUs
+            warmup_sample (np.ndarray) : a sample with which to warm-start
+                the workers; if None, kernels are compiled in the first task
+            min_shared_bytes (int) : workspace arrays smaller than this are
+                copied into each worker rather than shared
+            start_method (str) : multiprocessing start method, defaults to
+                the platform default
+        """
+        if isinstance(workspaces, dict):
+            self.keys = list(workspaces.keys())
+            workspaces = list(workspaces.values())
+        else:
+            self.keys = None
+        self.workspaces = list(workspaces)
+        self.model = model
+        self.nworkers = nworkers if nworkers is not None else os.cpu_count()
+        self.output_specs = None
+        if warmup_sample is not None:
+            warmup_sample = np.asarray(warmup_sample, dtype=np.float64)
+            self.output_specs = self.evaluate_specs(warmup_sample)
+
+        self.shared = SharedObject((self.workspaces, model), min_shared_bytes)
+        context = multiprocessing.get_context(start_method)
+        self.pool = context.Pool(
+            self.nworkers,
+            initializer=initialize_worker,
+            initargs=(self.shared, warmup_sample),
+        )
+
+    def evaluate_specs(self, sample: np.ndarray):
+        r"""
+        @returns the shape and dtype of the model output on each workspace,
+        from a single evaluation in this process
+        """
+        specs = []
+        for workspace in self.workspaces:
+            out = np.asarray(self.model(workspace, sample))
+            specs.append((out.shape, out.dtype))
+        return specs
+
+    def run(self, samples: np.ndarray, chunk_size: np.int32 = None):
+        r"""
+        Evaluates the model for every sample on every workspace.
+
+        @parameters:
+            samples (np.ndarray) : (nsamples, nparams) samples
+            chunk_size (int) : number of samples per task; by default each
+                workspace is split into about 4 tasks per worker, for load
+                balancing
+        @returns:
+            a list (or dict, if the workspaces were given as a dict) with one
+            array of shape (nsamples, *output shape) per workspace
+        """
+        samples = np.asarray(samples, dtype=np.float64)
+        if samples.ndim == 1:
+            samples = samples[:, np.newaxis]
+        nsamples = samples.shape[0]
+        if self.output_specs is None:
+            self.output_specs = self.evaluate_specs(samples[0])
+        if chunk_size is None:
+            chunk_size = max(1, -(-nsamples // (4 * self.nworkers)))
+
+        shm, handles = allocate(
+            [(samples.shape, samples.dtype, "C")]
+            + [((nsamples,) + shape, dtype, "C") for shape, dtype in self.output_specs]
+        )
+        try:
+            handles[0].array(writeable=True)[...] = samples
+            tasks = [
+                (w, start, min(start + chunk_size, nsamples), handles[0], output)
+                for w, output in enumerate(handles[1:])
+                for start in range(0, nsamples, chunk_size)
+            ]
+            for _ in self.pool.imap_unordered(run_task, tasks):
+                pass
+            results = [output.array().copy() for output in handles[1:]]
+        finally:
+            release(shm)
+
+        if self.keys is not None:
+            return dict(zip(self.keys, results))
+        return results
+
+    def close(self):
+        r"""
+        shuts down the workers and releases the shared workspace arrays
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        self.shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ElasticModel:
+    r"""
+    Picklable model for a `ParallelExecutor` that evaluates elastic
+    observables for samples of the concatenated scalar and spin-orbit
+    interaction parameters
+    """
+
+    def __init__(
+        self,
+        interaction_scalar,
+        interaction_spin_orbit,
+        nscalar: np.int32,
+        observables: tuple = ("dsdo",),
+    ):
+        r"""
+        @parameters:
+            interaction_scalar (callable) : scalar interaction
+            interaction_spin_orbit (callable) : spin-orbit interaction
+            nscalar (int) : the first nscalar parameters of each sample are
+                the args of interaction_scalar, and the rest are the args of
+                interaction_spin_orbit
+            observables (tuple) : fields of `ElasticXS` to return,
+                concatenated; only "t" and "rxn" are available for an
+                IntegralWorkspace
+        """
+        self.interaction_scalar = interaction_scalar
+        self.interaction_spin_orbit = interaction_spin_orbit
+        self.nscalar = nscalar
+        self.observables = tuple(observables)
+
+    def __call__(self, workspace, sample: np.ndarray):
+        args_scalar = tuple(sample[: self.nscalar])
+        args_spin_orbit = tuple(sample[self.nscalar :])
+        if isinstance(workspace, IntegralWorkspace):
+            t, rxn = workspace.xs(
+                self.interaction_scalar,
+                self.interaction_spin_orbit,
+                args_scalar,
+                args_spin_orbit,
+            )
+            fields = {"t": t, "rxn": rxn}
+            return np.array([fields[name] for name in self.observables])
+        xs = workspace.xs(
+            self.interaction_scalar,
+            self.interaction_spin_orbit,
+            args_scalar,
+            args_spin_orbit,
+        )
+        return np.concatenate(
+            [np.ravel(getattr(xs, name)) for name in self.observables]
+        )
@@ -0,0 +1,193 @@
+r"""
+Optional MPI backend for distributing ensemble and energy-grid evaluation
+across nodes, using mpi4py. Every function takes a user-provided
+communicator (e.g. a sub-communicator of MPI.COMM_WORLD), so that jitr can be
+embedded in a larger MPI application, and defaults to MPI.COMM_WORLD only if
+none is given. All functions are collective: every rank of the communicator
+must call them, in the same order. mpi4py is imported lazily, so it is only
+required when this module is actually used.
+
+Run e.g. the test with `mpirun -n 4 python -m pytest test/test_mpi.py`.
+"""
+
+import numpy as np
+
+from ..ensemble import propagate as propagate_serial
+
+
+def get_comm(comm=None):
+    r"""
+    @returns comm, or MPI.COMM_WORLD if comm is None
+    """
+    if comm is None:
+        from mpi4py import MPI
+
+        comm = MPI.COMM_WORLD
+    return comm
+
+
+def split(n: np.int32, size: np.int32):
+    r"""
+    @returns the (start, stop) of each of size nearly equal contiguous
+    chunks of range(n)
+    """
+    bounds = np.zeros(size + 1, dtype=np.int64)
+    bounds[1:] = np.cumsum([n // size + (r < n % size) for r in range(size)])
+    return [(int(bounds[r]), int(bounds[r + 1])) for r in range(size)]
+
+
+def scatter(samples, comm=None, root: np.int32 = 0):
+    r"""
+    Distributes contiguous chunks of the samples (an array or a list, only
+    needed on root) across the ranks of comm.
+
+    @returns the local chunk of samples on this rank, and the index of its
+    first sample in the full set
+    """
+    comm = get_comm(comm)
+    chunks = None
+    if comm.Get_rank() == root:
+        chunks = [
+            (samples[start:stop], start)
+            for start, stop in split(len(samples), comm.Get_size())
+        ]
+    return comm.scatter(chunks, root=root)
+
+
+def gather(local: np.ndarray, comm=None, root: np.int32 = 0):
+    r"""
+    Gathers each rank's (nlocal, ...) results, in rank order, into one array
+    on root (None on the other ranks), the inverse of `scatter`
+    """
+    comm = get_comm(comm)
+    parts = comm.gather(local, root=root)
+    if parts is None:
+        return None
+    return np.concatenate([p for p in parts if p is not None and len(p) > 0])
+
+
+def merge(a, b):
+    r"""
+    merges two ensemble summaries (anything with a `merge` method, e.g. an
+    EnsembleReducer or ElasticXSEnsemble), either of which may be None
+    """
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return a.merge(b)
+
+
+def reduce_ensemble(ensemble, comm=None, root: np.int32 = 0, all: bool = False):
+    r"""
+    Merges the ensemble summaries accumulated on each rank over disjoint sets
+    of samples (the online moments exactly, the quantile sketches with their
+    usual rank error guarantee).
+
+    @parameters:
+        ensemble : this rank's EnsembleReducer or ElasticXSEnsemble, or None
+            if it saw no samples
+        comm : communicator
+        root (int) : rank receiving the result
+        all (bool) : whether every rank receives the result
+    @returns:
+        the merged summary on root (or on every rank if `all`), else None
+    """
+    comm = get_comm(comm)
+    if all:
+        return comm.allreduce(ensemble, op=merge)
+    return comm.reduce(ensemble, op=merge, root=root)
+
+
+def propagate(
+    workspace,
+    interaction_scalar,
+    interaction_spin_orbit,
+    samples: list,
+    comm=None,
+    root: np.int32 = 0,
+    all: bool = False,
+    batch_size: np.int32 = 64,
+    covariance: bool = False,
+    capacity: np.int32 = 256,
+    seed=None,
+):
+    r"""
+    MPI version of `jitr.ensemble.propagate`: the samples are scattered from
+    root, each rank streams its chunk through its own copy of the workspace,
+    and the resulting online mean, covariance and quantile state is merged
+    across ranks, so observables for the individual samples are never
+    communicated.
+
+    @parameters:
+        workspace : a DifferentialWorkspace, MultiEnergyWorkspace or
+            IntegralWorkspace, constructed identically on every rank
+        interaction_scalar (callable) : scalar interaction
+        interaction_spin_orbit (callable) : spin-orbit interaction
+        samples (list) : (args_scalar, args_spin_orbit) for each sample; only
+            needed on root
+        comm : communicator, defaults to MPI.COMM_WORLD
+        root (int) : rank holding the samples and receiving the result
+        all (bool) : whether every rank receives the result
+        batch_size, covariance, capacity : see `jitr.ensemble.propagate`
+        seed : seed for the quantile sketches, from which an independent
+            stream is spawned for each rank
+    @returns:
+        the ElasticXSEnsemble over all samples on root (or on every rank if
+        `all`), else None
+    """
+    comm = get_comm(comm)
+    local, _ = scatter(samples, comm, root)
+    rank_seed = np.random.SeedSequence(seed).spawn(comm.Get_size())[comm.Get_rank()]
+    ensemble = None
+    if len(local) > 0:
+        ensemble = propagate_serial(
+            workspace,
+            interaction_scalar,
+            interaction_spin_orbit,
+            local,
+            batch_size=batch_size,
+            covariance=covariance,
+            capacity=capacity,
+            seed=rank_seed,
+        )
+    return reduce_ensemble(ensemble, comm, root, all)
+
+
+def run(workspaces, model, samples: np.ndarray, comm=None, root: np.int32 = 0):
+    r"""
+    MPI analog of `ParallelExecutor.run`: evaluates model(workspace, sample)
+    for every sample on every workspace (e.g. one per energy on a grid, or
+    per target), with the samples scattered across ranks and the results
+    gathered on root.
+
+    @parameters:
+        workspaces (list or dict) : workspaces, constructed identically on
+            every rank
+        model (callable) : function of (workspace, sample) returning an
+            array of fixed shape for each workspace, e.g. an `ElasticModel`
+        samples (np.ndarray) : (nsamples, nparams) samples; only needed on
+            root
+        comm : communicator, defaults to MPI.COMM_WORLD
+        root (int) : rank holding the samples and receiving the results
+    @returns:
+        on root, a list (or dict, if the workspaces were given as a dict)
+        with one array of shape (nsamples, *output shape) per workspace;
+        None on the other ranks
+    """
+    comm = get_comm(comm)
+    keys = list(workspaces.keys()) if isinstance(workspaces, dict) else None
+    workspaces = list(workspaces.values()) if keys is not None else list(workspaces)
+    if comm.Get_rank() == root:
+        samples = np.asarray(samples, dtype=np.float64)
+    local, _ = scatter(samples, comm, root)
+    local_results = [
+        np.array([model(workspace, sample) for sample in local])
+        for workspace in workspaces
+    ]
+    results = [gather(r, comm, root) for r in local_results]
+    if comm.Get_rank() != root:
+        return None
+    if keys is not None:
+        return dict(zip(keys, results))
+    return results
@@ -0,0 +1,189 @@
+import io
+import pickle
+from multiprocessing import shared_memory
+from typing import NamedTuple
+
+import numpy as np
+
+# byte alignment of each array within a shared memory block
+ALIGNMENT = 64
+
+# shared memory blocks attached in this process, by name
+attached = {}
+
+
+def attach(name: str):
+    r"""
+    @returns the shared memory block with the given name, attaching it on
+    first use in this process
+    """
+    shm = attached.get(name)
+    if shm is None:
+        shm = shared_memory.SharedMemory(name=name)
+        attached[name] = shm
+    return shm
+
+
+def detach(name: str):
+    r"""
+    closes this process' mapping of a shared memory block, if attached. Any
+    arrays viewing it must have been released.
+    """
+    shm = attached.pop(name, None)
+    if shm is not None:
+        shm.close()
+
+
+class SharedArray(NamedTuple):
+    r"""
+    Picklable handle to an array stored in a shared memory block; only the
+    handle is sent between processes, never the data
+    """
+
+    name: str
+    offset: int
+    shape: tuple
+    dtype: str
+    order: str = "C"
+
+    def array(self, writeable: bool = False):
+        r"""
+        @returns a view of the array in this process' mapping of the block
+        """
+        a = np.ndarray(
+            self.shape,
+            dtype=np.dtype(self.dtype),
+            buffer=attach(self.name).buf,
+            offset=self.offset,
+            order=self.order,
+        )
+        a.flags.writeable = writeable
+        return a
+
+
+def allocate(specs: list):
+    r"""
+    Allocates a single shared memory block holding a set of arrays.
+
+    @parameters:
+        specs (list) : (shape, dtype, order) of each array
+    @returns:
+        the SharedMemory block, which the caller must close and unlink, and a
+        SharedArray handle for each array
+    """
+    offsets = []
+    nbytes = 0
+    for shape, dtype, _ in specs:
+        nbytes = -(-nbytes // ALIGNMENT) * ALIGNMENT
+        offsets.append(nbytes)
+        nbytes += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+    attached[shm.name] = shm
+    handles = [
+        SharedArray(shm.name, offset, tuple(shape), np.dtype(dtype).str, order)
+        for offset, (shape, dtype, order) in zip(offsets, specs)
+    ]
+    return shm, handles
+
+
+def release(shm: shared_memory.SharedMemory):
+    r"""
+    closes and unlinks a block created by `allocate`
+    """
+    attached.pop(shm.name, None)
+    shm.close()
+    shm.unlink()
+
+
+class ArrayCollector(pickle.Pickler):
+    r"""
+    Pickler that pulls large numpy arrays out of the pickle stream, recording
+    them by index, so that they can be stored in shared memory
+    """
+
+    def __init__(self, file, min_bytes: int):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.min_bytes = min_bytes
+        self.arrays = []
+        self.index = {}
+
+    def persistent_id(self, obj):
+        if (
+            type(obj) is np.ndarray
+            and not obj.dtype.hasobject
+            and obj.nbytes >= self.min_bytes
+        ):
+            # the same array referenced from several places is stored once
+            key = id(obj)
+            if key not in self.index:
+                self.index[key] = len(self.arrays)
+                self.arrays.append(obj)
+            return ("jitr.parallel.SharedArray", self.index[key])
+        return None
+
+
+class ArrayLoader(pickle.Unpickler):
+    def __init__(self, file, arrays: list):
+        super().__init__(file)
+        self.arrays = arrays
+
+    def persistent_load(self, pid):
+        return self.arrays[pid[1]]
+
+
+class SharedObject:
+    r"""
+    A picklable object (e.g. a list of workspaces) whose large numpy arrays
+    are stored once in a single shared memory block. Pickling a SharedObject
+    only sends the pickle of the object with those arrays stripped out, plus a
+    handle to each of them, so that `load` in another process reconstructs
+    the object around read-only, zero-copy views of the shared arrays.
+
+    Objects that are mutated during use must not be shared this way, or must
+    exclude their mutable buffers from their pickled state, as e.g.
+    `SolverWorkspace` does.
+    """
+
+    def __init__(self, obj, min_bytes: int = 1024):
+        r"""
+        @parameters:
+            obj : the object to share
+            min_bytes (int) : arrays smaller than this are pickled inline
+        """
+        buf = io.BytesIO()
+        collector = ArrayCollector(buf, min_bytes)
+        collector.dump(obj)
+        self.payload = buf.getvalue()
+        arrays = collector.arrays
+        orders = [
+            "F" if a.flags.f_contiguous and not a.flags.c_contiguous else "C"
+            for a in arrays
+        ]
+        self.shm, self.handles = allocate(
+            [(a.shape, a.dtype, order) for a, order in zip(arrays, orders)]
+        )
+        for a, handle in zip(arrays, self.handles):
+            handle.array(writeable=True)[...] = a
+
+    @property
+    def nbytes(self):
+        r"""size of the shared block and of the per-process pickled state"""
+        return self.shm.size, len(self.payload)
+
+    def __getstate__(self):
+        return {"payload": self.payload, "handles": self.handles, "shm": None}
+
+    def load(self):
+        r"""
+        @returns the object, with its large arrays viewing shared memory
+        """
+        arrays = [handle.array() for handle in self.handles]
+        return ArrayLoader(io.BytesIO(self.payload), arrays).load()
+
+    def close(self):
+        r"""
+        releases the shared block; only valid in the process that created it
+        """
+        if self.shm is not None:
+            release(self.shm)
+            self.shm = None
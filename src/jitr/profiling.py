@@ -0,0 +1,224 @@
+r"""
+Opt-in stage-level timing and counters for the solve pipeline, e.g.
+
+    with jitr.profiling.profile(trace=True) as prof:
+        workspace.xs(...)
+    print(prof.summary())
+    prof.save_json("profile.json")
+    prof.save_trace("profile.trace.json")  # chrome://tracing or Perfetto
+
+The pipeline is instrumented with `stage` and `count`, which return at once
+when no profile is active, so the instrumentation can stay in production.
+Stage times are inclusive of nested stages.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+active = None
+
+
+class NullStage:
+    r"""the stage returned when profiling is disabled; does nothing"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_STAGE = NullStage()
+
+
+class Stage:
+    __slots__ = ("profile", "name", "l", "start")
+
+    def __init__(self, profile, name: str, l):
+        self.profile = profile
+        self.name = name
+        self.l = l
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.record(self.name, self.l, self.start, time.perf_counter())
+        return False
+
+
+def stage(name: str, l=None):
+    r"""
+    @returns a context manager timing the enclosed block as the stage `name`,
+    optionally attributed to partial wave l, in the active profile, if any
+    """
+    if active is None:
+        return NULL_STAGE
+    return Stage(active, name, l)
+
+
+def count(name: str, n=1, l=None):
+    r"""
+    increments the counter `name`, optionally attributed to partial wave l,
+    in the active profile, if any
+    """
+    if active is not None:
+        active.count(name, n, l)
+
+
+class Profile:
+    r"""
+    Accumulated wall time and number of calls per stage, and counters, in
+    total and per partial wave. If `trace` is set, every stage is also kept
+    as an event for a Chrome trace.
+    """
+
+    def __init__(self, trace: bool = False):
+        self.trace = trace
+        self.times = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.events = []
+        self.start = time.perf_counter()
+        self.stop = None
+
+    def record(self, name: str, l, start: float, end: float):
+        self.times[name, None] += end - start
+        self.calls[name, None] += 1
+        if l is not None:
+            self.times[name, int(l)] += end - start
+            self.calls[name, int(l)] += 1
+        if self.trace:
+            self.events.append(
+                (name, l, start, end, os.getpid(), threading.get_ident())
+            )
+
+    def count(self, name: str, n=1, l=None):
+        self.counters[name, None] += n
+        if l is not None:
+            self.counters[name, int(l)] += n
+
+    @property
+    def wall_time(self):
+        stop = self.stop if self.stop is not None else time.perf_counter()
+        return stop - self.start
+
+    def report(self):
+        r"""
+        @returns a dict with the wall time of the profile, and, for each
+        stage, its total time, number of calls, mean time per call and
+        fraction of the wall time, and for each counter its total, each
+        broken down by partial wave where attributed
+        """
+        wall_time = self.wall_time
+        stages = {}
+        for (name, l), t in sorted(self.times.items(), key=by_name_and_l):
+            entry = {
+                "time": t,
+                "calls": self.calls[name, l],
+                "mean": t / self.calls[name, l],
+            }
+            if l is None:
+                entry["fraction"] = t / wall_time if wall_time > 0 else 0.0
+                stages[name] = entry
+            else:
+                stages[name].setdefault("l", {})[l] = entry
+        counters = {}
+        for (name, l), n in sorted(self.counters.items(), key=by_name_and_l):
+            if l is None:
+                counters[name] = {"count": n}
+            else:
+                counters[name].setdefault("l", {})[l] = n
+        return {"wall_time": wall_time, "stages": stages, "counters": counters}
+
+    def save_json(self, filename):
+        with open(filename, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def chrome_trace(self):
+        r"""
+        @returns the stages as complete events, and the counters as counter
+        events at the end of the profile, in the Chrome trace event format
+        """
+        events = [
+            {
+                "name": name if l is None else f"{name} l={l}",
+                "cat": name,
+                "ph": "X",
+                "ts": (start - self.start) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": pid,
+                "tid": tid,
+                "args": {} if l is None else {"l": int(l)},
+            }
+            for name, l, start, end, pid, tid in self.events
+        ]
+        events += [
+            {
+                "name": name,
+                "ph": "C",
+                "ts": self.wall_time * 1e6,
+                "pid": os.getpid(),
+                "args": {"count": n},
+            }
+            for (name, l), n in self.counters.items()
+            if l is None
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_trace(self, filename):
+        if not self.trace:
+            raise ValueError("Profile was created without trace=True")
+        with open(filename, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def summary(self):
+        r"""
+        @returns a table of the stages, by total time, and the counters
+        """
+        report = self.report()
+        lines = [
+            f"wall time: {report['wall_time']:.6f} s",
+            f"{'stage':<28}{'time [s]':>12}{'calls':>10}{'mean [ms]':>12}{'%':>8}",
+        ]
+        for name, s in sorted(report["stages"].items(), key=lambda kv: -kv[1]["time"]):
+            lines.append(
+                f"{name:<28}{s['time']:>12.6f}{s['calls']:>10d}"
+                f"{s['mean'] * 1e3:>12.4f}{100 * s['fraction']:>8.1f}"
+            )
+        for name, c in report["counters"].items():
+            lines.append(f"{name:<28}{c['count']:>22d}")
+        return "\n".join(lines)
+
+
+def by_name_and_l(item):
+    (name, l), _ = item
+    return name, -1 if l is None else l
+
+
+@contextmanager
+def profile(trace: bool = False):
+    r"""
+    Enables profiling of the enclosed block, yielding the Profile, which
+    holds the results once the block exits. Profiles may be nested, in
+    which case the inner one records the stages within it.
+
+    @parameters:
+        trace (bool) : whether to keep each stage as an event, for
+            `Profile.save_trace`
+    """
+    global active
+    previous = active
+    active = Profile(trace)
+    try:
+        yield active
+    finally:
+        active.stop = time.perf_counter()
+        active = previous
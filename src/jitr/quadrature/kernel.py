@@ -1,6 +1,9 @@
+from collections import OrderedDict
+
 import numpy as np
 import scipy.special as sc
 
+from .. import profiling
 from .quadrature import (
     legendre,
     laguerre,
@@ -16,7 +19,18 @@ class Kernel:
         self,
         nbasis: np.int32,
         basis="Legendre",
+        bessel_cache_size: np.int32 = 64,
     ):
+        r"""
+        @parameters:
+            nbasis (int) : size of the basis
+            basis (str) : what basis/mesh to use (see Ch. 3 of Baye, 2015)
+            bessel_cache_size (int) : maximum number of spherical Bessel
+                matrices kept for Fourier-Bessel transforms (see
+                `bessel_matrix`)
+        """
+        self.basis = basis
+        self.bessel_cache_size = bessel_cache_size
         self.overlap = np.diag(np.ones(nbasis))
         if basis == "Legendre":
             x, w = generate_legendre_quadrature(nbasis)
@@ -39,6 +53,26 @@ class Kernel:
         self.upper_mask = np.triu_indices(nbasis)
         self.lower_mask = np.tril_indices(nbasis, k=-1)
 
+        # least-recently-used spherical Bessel matrices for Fourier-Bessel
+        # transforms
+        self.bessel_matrices = OrderedDict()
+
+    def __getstate__(self):
+        # the numba jitclass quadrature can't be pickled, but is fully
+        # determined by the basis size and type, so rebuild it on unpickling
+        return {
+            "nbasis": self.quadrature.nbasis,
+            "basis": self.basis,
+            "bessel_cache_size": self.bessel_cache_size,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(
+            state["nbasis"],
+            state["basis"],
+            state.get("bessel_cache_size", 64),
+        )
+
     def f(self, n: np.int32, a: np.float64, s: np.float64):
         return self.basis_function(n, a, s, self.quadrature)
 
@@ -74,46 +108,62 @@ class Kernel:
                 self.weight_matrix * f(self.Xn * a, self.Xm * a, *args)
             )
 
+    def bessel_matrix(self, l: np.int32, k: np.ndarray, a: np.float64):
+        r"""
+        @returns the (nk, nbasis) matrix of spherical Bessel functions
+        j_l(k r_i) at the mesh points r_i on [0,a], times the quadrature
+        weights and Jacobian a r_i^2, so that its product with a function on
+        the mesh is the Fourier-Bessel transform. The most recently used
+        `bessel_cache_size` matrices are cached per (l, a, k), and returned
+        read-only, as they are shared between callers.
+        """
+        k = np.ascontiguousarray(k, dtype=np.float64)
+        key = (int(l), float(a), k.size, hash(k.tobytes()))
+        J = self.bessel_matrices.get(key)
+        if J is not None:
+            self.bessel_matrices.move_to_end(key)
+            return J
+        r = self.quadrature.abscissa * a
+        J = sc.spherical_jn(l, np.outer(k, r)) * r**2 * self.quadrature.weights * a
+        J.flags.writeable = False
+        self.bessel_matrices[key] = J
+        if len(self.bessel_matrices) > self.bessel_cache_size:
+            self.bessel_matrices.popitem(last=False)
+        return J
+
+    def bessel_matrix_stack(self, l: np.ndarray, k: np.ndarray, a: np.float64):
+        r"""
+        @returns the `bessel_matrix` of each order in l, stacked into an
+        (nl, nk, nbasis) array, or the (nk, nbasis) matrix for scalar l
+        """
+        if np.ndim(l) == 0:
+            return self.bessel_matrix(l, k, a)
+        return np.array([self.bessel_matrix(li, k, a) for li in l])
+
     def fourier_bessel_transform(
         self, l: np.int32, f, k: np.array, a: np.float64, *args
     ):
         """
         performs a Fourier-Bessel transform of order l from r->k coordinates
-        with r on [0,a]
+        with r on [0,a]. If l is an array of orders, returns the (nl, nk)
+        transforms of each, evaluating f only once.
         """
         r = self.quadrature.abscissa * a
-        kr = np.outer(k, r)
-        return np.sum(
-            sc.spherical_jn(l, kr) * r**2 * f(r, *args) * self.quadrature.weights,
-            axis=1,
-        )
+        return self.bessel_matrix_stack(l, np.atleast_1d(k), a) @ f(r, *args)
 
     def double_fourier_bessel_transform(
-        self, l: np.int32, f, k: np.float64, a: np.float64, *args
+        self, l: np.int32, f, k: np.array, a: np.float64, *args
     ):
         """
         performs a double Fourier-Bessel transform of f(r,r') of order l, going
-        from f(r,r')->F(k,k') coordinates with r/r' on [0,a]
+        from f(r,r')->F(k,k') coordinates with r/r' on [0,a]. If l is an array
+        of orders, returns the (nl, nk, nk) transforms of each, evaluating f
+        only once.
         """
-        N = self.quadrature.nbasis
         r = self.quadrature.abscissa * a
-        jkr = sc.spherical_j(l, np.outer(k, r))
-        F_kkp = np.zeros((N, N), dtype=np.complex128)
-        F_rkp = np.zeros((N, N), dtype=np.complex128)
-
-        # integrate over rp at each r
-        for i in range(N):
-            F_rkp[i, :] = np.sum(
-                jkr * r**2 * f(r[i], r, *args) * self.quadrature.weights, axis=1
-            )
-
-        # integrate over r at each kp
-        for i in range(N):
-            F_kkp[:, i] = np.sum(
-                jkr * r**2 * F_rkp[:, i] * self.quadrature.weights, axis=1
-            )
-
-        return F_kkp * 2 / np.pi
+        F = f(r[:, np.newaxis], r[np.newaxis, :], *args)
+        J = self.bessel_matrix_stack(l, np.atleast_1d(k), a)
+        return J @ F @ np.swapaxes(J, -1, -2) * 2 / np.pi
 
     def dwba_local(
         self,
@@ -158,16 +208,74 @@ class Kernel:
         # reduce
         return bra.T @ Vnm @ ket
 
+    def dwba_local_batch(
+        self,
+        bras: np.ndarray,
+        kets: np.ndarray,
+        form_factors: np.ndarray,
+        pairs: np.ndarray = None,
+    ):
+        r"""
+        @returns the DWBA matrix elements of a set of local operators between
+        stacks of distorted waves, as in `dwba_local`, with each operator
+        evaluated on the mesh only once.
+        @parameters:
+            bras (np.ndarray) : (nbra, nbasis) Lagrange coefficients
+            kets (np.ndarray) : (nket, nbasis) Lagrange coefficients
+            form_factors (np.ndarray) : (nop, nbasis) operators on the mesh,
+                e.g. stacked from `matrix_local` for each operator or multipole
+            pairs (np.ndarray) : optional (npairs, 3) integer array of
+                (bra, ket, operator) indices of the elements to compute
+        @returns:
+            the (nop, nbra, nket) tensor of all matrix elements, or, if pairs
+            is given, the (npairs,) matrix elements of each
+        """
+        if pairs is None:
+            return (bras[np.newaxis, :, :] * form_factors[:, np.newaxis, :]) @ kets.T
+        i, j, p = np.asarray(pairs).T
+        return np.einsum("kn,kn,kn->k", bras[i], form_factors[p], kets[j])
+
+    def dwba_nonlocal_batch(
+        self,
+        bras: np.ndarray,
+        kets: np.ndarray,
+        operators: np.ndarray,
+        pairs: np.ndarray = None,
+    ):
+        r"""
+        @returns the DWBA matrix elements of a set of nonlocal operators
+        between stacks of distorted waves, as in `dwba_nonlocal`, with each
+        operator built on the mesh only once.
+        @parameters:
+            bras (np.ndarray) : (nbra, nbasis) Lagrange coefficients
+            kets (np.ndarray) : (nket, nbasis) Lagrange coefficients
+            operators (np.ndarray) : (nop, nbasis, nbasis) operators in the
+                Lagrange basis, e.g. stacked from `matrix_nonlocal`
+            pairs (np.ndarray) : optional (npairs, 3) integer array of
+                (bra, ket, operator) indices of the elements to compute
+        @returns:
+            the (nop, nbra, nket) tensor of all matrix elements, or, if pairs
+            is given, the (npairs,) matrix elements of each
+        """
+        # the operators acting on every ket, (nop, nbasis, nket)
+        Vkets = operators @ kets.T
+        if pairs is None:
+            return bras[np.newaxis, :, :] @ Vkets
+        i, j, p = np.asarray(pairs).T
+        return np.einsum("kn,kn->k", bras[i], Vkets[p, :, j])
+
     def matrix_local(self, f, a: np.float64, args=()):
         r"""
         @returns matrix (np.ndarray): diagonal elements of arbitrary vectorized
             operator f(x) in lagrange basis
         """
-        return f(self.quadrature.abscissa * a, *args)
+        with profiling.stage("potential"):
+            return f(self.quadrature.abscissa * a, *args)
 
     def matrix_nonlocal(self, f, a: np.float64, is_symmetric=True, args=()):
         r"""
         @returns matrix (np.ndarray): arbitrary vectorized operator f(x,xp) in
             lagrange basis
         """
-        return np.sqrt(self.weight_matrix) * f(self.Xn * a, self.Xm * a, *args) * a
+        with profiling.stage("potential"):
+            return np.sqrt(self.weight_matrix) * f(self.Xn * a, self.Xm * a, *args) * a
@@ -12,17 +12,12 @@ def laguerre(n: np.int32, a: np.float64, s: np.float64, quadrature):
     Note: n is indexed from 1 (constant function is not part of basis)
     """
     assert n <= quadrature.nbasis and n >= 1
-
+    N = quadrature.nbasis
     x = s / a
     xn = quadrature.abscissa[n - 1]
 
     return (
-        (-1) ** n
-        / np.sqrt(xn)
-        * sc.special.eval_laguerre(n, x)
-        / (x - xn)
-        * x
-        * np.exp(-x / 2)
+        (-1) ** n / np.sqrt(xn) * sc.eval_laguerre(N, x) / (x - xn) * x * np.exp(-x / 2)
     )
 
 
@@ -102,7 +97,9 @@ class LagrangeLaguerreQuadrature:
         if overlap is None:
             # Eq. 3.71 in Baye, 2015
             imj = np.arange(self.nbasis) - np.arange(self.nbasis)[:, np.newaxis]
-            self.overlap += (-1) ** imj / np.sqrt(np.outer(abscissa, abscissa))
+            self.overlap = np.diag(np.ones(self.nbasis)) + (-1.0) ** imj / np.sqrt(
+                np.outer(abscissa, abscissa)
+            )
         else:
             self.overlap = overlap
 
@@ -217,3 +214,58 @@ class LagrangeLegendreQuadrature:
                 F[n - 1, m - 1] = self.kinetic_operator_element(n, m, a, l)
         F = F + np.triu(F, k=1).T
         return F
+
+    def lagrange_derivatives(self):
+        r"""
+        @returns D, with D[k, i] the derivative of the ith Lagrange polynomial
+        on [0,1] (without the regularization x of the basis) at the kth mesh
+        point, from the barycentric form of the Lagrange polynomials
+        """
+        N = self.nbasis
+        x = self.abscissa
+        w = np.ones(N)
+        for i in range(N):
+            for j in range(N):
+                if i != j:
+                    w[i] /= x[i] - x[j]
+        D = np.zeros((N, N))
+        for k in range(N):
+            for i in range(N):
+                if i != k:
+                    D[k, i] = w[i] / w[k] / (x[k] - x[i])
+                    D[k, k] += 1.0 / (x[k] - x[i])
+        return D
+
+    def sector_kinetic_matrix(self, a0: float64, h: float64, l: int32):
+        r"""
+        @returns the kinetic operator matrix, plus the Bloch operators at both
+        ends, in the (unregularized) Lagrange Legendre basis on the sector
+        [a0, a0 + h] of dimensionless radii, for R-matrix propagation (see
+        Baye, Hesse and Vincke, 2002, Phys. Rev. C 65, 024601). As the basis
+        does not vanish at a0, the sector must not contain the origin.
+        """
+        # with the Bloch operators, T_nm = <f_n'|f_m'>, which is exact in
+        # Gauss quadrature, and f_n(x_k) = delta_nk / sqrt(w_n)
+        D = self.lagrange_derivatives() / np.sqrt(self.weights)[np.newaxis, :]
+        T = (D.T * self.weights[np.newaxis, :]) @ D / h**2
+        F = T.astype(np.complex128)
+        for n in range(self.nbasis):
+            F[n, n] += l * (l + 1) / (a0 + h * self.abscissa[n]) ** 2
+        return F
+
+    def sector_boundaries(self, h: float64):
+        r"""
+        @returns the values of the (unregularized) Lagrange Legendre basis
+        functions on a sector of width h at its left and right ends, as an
+        (nbasis, 2) array
+        """
+        N = self.nbasis
+        x = self.abscissa
+        b = np.ones((N, 2))
+        for i in range(N):
+            for j in range(N):
+                if i != j:
+                    b[i, 0] *= (0.0 - x[j]) / (x[i] - x[j])
+                    b[i, 1] *= (1.0 - x[j]) / (x[i] - x[j])
+            b[i, :] /= np.sqrt(self.weights[i] * h)
+        return b
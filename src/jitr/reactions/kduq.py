@@ -13,7 +13,14 @@ import json
 import numpy as np
 
 from ..utils.constants import MASS_PION
-from .potentials import woods_saxon_safe, woods_saxon_prime_safe, thomas_safe
+from .potentials import (
+    woods_saxon_safe,
+    woods_saxon_prime_safe,
+    thomas_safe,
+    woods_saxon_gradient_safe,
+    woods_saxon_prime_gradient_safe,
+    thomas_gradient_safe,
+)
 
 
 def Vv(E, v1, v2, v3, v4, Ef):
@@ -70,6 +77,52 @@ def KD_spin_orbit(r, vso, rso, aso, wso, rwso, awso):
     ) + 1j * wso / MASS_PION**2 * thomas_safe(r, rwso, awso)
 
 
+def KD_scalar_grad(r, vv, rv, av, wv, rwv, awv, wd, rd, ad):
+    r"""derivatives of `KD_scalar` w.r.t. each of its parameters, in the
+    order they are passed in, as an array of shape (9, nr)
+    """
+    ws_v = woods_saxon_safe(r, rv, av)
+    ws_wv = woods_saxon_safe(r, rwv, awv)
+    wsp_d = woods_saxon_prime_safe(r, rd, ad)
+    dws_v = woods_saxon_gradient_safe(r, rv, av)
+    dws_wv = woods_saxon_gradient_safe(r, rwv, awv)
+    dwsp_d = woods_saxon_prime_gradient_safe(r, rd, ad)
+    return np.array(
+        [
+            -ws_v,
+            -vv * dws_v[0],
+            -vv * dws_v[1],
+            -1j * ws_wv,
+            -1j * wv * dws_wv[0],
+            -1j * wv * dws_wv[1],
+            4j * ad * wsp_d,
+            4j * ad * wd * dwsp_d[0],
+            4j * wd * (wsp_d + ad * dwsp_d[1]),
+        ]
+    )
+
+
+def KD_spin_orbit_grad(r, vso, rso, aso, wso, rwso, awso):
+    r"""derivatives of `KD_spin_orbit` w.r.t. each of its parameters, in the
+    order they are passed in, as an array of shape (6, nr)
+    """
+    dth_so = thomas_gradient_safe(r, rso, aso)
+    dth_wso = thomas_gradient_safe(r, rwso, awso)
+    return (
+        np.array(
+            [
+                thomas_safe(r, rso, aso),
+                vso * dth_so[0],
+                vso * dth_so[1],
+                1j * thomas_safe(r, rwso, awso),
+                1j * wso * dth_wso[0],
+                1j * wso * dth_wso[1],
+            ]
+        )
+        / MASS_PION**2
+    )
+
+
 class KDGlobal:
     r"""Global optical potential in Koning-Delaroche form."""
 
@@ -63,6 +63,31 @@ def thomas_safe(r, R, a):
         return V
 
 
+def woods_saxon_gradient_safe(r, R, a):
+    """gradient of the Woods-Saxon form factor w.r.t. $R$ and $a$, as an array
+    of shape (2, nr). Avoids `exp` overflows"""
+    x = (r - R) / a
+    f = woods_saxon_safe(r, R, a)
+    fp = -f * (1 - f)  # derivative w.r.t. x
+    return np.array([-fp / a, -x * fp / a])
+
+
+def woods_saxon_prime_gradient_safe(r, R, a):
+    """gradient of the derivative of the Woods-Saxon form factor w.r.t. $r$,
+    w.r.t. $R$ and $a$, as an array of shape (2, nr). Avoids `exp` overflows"""
+    x = (r - R) / a
+    f = woods_saxon_safe(r, R, a)
+    fp = -f * (1 - f)  # first derivative w.r.t. x
+    fpp = -fp * (1 - 2 * f)  # second derivative w.r.t. x
+    return np.array([-fpp / a**2, -(fp + x * fpp) / a**2])
+
+
+def thomas_gradient_safe(r, R, a):
+    """gradient of the Thomas form factor (see `thomas_safe`) w.r.t. $R$ and
+    $a$, as an array of shape (2, nr). Avoids `exp` overflows"""
+    return woods_saxon_prime_gradient_safe(r, R, a) / r
+
+
 def surface_peaked_gaussian_potential(r, *params):
     V, W, R, a = params
     return (V + 1j * W) * np.exp(-((r - R) ** 2) / (2 * np.pi * a) ** 2)
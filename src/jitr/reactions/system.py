@@ -1,5 +1,6 @@
 import numpy as np
 
+from .. import profiling
 from ..utils.free_solutions import (
     H_plus,
     H_minus,
@@ -152,50 +153,65 @@ class ProjectileTargetSystem:
         channels = []
         asymptotics = []
         for l in range(0, self.lmax + 1):
-            num_channels = self.couplings[l].shape[0]
-            eta_array = uniform_array_from_scalar_or_array(eta, num_channels)
-            channels.append(
-                Channels(
-                    uniform_array_from_scalar_or_array(Ecm, num_channels),
-                    uniform_array_from_scalar_or_array(k, num_channels),
-                    uniform_array_from_scalar_or_array(mu, num_channels),
-                    eta_array,
-                    self.channel_radius,
-                    np.ones(num_channels) * l,
-                    self.couplings[l],
-                )
-            )
-            asymptotics.append(
-                Asymptotics(
-                    Hp=np.array(
-                        [
-                            H_plus(self.channel_radius, l, channel_eta)
-                            for channel_eta in eta_array
-                        ],
-                        dtype=np.complex128,
-                    ),
-                    Hm=np.array(
-                        [
-                            H_minus(self.channel_radius, l, channel_eta)
-                            for channel_eta in eta_array
-                        ],
-                        dtype=np.complex128,
-                    ),
-                    Hpp=np.array(
-                        [
-                            H_plus_prime(self.channel_radius, l, channel_eta)
-                            for channel_eta in eta_array
-                        ],
-                        dtype=np.complex128,
-                    ),
-                    Hmp=np.array(
-                        [
-                            H_minus_prime(self.channel_radius, l, channel_eta)
-                            for channel_eta in eta_array
-                        ],
-                        dtype=np.complex128,
-                    ),
-                )
+            ch, asym = self.partial_wave_channels(l, Ecm, mu, k, eta)
+            channels.append(ch)
+            asymptotics.append(asym)
+
+        return channels, asymptotics
+
+    def partial_wave_channels(
+        self,
+        l,
+        Ecm,
+        mu,
+        k,
+        eta,
+    ):
+        r"""
+        returns the Channels and Asymptotics of partial wave l
+        """
+        num_channels = self.couplings[l].shape[0]
+        eta_array = uniform_array_from_scalar_or_array(eta, num_channels)
+        channels = Channels(
+            uniform_array_from_scalar_or_array(Ecm, num_channels),
+            uniform_array_from_scalar_or_array(k, num_channels),
+            uniform_array_from_scalar_or_array(mu, num_channels),
+            eta_array,
+            self.channel_radius,
+            np.ones(num_channels) * l,
+            self.couplings[l],
+        )
+        # the Coulomb functions are evaluated in arbitrary precision
+        with profiling.stage("asymptotics", l):
+            asymptotics = Asymptotics(
+                Hp=np.array(
+                    [
+                        H_plus(self.channel_radius, l, channel_eta)
+                        for channel_eta in eta_array
+                    ],
+                    dtype=np.complex128,
+                ),
+                Hm=np.array(
+                    [
+                        H_minus(self.channel_radius, l, channel_eta)
+                        for channel_eta in eta_array
+                    ],
+                    dtype=np.complex128,
+                ),
+                Hpp=np.array(
+                    [
+                        H_plus_prime(self.channel_radius, l, channel_eta)
+                        for channel_eta in eta_array
+                    ],
+                    dtype=np.complex128,
+                ),
+                Hmp=np.array(
+                    [
+                        H_minus_prime(self.channel_radius, l, channel_eta)
+                        for channel_eta in eta_array
+                    ],
+                    dtype=np.complex128,
+                ),
             )
 
         return channels, asymptotics
@@ -1,2 +1,6 @@
 from .rmatrix import Solver
+from .block_sparse import BlockSparseMatrix
+from .workspace import SolverWorkspace
+from .propagation import PropagationSolver
+from .poles import PoleFinder, Pole
 from . import core
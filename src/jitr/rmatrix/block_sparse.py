@@ -0,0 +1,254 @@
+import numpy as np
+
+
+class BlockSparseMatrix:
+    r"""
+    Block-sparse (BSR-like) representation of an operator in the multichannel
+    Lagrange basis. The full operator is an (nch x nbasis) x (nch x nbasis)
+    matrix made up of nch x nch channel blocks, each of size nbasis x nbasis.
+    Only the nonzero channel blocks are stored, keyed by their (i, j) channel
+    indices. Blocks that are diagonal in Lagrange space (e.g. local operators
+    in the Gauss approximation) are stored as vectors of their nbasis diagonal
+    elements, all other blocks as full (nbasis, nbasis) matrices.
+
+    Arithmetic with other BlockSparseMatrix instances stays block-sparse, while
+    arithmetic with a dense np.ndarray produces a dense np.ndarray, so either
+    representation may be passed to the Solver.
+    """
+
+    # defer to our reflected operators in mixed arithmetic with np.ndarray
+    __array_ufunc__ = None
+
+    def __init__(
+        self,
+        nch: np.int32,
+        nbasis: np.int32,
+        blocks: dict = None,
+        dtype=np.complex128,
+    ):
+        r"""
+        @parameters:
+            nch (int) : number of channels
+            nbasis (int) : size of the Lagrange basis in each channel
+            blocks (dict) : maps channel indices (i, j) to either an (nbasis,)
+                array holding the diagonal of the block, or a full
+                (nbasis, nbasis) block. Missing blocks are zero.
+            dtype : type of the matrix elements
+        """
+        self.nch = nch
+        self.nbasis = nbasis
+        self.dtype = np.dtype(dtype)
+        self.blocks = {}
+        if blocks is not None:
+            for (i, j), data in blocks.items():
+                self.set_block(i, j, data)
+
+    @classmethod
+    def from_local(cls, Vl: np.ndarray):
+        r"""
+        @returns the block-sparse matrix corresponding to a local operator
+        @parameters:
+            Vl (np.ndarray) : (nch, nch, nbasis) array of the diagonal elements
+                of each channel block; blocks that are identically zero are
+                not stored
+        """
+        nch, _, nb = Vl.shape
+        m = cls(nch, nb, dtype=np.result_type(Vl.dtype, np.complex128))
+        for i, j in zip(*np.nonzero(np.any(Vl != 0, axis=2))):
+            m.blocks[(i, j)] = np.array(Vl[i, j], dtype=m.dtype)
+        return m
+
+    @classmethod
+    def from_nonlocal(cls, Vnl: np.ndarray):
+        r"""
+        @returns the block-sparse matrix corresponding to a nonlocal operator
+        @parameters:
+            Vnl (np.ndarray) : (nch, nch, nbasis, nbasis) array of channel
+                blocks; blocks that are identically zero are not stored
+        """
+        nch, _, nb, _ = Vnl.shape
+        m = cls(nch, nb, dtype=np.result_type(Vnl.dtype, np.complex128))
+        for i, j in zip(*np.nonzero(np.any(Vnl != 0, axis=(2, 3)))):
+            m.blocks[(i, j)] = np.array(Vnl[i, j], dtype=m.dtype)
+        return m
+
+    @classmethod
+    def block_diagonal(cls, blocks: list):
+        r"""
+        @returns the block-sparse matrix with `blocks` on the channel diagonal
+        @parameters:
+            blocks (list) : for each channel, either the (nbasis,) diagonal or
+                the full (nbasis, nbasis) block
+        """
+        nb = blocks[0].shape[0]
+        m = cls(len(blocks), nb)
+        for i, data in enumerate(blocks):
+            m.set_block(i, i, data)
+        return m
+
+    @property
+    def shape(self):
+        sz = self.nch * self.nbasis
+        return (sz, sz)
+
+    @property
+    def ndim(self):
+        return 2
+
+    @property
+    def nnz_blocks(self):
+        r"""number of stored (nonzero) channel blocks"""
+        return len(self.blocks)
+
+    @property
+    def nbytes(self):
+        r"""number of bytes used to store the block data"""
+        return sum(data.nbytes for data in self.blocks.values())
+
+    def is_block_diagonal(self):
+        r"""whether all stored blocks are on the channel diagonal"""
+        return all(i == j for (i, j) in self.blocks)
+
+    def set_block(self, i: np.int32, j: np.int32, data: np.ndarray):
+        r"""store `data`, either the diagonal or the full (i,j) block"""
+        data = np.asarray(data)
+        assert data.shape in ((self.nbasis,), (self.nbasis, self.nbasis))
+        self.blocks[(i, j)] = np.array(data, dtype=self.dtype)
+
+    def block(self, i: np.int32, j: np.int32 = None):
+        r"""
+        @returns the (i,j) channel block as a dense (nbasis, nbasis) matrix
+        """
+        if j is None:
+            j = i
+        data = self.blocks.get((i, j))
+        if data is None:
+            return np.zeros((self.nbasis, self.nbasis), dtype=self.dtype)
+        if data.ndim == 1:
+            return np.diag(data)
+        return data.copy()
+
+    def todense(self, out: np.ndarray = None):
+        r"""
+        @returns the full (nch x nbasis, nch x nbasis) matrix. If `out` is
+        provided, the matrix is written into it in place.
+        """
+        if out is None:
+            out = np.zeros(self.shape, dtype=self.dtype)
+        else:
+            out[...] = 0
+        return self.add_to(out)
+
+    def add_to(self, out: np.ndarray, scale=1):
+        r"""
+        adds scale times this matrix to the dense (nch x nbasis, nch x nbasis)
+        matrix `out` in place
+        """
+        nb = self.nbasis
+        assert out.shape == self.shape
+        idx = np.arange(nb)
+        for (i, j), data in self.blocks.items():
+            if data.ndim == 1:
+                out[i * nb + idx, j * nb + idx] += scale * data
+            else:
+                out[i * nb : (i + 1) * nb, j * nb : (j + 1) * nb] += scale * data
+        return out
+
+    def copy(self):
+        m = BlockSparseMatrix(self.nch, self.nbasis, dtype=self.dtype)
+        m.blocks = {key: data.copy() for key, data in self.blocks.items()}
+        return m
+
+    def __array__(self, dtype=None, copy=None):
+        dense = self.todense()
+        if dtype is not None:
+            dense = dense.astype(dtype)
+        return dense
+
+    def __getitem__(self, key):
+        return self.todense()[key]
+
+    def __matmul__(self, x: np.ndarray):
+        r"""
+        product with a dense vector or matrix with leading dimension
+        (nch x nbasis), without forming the dense operator
+        """
+        nb = self.nbasis
+        x = np.asarray(x)
+        y = np.zeros(
+            (self.shape[0],) + x.shape[1:], dtype=np.result_type(self.dtype, x.dtype)
+        )
+        for (i, j), data in self.blocks.items():
+            xj = x[j * nb : (j + 1) * nb]
+            if data.ndim == 1:
+                y[i * nb : (i + 1) * nb] += (
+                    data.reshape((nb,) + (1,) * (x.ndim - 1)) * xj
+                )
+            else:
+                y[i * nb : (i + 1) * nb] += data @ xj
+        return y
+
+    def _combine(self, other, sign):
+        assert other.nch == self.nch and other.nbasis == self.nbasis
+        result = self.copy()
+        result.dtype = np.result_type(self.dtype, other.dtype)
+        for key, data in other.blocks.items():
+            if key not in result.blocks:
+                result.blocks[key] = np.array(sign * data, dtype=result.dtype)
+                continue
+            mine = result.blocks[key]
+            if mine.ndim == data.ndim:
+                result.blocks[key] = mine + sign * data
+            elif mine.ndim == 1:
+                full = np.array(sign * data, dtype=result.dtype)
+                full[np.diag_indices(self.nbasis)] += mine
+                result.blocks[key] = full
+            else:
+                full = np.array(mine, dtype=result.dtype)
+                full[np.diag_indices(self.nbasis)] += sign * data
+                result.blocks[key] = full
+        return result
+
+    def __add__(self, other):
+        if isinstance(other, BlockSparseMatrix):
+            return self._combine(other, 1)
+        if isinstance(other, np.ndarray):
+            return self.todense() + other
+        return NotImplemented
+
+    def __radd__(self, other):
+        if isinstance(other, np.ndarray):
+            return other + self.todense()
+        return NotImplemented
+
+    def __sub__(self, other):
+        if isinstance(other, BlockSparseMatrix):
+            return self._combine(other, -1)
+        if isinstance(other, np.ndarray):
+            return self.todense() - other
+        return NotImplemented
+
+    def __rsub__(self, other):
+        if isinstance(other, np.ndarray):
+            return other - self.todense()
+        return NotImplemented
+
+    def __neg__(self):
+        return self * -1
+
+    def __mul__(self, scalar):
+        if not np.isscalar(scalar):
+            return NotImplemented
+        m = BlockSparseMatrix(
+            self.nch, self.nbasis, dtype=np.result_type(self.dtype, scalar)
+        )
+        m.blocks = {key: data * scalar for key, data in self.blocks.items()}
+        return m
+
+    def __rmul__(self, scalar):
+        return self.__mul__(scalar)
+
+    def __truediv__(self, scalar):
+        if not np.isscalar(scalar):
+            return NotImplemented
+        return self * (1.0 / scalar)
@@ -1,5 +1,5 @@
 import numpy as np
-from numba import int32, float64, njit
+from numba import int32, float64, complex128, njit
 
 
 @njit
@@ -78,3 +78,100 @@ def solution_coeffs_with_inverse(
     """
     x = (b * uext_prime_boundary[:, np.newaxis]).reshape(nchannels * nbasis)
     return (Ainv @ x).reshape(nchannels, nbasis)
+
+
+@njit
+def boundary_rhs(
+    X: complex128[:, :], b: complex128[:], nchannels: int32, nbasis: int32
+):
+    r"""
+    Fills X in place with the block-diagonal (nchannels x nbasis, nchannels)
+    matrix holding the Lagrange function boundary values b in each channel
+    """
+    X[:, :] = 0
+    for i in range(nchannels):
+        X[i * nbasis : (i + 1) * nbasis, i] = b
+
+
+@njit
+def rmatrix_from_solution(
+    R: complex128[:, :],
+    X: complex128[:, :],
+    b: complex128[:],
+    nchannels: int32,
+    nbasis: int32,
+    a: float64,
+):
+    r"""
+    Eqn 15 in Descouvemont, 2016, written into R in place, given the solution
+    X = A^{-1} B of the Bloch-Schrödinger equation with the block-diagonal
+    boundary value right hand side B (see `boundary_rhs`), rather than the
+    full inverse of A
+    """
+    for i in range(nchannels):
+        for j in range(nchannels):
+            Rij = 0.0j
+            for n in range(nbasis):
+                Rij += b[n] * X[i * nbasis + n, j]
+            R[i, j] = Rij / a**2
+
+
+@njit
+def smatrix_operands(
+    Zp: complex128[:, :],
+    Zm: complex128[:, :],
+    R: complex128[:, :],
+    Hp: complex128[:],
+    Hm: complex128[:],
+    Hpp: complex128[:],
+    Hmp: complex128[:],
+    a: float64,
+):
+    r"""Eqn 17 in Descouvemont, 2016, written into Zp and Zm in place"""
+    nchannels = R.shape[0]
+    for i in range(nchannels):
+        for j in range(nchannels):
+            Zp[i, j] = -R[i, j] * Hpp[i] * a
+            Zm[i, j] = -R[i, j] * Hmp[i] * a
+        Zp[i, i] += Hp[i]
+        Zm[i, i] += Hm[i]
+
+
+@njit
+def external_derivative_at_boundary(
+    uext_prime_boundary: complex128[:],
+    S: complex128[:, :],
+    Hpp: complex128[:],
+    Hmp: complex128[:],
+    incoming_weights: float64[:],
+):
+    r"""
+    Derivative of the asymptotic channel wavefunctions evaluated at the
+    channel radius, written into uext_prime_boundary in place
+    """
+    nchannels = S.shape[0]
+    for i in range(nchannels):
+        SHpp = 0.0j
+        for j in range(nchannels):
+            SHpp += S[i, j] * Hpp[j]
+        uext_prime_boundary[i] = 0.5j * (Hmp[i] * incoming_weights[i] - SHpp)
+
+
+@njit
+def solution_coeffs_from_solution(
+    x: complex128[:, :],
+    X: complex128[:, :],
+    uext_prime_boundary: complex128[:],
+    nchannels: int32,
+    nbasis: int32,
+):
+    r"""
+    Multichannel wavefunction coefficients in Lagrange-Legendre coordinates,
+    written into x in place, given X = A^{-1} B (see `rmatrix_from_solution`)
+    """
+    for i in range(nchannels):
+        for n in range(nbasis):
+            xin = 0.0j
+            for j in range(nchannels):
+                xin += X[i * nbasis + n, j] * uext_prime_boundary[j]
+            x[i, n] = xin
@@ -0,0 +1,240 @@
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.linalg as la
+
+from .. import profiling
+from ..utils.constants import ALPHA, HBARC
+from ..utils.free_solutions import H_plus, H_plus_prime
+from .rmatrix import Solver
+
+
+@dataclass
+class Pole:
+    r"""
+    A pole of the S-matrix at complex center of mass energy E = E_r - i G/2
+    [MeV], found in `iterations` Newton steps
+    """
+
+    energy: np.complex128
+    iterations: np.int32
+
+    @property
+    def resonance_energy(self):
+        return self.energy.real
+
+    @property
+    def width(self):
+        return -2 * self.energy.imag
+
+
+class PoleFinder:
+    r"""
+    Finds the poles of the S-matrix of a partial wave in the complex energy
+    plane, i.e. the energies and widths of its resonances, without scanning
+    in energy.
+
+    The Bloch-augmented mesh Hamiltonian C, in physical units on [0, a], is
+    independent of the energy, so it is diagonalized once. Its eigenvalues,
+    the poles of the R-matrix, seed the search, and its eigenvectors give
+    the R-matrix and its energy derivative analytically at any complex
+    energy, in the form
+        R(E) = hbar^2/(2 mu a^2) sum_n g_n g_n^T / (e_n - E).
+    Each seed is refined with Newton iterations on det(Z+) = 0, which, up to
+    factors without zeros, is det(R^-1 - L) = 0 with L = rho H+'/H+ the
+    logarithmic derivative of the outgoing Coulomb-Hankel functions, at
+    complex wavenumber. The latter form is regular at the seeds.
+
+    All channels share the reduced mass and energy, as in `Solver.solve`
+    for a single partition.
+    """
+
+    def __init__(
+        self,
+        solver: Solver,
+        channel_radius: np.float64,
+        mu: np.float64,
+        l: np.ndarray,
+        Zz: np.float64 = 0,
+        local_interaction=None,
+        local_args=None,
+        nonlocal_interaction=None,
+        nonlocal_args=None,
+    ):
+        r"""
+        @parameters:
+            solver (Solver) : the solver defining the Lagrange mesh
+            channel_radius (float) : channel radius a [fm]
+            mu (float) : reduced mass [MeV]
+            l (np.ndarray) : orbital angular momentum in each channel
+            Zz (float) : product of the projectile and target charges
+            local_interaction, local_args, nonlocal_interaction,
+            nonlocal_args : the interaction, as in `Solver.solve`
+        """
+        self.channel_radius = channel_radius
+        self.mu = mu
+        self.l = np.atleast_1d(l).astype(np.int64)
+        self.Zz = Zz
+        nch = self.l.size
+        nb = solver.kernel.quadrature.nbasis
+
+        # the Bloch-augmented Hamiltonian [MeV] in physical units, i.e. with
+        # k0 = E0 = 1 in the scaled representation of `Solver`
+        hbar2_2mu = HBARC**2 / (2 * mu)
+        C = (
+            solver.kinetic_matrix(channel_radius, self.l).todense() * hbar2_2mu
+            + solver.interaction_matrix(
+                1.0,
+                1.0,
+                channel_radius,
+                nch,
+                local_interaction,
+                local_args,
+                nonlocal_interaction,
+                nonlocal_args,
+            ).todense()
+        )
+        O = np.kron(np.eye(nch), solver.kernel.overlap)
+
+        with profiling.stage("pole_seeds"):
+            if np.count_nonzero(C.imag) == 0:
+                e, v = la.eigh(C.real, O)
+            else:
+                # complex symmetric, with eigenvectors normalized as v^T O v = 1
+                e, v = la.eig(C, O)
+                v = v / np.sqrt(np.einsum("in,ij,jn->n", v, O, v))
+                order = np.argsort(e.real)
+                e, v = e[order], v[:, order]
+
+        b = solver.precompute_boundaries(channel_radius)
+        self.energies = e
+        # (nbasis x nch, nch) reduced width amplitudes g_n
+        self.amplitudes = np.einsum("j,nij->ni", b, v.T.reshape(nch * nb, nch, nb))
+        self.scale = hbar2_2mu / channel_radius**2
+
+    def seeds(self, Emin: np.float64, Emax: np.float64):
+        r"""
+        @returns the R-matrix poles [MeV] with real parts in [Emin, Emax]
+        """
+        e = self.energies
+        return e[(e.real >= Emin) & (e.real <= Emax)]
+
+    def rmatrix(self, E: np.complex128):
+        r"""
+        @returns the (nch, nch) R-matrix, defined by u(a) = a R u'(a) as in
+        `Solver.solve`, and its derivative with respect to E, at complex
+        energy E [MeV]
+        """
+        d = 1.0 / (self.energies - E)
+        g = self.amplitudes
+        R = self.scale * np.einsum("n,ni,nj->ij", d, g, g)
+        dR = self.scale * np.einsum("n,ni,nj->ij", d**2, g, g)
+        return R, dR
+
+    def kinematics(self, E: np.complex128):
+        r"""
+        @returns the wavenumber [fm^-1] and Sommerfeld parameter at complex
+        energy E [MeV], with Im k < 0 for Im E < 0
+        """
+        k = np.sqrt(2 * self.mu * np.complex128(E)) / HBARC
+        eta = ALPHA * self.Zz * self.mu / (HBARC * k)
+        return k, eta
+
+    def log_derivative(self, E: np.complex128):
+        r"""
+        @returns the logarithmic derivative L = rho H+'(rho) / H+(rho) of the
+        outgoing Coulomb-Hankel function at the channel radius in each
+        channel, and its derivative with respect to E, at complex energy
+        E [MeV]
+        """
+        k, eta = self.kinematics(E)
+        rho = k * self.channel_radius
+
+        def L(l, eta):
+            return rho * H_plus_prime(rho, l, eta) / H_plus(rho, l, eta)
+
+        Ls = {}
+        for l in np.unique(self.l):
+            Ll = L(l, eta)
+            # from the Coulomb equation, H'' = (l (l + 1) / rho^2 + 2 eta / rho - 1) H
+            dL_drho = (Ll - Ll**2) / rho + rho * (
+                l * (l + 1) / rho**2 + 2 * eta / rho - 1
+            )
+            # rho goes as sqrt(E) and eta as 1/sqrt(E)
+            dL = dL_drho * rho / (2 * E)
+            if self.Zz != 0:
+                h = 1.0e-6 * abs(eta)
+                dL_deta = (L(l, eta + h) - L(l, eta - h)) / (2 * h)
+                dL -= dL_deta * eta / (2 * E)
+            Ls[l] = (Ll, dL)
+
+        return (
+            np.array([Ls[l][0] for l in self.l]),
+            np.array([Ls[l][1] for l in self.l]),
+        )
+
+    def newton(
+        self,
+        E0: np.complex128,
+        tol: np.float64 = 1e-10,
+        max_iterations: np.int32 = 50,
+        radius: np.float64 = np.inf,
+    ):
+        r"""
+        Refines a pole of the S-matrix from the initial guess E0 [MeV]
+        @parameters:
+            tol (float) : relative tolerance on the Newton step
+            max_iterations (int) : maximum number of Newton steps
+            radius (float) : the iterations are abandoned once they leave
+                the disk of this radius [MeV] around E0
+        @returns:
+            the Pole, or None if the iterations did not converge
+        """
+        E = np.complex128(E0)
+        for iteration in range(1, max_iterations + 1):
+            R, dR = self.rmatrix(E)
+            L, dL = self.log_derivative(E)
+            try:
+                Rinv = np.linalg.inv(R)
+                M = Rinv - np.diag(L)
+                dM = -Rinv @ dR @ Rinv - np.diag(dL)
+                step = -1.0 / np.trace(np.linalg.solve(M, dM))
+            except np.linalg.LinAlgError:
+                return None
+            E += step
+            if not np.isfinite(E) or abs(E - E0) > radius:
+                return None
+            if abs(step) < tol * max(1.0, abs(E)):
+                return Pole(E, iteration)
+        return None
+
+    def find(
+        self,
+        Emin: np.float64,
+        Emax: np.float64,
+        max_width: np.float64 = np.inf,
+        tol: np.float64 = 1e-10,
+        max_iterations: np.int32 = 50,
+    ):
+        r"""
+        Finds the resonances with energies in [Emin, Emax] [MeV] and widths up
+        to max_width [MeV], by refining each of the R-matrix poles in the
+        interval with `newton`
+        @returns:
+            the Poles found, in order of increasing energy
+        """
+        poles = []
+        with profiling.stage("pole_search"):
+            for e in self.seeds(Emin, Emax):
+                # the R-matrix diverges at the seed itself
+                pole = self.newton(e - 1.0e-6j, tol, max_iterations, Emax - Emin)
+                if pole is None:
+                    continue
+                if not (Emin <= pole.resonance_energy <= Emax):
+                    continue
+                if not (0 <= pole.width <= max_width):
+                    continue
+                if any(abs(pole.energy - p.energy) < 1e3 * tol for p in poles):
+                    continue
+                poles.append(pole)
+        return sorted(poles, key=lambda p: p.resonance_energy)
@@ -0,0 +1,163 @@
+import numpy as np
+
+from .. import profiling
+from ..reactions.system import Channels, Asymptotics
+from ..quadrature import Kernel
+
+
+class PropagationSolver:
+    r"""
+    A Schrödinger equation solver using R-matrix propagation (Baye, Hesse and
+    Vincke, 2002, Phys. Rev. C 65, 024601; Sec. 2.4 of Descouvemont, 2016).
+    The interval [0, a] is split into sectors, each with its own small
+    Lagrange-Legendre mesh. The R-matrix is found in the innermost sector
+    in the regularized basis, as in `Solver`, and then propagated outward
+    through the others, so that the cost grows linearly with the channel
+    radius at a fixed mesh density, rather than cubically as for a single
+    mesh. Only local interactions are supported.
+    """
+
+    def __init__(
+        self,
+        nbasis: np.int32,
+        nsectors: np.int32,
+    ):
+        r"""
+        @parameters:
+            nbasis (int) : size of the basis in each sector
+            nsectors (int) : number of sectors of equal width
+        """
+        self.kernel = Kernel(nbasis, "Legendre")
+        self.nsectors = nsectors
+
+    def sector_edges(self, a: np.float64):
+        r"""
+        @returns the nsectors + 1 dimensionless radii bounding the sectors
+        of [0, a]
+        """
+        return np.linspace(0, a, self.nsectors + 1)
+
+    def sector_matrix(
+        self,
+        channels: Channels,
+        a0: np.float64,
+        h: np.float64,
+        local_interaction,
+        local_args,
+    ):
+        r"""
+        @returns the (nch x nbasis)^2 Bloch-Schrödinger matrix 1/E0 (H + L - E)
+        on the sector [a0, a0 + h], in the regularized basis with the Bloch
+        operator at a0 + h if a0 = 0, or otherwise in the unregularized basis
+        with Bloch operators at both ends
+        """
+        quadrature = self.kernel.quadrature
+        nb = quadrature.nbasis
+        nch = channels.size
+        A = np.zeros((nch * nb, nch * nb), dtype=np.complex128)
+        for i in range(nch):
+            if a0 == 0:
+                T = quadrature.kinetic_matrix(h, channels.l[i])
+            else:
+                T = quadrature.sector_kinetic_matrix(a0, h, channels.l[i])
+            T *= channels.mu[0] / channels.mu[i]
+            T[np.diag_indices(nb)] -= channels.E[i] / channels.E[0]
+            A[i * nb : (i + 1) * nb, i * nb : (i + 1) * nb] = T
+
+        if local_interaction is not None:
+            r = (a0 + h * quadrature.abscissa) / channels.k[0]
+            V = local_interaction(r, *local_args).reshape(nch, nch, nb)
+            for i in range(nch):
+                for j in range(nch):
+                    A[i * nb : (i + 1) * nb, j * nb : (j + 1) * nb][
+                        np.diag_indices(nb)
+                    ] += (V[i, j] / channels.E[0])
+        return A
+
+    def propagate(
+        self,
+        channels: Channels,
+        local_interaction=None,
+        local_args=None,
+        edges: np.ndarray = None,
+    ):
+        r"""
+        @returns the (nch, nch) R-matrix at the channel radius a, defined by
+        u(a) = a R u'(a) as in `Solver`, propagated through the sectors
+        @parameters:
+            edges (np.ndarray) : increasing dimensionless sector edges from 0
+                to a; defaults to `sector_edges`
+        """
+        a = channels.a
+        edges = self.sector_edges(a) if edges is None else edges
+        assert edges[0] == 0 and np.isclose(edges[-1], a)
+        nb = self.kernel.quadrature.nbasis
+        nch = channels.size
+        eye = np.eye(nch)
+
+        # boundary values, block diagonal in channel space
+        def boundary(b):
+            return np.kron(eye, b[:, np.newaxis])
+
+        with profiling.stage("propagation"):
+            # innermost sector, in which u(a1) = R u'(a1)
+            h = edges[1]
+            A = self.sector_matrix(channels, 0.0, h, local_interaction, local_args)
+            B = boundary(
+                np.array(
+                    [self.kernel.f(n, h, h) for n in range(1, nb + 1)],
+                    dtype=np.complex128,
+                )
+                / np.sqrt(h)
+            )
+            R = B.T @ np.linalg.solve(A, B)
+
+            # outer sectors [a0, a1], in which, with the derivatives taken
+            # along the outward normals of the edges,
+            #   u(a0) = -G11 u'(a0) + G12 u'(a1)
+            #   u(a1) = -G21 u'(a0) + G22 u'(a1)
+            # so that eliminating u'(a0) with u(a0) = R u'(a0) gives
+            # u(a1) = (G22 - G21 (R + G11)^-1 G12) u'(a1)
+            for a0, a1 in zip(edges[1:-1], edges[2:]):
+                h = a1 - a0
+                A = self.sector_matrix(channels, a0, h, local_interaction, local_args)
+                b = self.kernel.quadrature.sector_boundaries(h)
+                B = np.hstack([boundary(b[:, 0]), boundary(b[:, 1])])
+                G = B.T @ np.linalg.solve(A, B)
+                G11, G12 = G[:nch, :nch], G[:nch, nch:]
+                G21, G22 = G[nch:, :nch], G[nch:, nch:]
+                R = G22 - G21 @ np.linalg.solve(R + G11, G12)
+
+        return R / a
+
+    def solve(
+        self,
+        channels: Channels,
+        asymptotics: Asymptotics,
+        local_interaction=None,
+        local_args=None,
+        weights=None,
+        edges: np.ndarray = None,
+    ):
+        r"""
+        Solves the Bloch-Schrödinger equation for the R and S-matrices in
+        the channels by R-matrix propagation; see `Solver.solve`
+        @returns:
+            R, S and the derivative of the external wavefunction at the
+            channel radius, as in `Solver.solve`
+        """
+        a = channels.a
+        if weights is None:
+            weights = np.zeros(channels.size)
+            weights[0] = 1
+        R = self.propagate(channels, local_interaction, local_args, edges)
+
+        with profiling.stage("smatrix"):
+            # Eqns 16 and 17 in Descouvemont, 2016
+            Zp = np.diag(asymptotics.Hp) - R * asymptotics.Hpp[:, np.newaxis] * a
+            Zm = np.diag(asymptotics.Hm) - R * asymptotics.Hmp[:, np.newaxis] * a
+            S = np.linalg.solve(Zp, Zm)
+            uext_prime_boundary = 0.5j * (
+                asymptotics.Hmp * weights - S @ asymptotics.Hpp
+            )
+        return R, S, uext_prime_boundary
@@ -1,12 +1,11 @@
 import numpy as np
 
+from .. import profiling
 from ..reactions.system import Channels, Asymptotics
 from ..utils import block
-from .core import (
-    solution_coeffs_with_inverse,
-    solve_smatrix_with_inverse,
-)
 from ..quadrature import Kernel
+from .block_sparse import BlockSparseMatrix
+from .workspace import SolverWorkspace
 
 
 class Solver:
@@ -18,6 +17,9 @@ class Solver:
         self,
         nbasis: np.int32,
         basis="Legendre",
+        mixed_precision: bool = False,
+        refinement_tol: np.float64 = 1e-12,
+        max_refinement_iterations: np.int32 = 10,
         **args,
     ):
         r"""
@@ -27,8 +29,19 @@ class Solver:
             integration
             ecom (float) : center of mass frame scattering energy
             basis (str): what basis/mesh to use (see Ch. 3 of Baye, 2015)
+            mixed_precision (bool): if True, factorize the Bloch-Schrödinger
+                matrix in complex64 and recover double precision R and S
+                through iterative refinement (see SolverWorkspace)
+            refinement_tol (float): target relative residual for the
+                iterative refinement in mixed precision mode
+            max_refinement_iterations (int): maximum number of refinement
+                steps in mixed precision mode before falling back to a
+                complex128 factorization
         """
         self.kernel = Kernel(nbasis, basis)
+        self.mixed_precision = mixed_precision
+        self.refinement_tol = refinement_tol
+        self.max_refinement_iterations = max_refinement_iterations
 
     def precompute_boundaries(self, a: np.float64):
         r"""
@@ -38,15 +51,18 @@ class Solver:
             a: dimensionless radii (e.g. a = k * r_max) for each channel
         """
         nbasis = self.kernel.quadrature.nbasis
-        return np.array(
-            [self.kernel.f(n, a, a) for n in range(1, nbasis + 1)],
-            dtype=np.complex128,
-        )
+        with profiling.stage("boundaries"):
+            return np.array(
+                [self.kernel.f(n, a, a) for n in range(1, nbasis + 1)],
+                dtype=np.complex128,
+            )
 
     def get_channel_block(self, matrix: np.ndarray, i: np.int32, j: np.int32 = None):
         N = self.kernel.quadrature.nbasis
         if j is None:
             j = i
+        if isinstance(matrix, BlockSparseMatrix):
+            return matrix.block(i, j)
         return block(matrix, (i, j), (N, N))
 
     def kinetic_matrix(
@@ -57,8 +73,8 @@ class Solver:
     ):
         r"""
         @returns:
-            kinetic_matrix (np.ndarray): the full (Nb)x(Nb) kinetic energy
-            matrix
+            kinetic_matrix (BlockSparseMatrix): the full (Nch x Nb)^2 kinetic
+            energy matrix, stored as its Nch diagonal channel blocks
         @parameters:
             a : dimensionless channel radius (r * k_0) with k_0 being the
                 wavenumber in the entrance channel
@@ -70,14 +86,19 @@ class Solver:
         if mu is None:
             mu = np.ones(l.shape, dtype=np.float64)
 
-        Nb = self.kernel.quadrature.nbasis
-        Nch = np.size(l)
-        sz = Nb * Nch
-        F = np.zeros((sz, sz), dtype=np.complex128)
-        for i in range(Nch):
-            Fij = self.kernel.quadrature.kinetic_matrix(a, l[i]) * mu[0] / mu[i]
-            F[(i * Nb) : (i + 1) * Nb, (i * Nb) : (i + 1) * Nb] += Fij
-        return F
+        return BlockSparseMatrix.block_diagonal(
+            self.kinetic_blocks(a, np.atleast_1d(l), np.atleast_1d(mu))
+        )
+
+    def kinetic_blocks(self, a: np.float64, l: np.ndarray, mu: np.ndarray):
+        r"""
+        @returns:
+            the list of (Nb)x(Nb) kinetic energy matrices in each channel
+        """
+        return [
+            self.kernel.quadrature.kinetic_matrix(a, l[i]) * mu[0] / mu[i]
+            for i in range(np.size(l))
+        ]
 
     def energy_matrix(
         self,
@@ -87,9 +108,9 @@ class Solver:
     ):
         r"""
         @returns:
-            energy_matrix (np.ndarray): the full (nchannels x nbasis)^2.
-                Diagonal in channel space but possibly not in Lagrange
-                space. 1/E0 (Ei <f_n | f_m>)
+            energy_matrix (BlockSparseMatrix): the full (nchannels x
+                nbasis)^2. Diagonal in channel space but possibly not in
+                Lagrange space. 1/E0 (Ei <f_n | f_m>)
         @parameters:
             a : dimensionless channel radius (r * k_0) with k_0 being
                 the wavenumber in the entrance channel
@@ -101,16 +122,19 @@ class Solver:
         if E is None:
             E = np.ones(l.shape, dtype=np.float64)
 
-        Nb = self.kernel.quadrature.nbasis
-        Nch = np.size(l)
-        sz = Nb * Nch
-        F = np.zeros((sz, sz), dtype=np.complex128)
-        for i in range(Nch):
-            F[(i * Nb) : (i + 1) * Nb, (i * Nb) : (i + 1) * Nb] += (
-                self.kernel.overlap * E[i]
-            )
+        return BlockSparseMatrix.block_diagonal(self.energy_blocks(np.atleast_1d(E)))
 
-        return F / E[0]
+    def energy_blocks(self, E: np.ndarray):
+        r"""
+        @returns:
+            the list of 1/E0 (Ei <f_n | f_m>) in each channel, either as the
+            (Nb,) diagonal if the overlap is diagonal, or as full (Nb)x(Nb)
+            matrices
+        """
+        overlap = self.kernel.overlap
+        if np.count_nonzero(overlap - np.diag(np.diagonal(overlap))) == 0:
+            overlap = np.diagonal(overlap)
+        return [overlap * E[i] / E[0] for i in range(np.size(E))]
 
     def free_matrix(
         self,
@@ -136,14 +160,29 @@ class Solver:
                 0 for the free matrix). If False, returns a list of Nch (Nb,Nb)
                 matrices, where Nch is the number of channels and Nb is the
                 number of basis elements, othereise returns the full
-                (Nch x Nb, Nch x Nb) matrix
+                (Nch x Nb, Nch x Nb) matrix as a BlockSparseMatrix
         """
-        free_matrix = self.kinetic_matrix(a, l, mu) - self.energy_matrix(a, l, E)
+        l = np.atleast_1d(l)
+        if E is None:
+            E = np.ones(l.shape, dtype=np.float64)
+        if mu is None:
+            mu = np.ones(l.shape, dtype=np.float64)
+
+        # the free matrix is block diagonal in channel space, so only build
+        # the diagonal blocks
+        blocks = []
+        with profiling.stage("free_matrix"):
+            for T, En in zip(self.kinetic_blocks(a, l, mu), self.energy_blocks(E)):
+                if En.ndim == 1:
+                    T[np.diag_indices(T.shape[0])] -= En
+                else:
+                    T -= En
+                blocks.append(T)
 
         if coupled:
-            return free_matrix
+            return BlockSparseMatrix.block_diagonal(blocks)
         else:
-            return [self.get_channel_block(free_matrix, i) for i in range(l.size)]
+            return blocks
 
     def interaction_matrix(
         self,
@@ -160,7 +199,9 @@ class Solver:
         Returns the full (Nxn)x(Nxn) interaction in the Lagrange basis, where
         each channel is an nxn block (n being the basis size), and there are
         NxN such blocks, for N channels. Uses dimensionless coords with s=k0 r
-        and divided by E0, 0 denoting the entrance channel.
+        and divided by E0, 0 denoting the entrance channel. The interaction is
+        returned as a BlockSparseMatrix, storing only nonzero channel blocks,
+        with local blocks stored as their diagonals.
         @parameters:
             k0 (float): fixed wavenumber [fm^-1] with which to scale the
                 coordinate r. Typically this just the wavenumber in the 0th
@@ -177,40 +218,75 @@ class Solver:
             nonlocal_args (tuple): the args that get passed into
                 nonlocal_interaction
         """
-        # allocate matrix to store full interaction in Lagrange basis
         nb = self.kernel.quadrature.nbasis
-        sz = nb * nch
-        V = np.zeros((sz, sz), dtype=np.complex128)
+        V = BlockSparseMatrix(nch, nb)
 
         # scaling
         channel_radius_r = a / k0
 
         if local_interaction is not None:
-            # matrix_local just gives us the diagonal elements of each block ...
-            Vl = self.kernel.matrix_local(
-                local_interaction, channel_radius_r, args=local_args
-            ).reshape(nch, nch, nb)
-            # ... so we have to manually put them in the locations of the diagonals of each block
-            for i in range(nch):
-                for j in range(nch):
-                    V[i * nb : (i + 1) * nb, j * nb : (j + 1) * nb] = np.diag(
-                        Vl[i, j, ...]
-                    )
+            # matrix_local just gives us the diagonal elements of each block,
+            # which is exactly what we store for local blocks
+            V += BlockSparseMatrix.from_local(
+                self.kernel.matrix_local(
+                    local_interaction, channel_radius_r, args=local_args
+                ).reshape(nch, nch, nb)
+            )
 
         if nonlocal_interaction is not None:
             # matrix_nonlocal gives us an (nchannels, nchannels, nbasis, nbasis) array
-            # which we can just reshape into the the block matrix we want
-            V += (
+            V += BlockSparseMatrix.from_nonlocal(
                 self.kernel.matrix_nonlocal(
                     nonlocal_interaction, channel_radius_r, args=nonlocal_args
-                )
-                .reshape(nch, nch, nb, nb)
-                .swapaxes(1, 2)
-                .reshape(sz, sz, order="C")
+                ).reshape(nch, nch, nb, nb)
                 / k0
             )
-        V /= E0
-        return V
+        return V / E0
+
+    def workspace(self, nchannels: np.int32 = 1):
+        r"""
+        @returns a SolverWorkspace of preallocated buffers for repeated solves
+        with `nchannels` coupled channels
+        """
+        return SolverWorkspace(
+            nchannels,
+            self.kernel.quadrature.nbasis,
+            mixed_precision=self.mixed_precision,
+            refinement_tol=self.refinement_tol,
+            max_refinement_iterations=self.max_refinement_iterations,
+        )
+
+    def interaction_gradient(
+        self,
+        k0: np.float64,
+        E0: np.float64,
+        a: np.float64,
+        nch: np.int32,
+        local_gradient=None,
+        local_args=None,
+    ):
+        r"""
+        Returns the derivatives of the interaction matrix with respect to a set
+        of parameters, in the same scaled Lagrange basis representation as
+        `interaction_matrix`, for use in the gradient mode of `solve`.
+        @parameters:
+            k0 (float): fixed wavenumber [fm^-1] with which to scale the
+                coordinate r
+            E0 (float): fixed energy [MeV] with which to scale the system
+            a (float): dimensionless channel radius
+            nch (int): number of channels
+            local_gradient (callable): the derivatives of the local potential
+                w.r.t. each of its nparams parameters, a function of r and
+                *args returning an array of shape (nparams, nr), or
+                (nparams, nch, nch, nr) for coupled channels
+            local_args (tuple): the args that get passed into local_gradient
+        @returns:
+            a list of nparams BlockSparseMatrix instances
+        """
+        nb = self.kernel.quadrature.nbasis
+        dV = self.kernel.matrix_local(local_gradient, a / k0, args=local_args)
+        dV = dV.reshape(dV.shape[0], nch, nch, nb)
+        return [BlockSparseMatrix.from_local(dVp) / E0 for dVp in dV]
 
     def solve(
         self,
@@ -225,7 +301,31 @@ class Solver:
         basis_boundary=None,
         weights=None,
         wavefunction=None,
+        workspace: SolverWorkspace = None,
+        interaction_gradient: list = None,
     ):
+        r"""
+        Solves the Bloch-Schrödinger equation for the R and S-matrices in the
+        channels, and, if `wavefunction` is set, the wavefunction coefficients
+        in the Lagrange basis. If a `workspace` is provided (see
+        `Solver.workspace`), all results are written into its preallocated
+        buffers, and the returned arrays are views into them, valid until the
+        next solve with the same workspace.
+
+        If `interaction_gradient` is provided, a list of the derivatives of
+        the interaction matrix with respect to nparams parameters (see
+        `Solver.interaction_gradient`), the derivatives of the R and
+        S-matrices with respect to each parameter, dR and dS, each of shape
+        (nparams, nchannels, nchannels), are appended to the returned values.
+        These are computed from the existing factorization using the adjoint
+        method, at the cost of a single extra back substitution.
+        """
+        nbasis = self.kernel.quadrature.nbasis
+        if workspace is None:
+            workspace = self.workspace(channels.size)
+        assert workspace.nchannels == channels.size
+        assert workspace.nbasis == nbasis
+
         # calculate everything that hasn't been precomputed
         if free_matrix is None:
             free_matrix = self.free_matrix(
@@ -238,8 +338,10 @@ class Solver:
         if basis_boundary is None:
             basis_boundary = self.precompute_boundaries(channels.a)
         if weights is None:
-            weights = np.zeros(channels.size, dtype=np.float64)
-            weights[0] = 1
+            workspace.weights[:] = 0
+            workspace.weights[0] = 1
+        else:
+            workspace.weights[:] = weights
         if interaction_matrix is None:
             interaction_matrix = self.interaction_matrix(
                 channels.k[0],
@@ -253,38 +355,31 @@ class Solver:
             )
 
         # check consistent sizes
-        sz = channels.size * self.kernel.quadrature.nbasis
+        sz = channels.size * nbasis
         assert free_matrix.shape == (sz, sz)
         assert interaction_matrix.shape == (sz, sz)
-        assert basis_boundary.shape == (self.kernel.quadrature.nbasis,)
+        assert basis_boundary.shape == (nbasis,)
 
         # this is the full multi-channel representation of 1/E_0 (H-E)
-        A = free_matrix + interaction_matrix
+        with profiling.stage("assemble"):
+            workspace.assemble(free_matrix, interaction_matrix)
 
         # solve system using the R-matrix method
-        R, S, Ainv, uext_prime_boundary = solve_smatrix_with_inverse(
-            A,
-            basis_boundary,
-            asymptotics.Hp,
-            asymptotics.Hm,
-            asymptotics.Hpp,
-            asymptotics.Hmp,
-            weights,
-            channels.a,
-            channels.size,
-            self.kernel.quadrature.nbasis,
-        )
+        R = workspace.solve_rmatrix(basis_boundary, channels.a)
+        with profiling.stage("smatrix"):
+            S, uext_prime_boundary = workspace.solve_smatrix(asymptotics, channels.a)
 
         if wavefunction is None:
-            return R, S, uext_prime_boundary
+            result = (R, S, uext_prime_boundary)
         else:
             # get the wavefunction expansion coefficients in the Lagrange basis
-            x = solution_coeffs_with_inverse(
-                Ainv,
-                basis_boundary,
-                S,
-                uext_prime_boundary,
-                channels.size,
-                self.kernel.quadrature.nbasis,
-            )
-            return R, S, x, uext_prime_boundary
+            x = workspace.solution_coeffs()
+            result = (R, S, x, uext_prime_boundary)
+
+        if interaction_gradient is not None:
+            with profiling.stage("gradient"):
+                result += workspace.solve_gradient(
+                    interaction_gradient, basis_boundary, asymptotics, channels.a
+                )
+
+        return result
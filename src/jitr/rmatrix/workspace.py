@@ -0,0 +1,337 @@
+import numpy as np
+from scipy.linalg import lapack
+
+from .. import profiling
+from .block_sparse import BlockSparseMatrix
+from .core import (
+    boundary_rhs,
+    rmatrix_from_solution,
+    smatrix_operands,
+    external_derivative_at_boundary,
+    solution_coeffs_from_solution,
+)
+
+
+class SolverWorkspace:
+    r"""
+    Preallocated buffers for `Solver.solve` for a fixed number of channels and
+    basis size. All of the intermediate and final results of a solve are
+    written into these buffers in place, so that repeated solves (e.g. in an
+    ensemble loop over parameter samples) do not allocate. Matrices passed to
+    LAPACK are stored in Fortran order so they can be factorized in place.
+
+    Note that the arrays returned by `Solver.solve` when a workspace is
+    provided are views into these buffers, and are overwritten by the next
+    solve using the same workspace.
+
+    In mixed precision mode, A is factorized in complex64, and the solution
+    X = A^{-1} B is recovered to double precision by iterative refinement
+    against the complex128 A. After each solve, `refinement_residual` holds
+    the achieved relative residual ||B - A X||_F / ||B||_F, and
+    `refinement_iterations` the number of refinement steps taken. If the
+    refinement does not reach `refinement_tol` within
+    `max_refinement_iterations` steps (e.g. for a very ill-conditioned A), the
+    solve falls back to a complex128 factorization, and `refinement_fallback`
+    is set. The same statistics for the adjoint solve A^T Y = B of
+    `solve_gradient` are kept separately, in `adjoint_refinement_residual`
+    and `adjoint_refinement_iterations`.
+    """
+
+    def __init__(
+        self,
+        nchannels: np.int32,
+        nbasis: np.int32,
+        mixed_precision: bool = False,
+        refinement_tol: np.float64 = 1e-12,
+        max_refinement_iterations: np.int32 = 10,
+    ):
+        r"""
+        @parameters:
+            nchannels (int) : number of coupled channels
+            nbasis (int) : size of the Lagrange basis in each channel
+            mixed_precision (bool) : whether to factorize in complex64 and
+                refine the solution in complex128
+            refinement_tol (float) : target relative residual of the
+                iterative refinement
+            max_refinement_iterations (int) : maximum number of refinement
+                steps before falling back to a complex128 factorization
+        """
+        self.nchannels = nchannels
+        self.nbasis = nbasis
+        self.mixed_precision = mixed_precision
+        self.refinement_tol = refinement_tol
+        self.max_refinement_iterations = max_refinement_iterations
+        sz = nchannels * nbasis
+
+        # full multichannel 1/E0 (H - E), overwritten by its LU factorization
+        self.A = np.zeros((sz, sz), dtype=np.complex128, order="F")
+        self.pivots = np.zeros(sz, dtype=np.int32)
+
+        # A^{-1} B, with B the block diagonal matrix of boundary values
+        self.X = np.zeros((sz, nchannels), dtype=np.complex128, order="F")
+
+        # A^{-T} B, the adjoint solution used for parametric derivatives
+        self.Y = np.zeros((sz, nchannels), dtype=np.complex128, order="F")
+
+        # parametric derivatives of R and S, allocated on first use
+        self.dR = None
+        self.dS = None
+
+        # channel space quantities
+        self.R = np.zeros((nchannels, nchannels), dtype=np.complex128)
+        self.Zp = np.zeros((nchannels, nchannels), dtype=np.complex128, order="F")
+        self.Zm = np.zeros((nchannels, nchannels), dtype=np.complex128, order="F")
+        self.Zp_pivots = np.zeros(nchannels, dtype=np.int32)
+        self.uext_prime_boundary = np.zeros(nchannels, dtype=np.complex128)
+        self.coeffs = np.zeros((nchannels, nbasis), dtype=np.complex128)
+
+        # default incoming weights are in the entrance channel only
+        self.weights = np.zeros(nchannels, dtype=np.float64)
+        self.weights[0] = 1
+
+        # single precision factorization and refinement buffers
+        if self.mixed_precision:
+            self.A32 = np.zeros((sz, sz), dtype=np.complex64, order="F")
+            self.B = np.zeros((sz, nchannels), dtype=np.complex128, order="F")
+            self.residual = np.zeros((sz, nchannels), dtype=np.complex128, order="F")
+            self.correction = np.zeros((sz, nchannels), dtype=np.complex64, order="F")
+        self.refinement_residual = 0.0
+        self.refinement_iterations = 0
+        self.adjoint_refinement_residual = 0.0
+        self.adjoint_refinement_iterations = 0
+        self.refinement_fallback = False
+
+    def __getstate__(self):
+        # buffers hold no state between solves, so only the configuration is
+        # pickled, and each unpickled copy gets its own fresh buffers
+        return {
+            "nchannels": self.nchannels,
+            "nbasis": self.nbasis,
+            "mixed_precision": self.mixed_precision,
+            "refinement_tol": self.refinement_tol,
+            "max_refinement_iterations": self.max_refinement_iterations,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @property
+    def S(self):
+        r"""the S-matrix, which overwrites Zm during the solve"""
+        return self.Zm
+
+    def assemble(self, free_matrix, interaction_matrix):
+        r"""
+        Writes free_matrix + interaction_matrix into the A buffer in place.
+        Either may be a dense np.ndarray or a BlockSparseMatrix.
+        """
+        if isinstance(free_matrix, BlockSparseMatrix):
+            free_matrix.todense(out=self.A)
+        else:
+            self.A[...] = free_matrix
+        if isinstance(interaction_matrix, BlockSparseMatrix):
+            interaction_matrix.add_to(self.A)
+        else:
+            self.A += interaction_matrix
+
+    def solve_rmatrix(self, basis_boundary: np.ndarray, a: np.float64):
+        r"""
+        Factorizes A, solves for X = A^{-1} B, and fills in the multichannel
+        R-matrix
+        """
+        boundary_rhs(self.X, basis_boundary, self.nchannels, self.nbasis)
+        with profiling.stage("factorize"):
+            self.factorize()
+        with profiling.stage("back_substitution"):
+            self.solve_factorized(self.X)
+        rmatrix_from_solution(
+            self.R, self.X, basis_boundary, self.nchannels, self.nbasis, a
+        )
+        return self.R
+
+    def factorize(self):
+        r"""
+        LU factorizes A in place in complex128, or, in mixed precision mode,
+        into the complex64 buffer A32, leaving A intact for refinement
+        """
+        self.refinement_fallback = False
+        self.refinement_residual = 0.0
+        self.refinement_iterations = 0
+        self.adjoint_refinement_residual = 0.0
+        self.adjoint_refinement_iterations = 0
+        if self.mixed_precision:
+            self.A32[...] = self.A
+            _, piv, info = lapack.cgetrf(self.A32, overwrite_a=True)
+        else:
+            _, piv, info = lapack.zgetrf(self.A, overwrite_a=True)
+        check_lapack_info(info)
+        self.pivots[:] = piv
+
+    def solve_factorized(self, X: np.ndarray, trans: int = 0):
+        r"""
+        Solves A X = B (trans=0) or A^T X = B (trans=1) in place, given the
+        factorization of A, with X initially holding B
+        """
+        if self.mixed_precision and not self.refinement_fallback:
+            self.solve_mixed_precision(X, trans)
+        else:
+            _, info = lapack.zgetrs(
+                self.A, self.pivots, X, trans=trans, overwrite_b=True
+            )
+            check_lapack_info(info)
+
+    def solve_mixed_precision(self, X: np.ndarray, trans: int = 0):
+        r"""
+        Solves A X = B (or A^T X = B) using the complex64 LU factorization of
+        A and iterative refinement of X against the complex128 A, with X
+        initially holding B. Falls back to a complex128 factorization of A if
+        the refinement does not converge.
+        """
+        op = self.A.T if trans else self.A
+        self.B[...] = X
+
+        # initial single precision solution
+        self.correction[...] = self.B
+        _, info = lapack.cgetrs(
+            self.A32, self.pivots, self.correction, trans=trans, overwrite_b=True
+        )
+        check_lapack_info(info)
+        X[...] = self.correction
+
+        norm_B = np.linalg.norm(self.B)
+        for iteration in range(self.max_refinement_iterations + 1):
+            # residual r = B - A X in double precision
+            np.matmul(op, X, out=self.residual)
+            np.subtract(self.B, self.residual, out=self.residual)
+            residual = np.linalg.norm(self.residual) / norm_B
+            if trans:
+                self.adjoint_refinement_residual = residual
+                self.adjoint_refinement_iterations = iteration
+            else:
+                self.refinement_residual = residual
+                self.refinement_iterations = iteration
+            if residual <= self.refinement_tol:
+                return
+
+            if iteration < self.max_refinement_iterations:
+                # solve for the correction A dX = r in single precision
+                self.correction[...] = self.residual
+                _, info = lapack.cgetrs(
+                    self.A32,
+                    self.pivots,
+                    self.correction,
+                    trans=trans,
+                    overwrite_b=True,
+                )
+                check_lapack_info(info)
+                X += self.correction
+
+        # refinement did not converge, so fall back to double precision;
+        # A is overwritten by its LU factorization from here on
+        self.refinement_fallback = True
+        _, piv, info = lapack.zgetrf(self.A, overwrite_a=True)
+        check_lapack_info(info)
+        self.pivots[:] = piv
+        X[...] = self.B
+        self.solve_factorized(X, trans)
+
+    def solve_smatrix(self, asymptotics, a: np.float64):
+        r"""
+        Fills in the S-matrix and the derivative of the external
+        wavefunction at the channel radius from the R-matrix
+        """
+        smatrix_operands(
+            self.Zp,
+            self.Zm,
+            self.R,
+            asymptotics.Hp,
+            asymptotics.Hm,
+            asymptotics.Hpp,
+            asymptotics.Hmp,
+            a,
+        )
+        # Eqn 16 in Descouvemont, 2016; S overwrites Zm, and the LU
+        # factorization of Zp overwrites Zp
+        _, piv, _, info = lapack.zgesv(
+            self.Zp, self.Zm, overwrite_a=True, overwrite_b=True
+        )
+        check_lapack_info(info)
+        self.Zp_pivots[:] = piv
+        external_derivative_at_boundary(
+            self.uext_prime_boundary,
+            self.S,
+            asymptotics.Hpp,
+            asymptotics.Hmp,
+            self.weights,
+        )
+        return self.S, self.uext_prime_boundary
+
+    def solve_gradient(
+        self,
+        interaction_gradient: list,
+        basis_boundary: np.ndarray,
+        asymptotics,
+        a: np.float64,
+    ):
+        r"""
+        Fills in the derivatives of the R and S-matrices with respect to a set
+        of parameters, given the derivatives of the interaction matrix with
+        respect to each, using the adjoint of the factorized A:
+
+            dR/dp = - 1/a^2 (A^{-T} B)^T dA/dp (A^{-1} B)
+
+        and the derivative of Eqns 16 and 17 in Descouvemont, 2016:
+
+            dS/dp = a Zp^{-1} (Hp' dR/dp S - Hm' dR/dp)
+
+        This costs one additional back substitution with the existing
+        factorization of A, independent of the number of parameters. Must be
+        called after solve_rmatrix and solve_smatrix.
+
+        @parameters:
+            interaction_gradient (list) : for each parameter p, the
+                derivative of the interaction matrix w.r.t p, as a dense
+                np.ndarray or a BlockSparseMatrix (see
+                Solver.interaction_gradient)
+        """
+        nparams = len(interaction_gradient)
+        nch = self.nchannels
+        if self.dR is None or self.dR.shape[0] != nparams:
+            self.dR = np.zeros((nparams, nch, nch), dtype=np.complex128)
+            self.dS = np.zeros((nparams, nch, nch), dtype=np.complex128)
+
+        # adjoint solution A^T Y = B
+        boundary_rhs(self.Y, basis_boundary, nch, self.nbasis)
+        self.solve_factorized(self.Y, trans=1)
+
+        for p, dA in enumerate(interaction_gradient):
+            self.dR[p] = -(self.Y.T @ (dA @ self.X)) / a**2
+            dZ = a * (
+                asymptotics.Hpp[:, np.newaxis] * (self.dR[p] @ self.S)
+                - asymptotics.Hmp[:, np.newaxis] * self.dR[p]
+            )
+            self.dS[p], info = lapack.zgetrs(self.Zp, self.Zp_pivots, dZ)
+            check_lapack_info(info)
+
+        return self.dR, self.dS
+
+    def solution_coeffs(self):
+        r"""
+        Fills in the multichannel wavefunction coefficients in the Lagrange
+        basis
+        """
+        solution_coeffs_from_solution(
+            self.coeffs,
+            self.X,
+            self.uext_prime_boundary,
+            self.nchannels,
+            self.nbasis,
+        )
+        return self.coeffs
+
+
+def check_lapack_info(info: int):
+    if info > 0:
+        raise np.linalg.LinAlgError("Singular matrix")
+    elif info < 0:
+        raise ValueError(f"Illegal value in argument {-info} of LAPACK routine")
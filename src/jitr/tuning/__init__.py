@@ -0,0 +1,2 @@
+from .table import BAND_EDGES, Recommendation, RecommendationTable
+from .tuner import ConvergenceProblem, tune, tune_table
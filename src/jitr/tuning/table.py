@@ -0,0 +1,137 @@
+import json
+from dataclasses import dataclass, asdict
+
+import numpy as np
+
+# lab energy band edges [MeV]
+BAND_EDGES = (0.0, 2.0, 5.0, 10.0, 20.0, 35.0, 50.0, 75.0, 100.0, 150.0, 200.0)
+
+
+@dataclass
+class Recommendation:
+    r"""
+    The cheapest converged basis size and channel radius for a projectile
+    and target over a band of lab energies, found by `tune`, along with the
+    largest S-matrix and relative observable errors with respect to the
+    reference solve over the band
+    """
+
+    nbasis: int
+    channel_radius_fm: float
+    lmax: int
+    smatrix_error: float = 0.0
+    observable_error: float = 0.0
+
+    def channel_radius(self, k: np.float64):
+        r"""
+        @returns the dimensionless channel radius at wavenumber k [fm^-1]
+        """
+        return self.channel_radius_fm * k
+
+
+class RecommendationTable:
+    r"""
+    A lookup table of Recommendations keyed by projectile, target (A, Z) and
+    lab energy band, persisted as JSON, so that production runs can pick the
+    minimal basis size and channel radius for each case.
+    """
+
+    def __init__(self, band_edges=BAND_EDGES, entries: dict = None):
+        r"""
+        @parameters:
+            band_edges : increasing lab energy band edges [MeV]
+            entries (dict) : Recommendations keyed by (projectile, target,
+                band), with band the index of the band
+        """
+        self.band_edges = np.asarray(band_edges, dtype=np.float64)
+        assert np.all(np.diff(self.band_edges) > 0)
+        self.entries = dict(entries) if entries is not None else {}
+
+    @property
+    def nbands(self):
+        return self.band_edges.size - 1
+
+    def band(self, Elab: np.float64):
+        r"""
+        @returns the index of the band containing Elab, or None if it is
+        outside of all bands
+        """
+        if Elab < self.band_edges[0] or Elab > self.band_edges[-1]:
+            return None
+        return int(
+            min(
+                np.searchsorted(self.band_edges, Elab, side="right") - 1,
+                self.nbands - 1,
+            )
+        )
+
+    def band_range(self, band: np.int32):
+        r"""
+        @returns the lowest and highest lab energy [MeV] of a band
+        """
+        return self.band_edges[band], self.band_edges[band + 1]
+
+    def add(
+        self, projectile: tuple, target: tuple, band: np.int32, rec: Recommendation
+    ):
+        self.entries[tuple(projectile), tuple(target), int(band)] = rec
+
+    def lookup(
+        self,
+        projectile: tuple,
+        target: tuple,
+        Elab: np.float64,
+        nearest: bool = False,
+    ):
+        r"""
+        @returns the Recommendation for the projectile and target at Elab,
+        or None if there isn't one
+
+        @parameters:
+            nearest (bool) : if there is no entry for the target, use the
+                entry for the closest tuned target in mass number in the
+                same band, and in case of a tie, the more conservative one
+        """
+        band = self.band(Elab)
+        if band is None:
+            return None
+        projectile, target = tuple(projectile), tuple(target)
+        rec = self.entries.get((projectile, target, band))
+        if rec is not None or not nearest:
+            return rec
+        candidates = [
+            (abs(t[0] - target[0]), -r.nbasis, -r.channel_radius_fm, r)
+            for (p, t, b), r in self.entries.items()
+            if p == projectile and b == band
+        ]
+        if len(candidates) == 0:
+            return None
+        return min(candidates, key=lambda c: c[:3])[-1]
+
+    def to_dict(self):
+        return {
+            "band_edges": self.band_edges.tolist(),
+            "entries": [
+                {
+                    "projectile": list(p),
+                    "target": list(t),
+                    "band": b,
+                    **asdict(rec),
+                }
+                for (p, t, b), rec in sorted(self.entries.items())
+            ],
+        }
+
+    def save(self, filename):
+        with open(filename, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename) as f:
+            data = json.load(f)
+        entries = {}
+        for e in data["entries"]:
+            key = (tuple(e.pop("projectile")), tuple(e.pop("target")), e.pop("band"))
+            entries[key] = Recommendation(**e)
+        return cls(data["band_edges"], entries)
@@ -0,0 +1,263 @@
+import numpy as np
+
+from ..batch.omp import GlobalOMP
+from ..reactions import ProjectileTargetSystem, spin_half_orbit_coupling
+from ..rmatrix import Solver
+from ..utils import kinematics
+from ..xs.elastic import MultiEnergyWorkspace, differential_elastic_xs_batched
+from .table import Recommendation, RecommendationTable
+
+
+class ConvergenceProblem:
+    r"""
+    The S-matrix and elastic observables of a projectile and target at a set
+    of lab energies, as a function of the basis size and channel radius [fm]
+    at a fixed lmax, for comparison of candidate settings against a
+    reference solve
+    """
+
+    def __init__(
+        self,
+        projectile: tuple,
+        target: tuple,
+        Elab: np.ndarray,
+        lmax: np.int32,
+        omp: GlobalOMP,
+        angles: np.ndarray,
+    ):
+        self.projectile = tuple(projectile)
+        self.target = tuple(target)
+        self.Elab = np.atleast_1d(Elab)
+        self.lmax = lmax
+        self.angles = angles
+        self.mass_target = kinematics.mass(*target)
+        self.mass_projectile = kinematics.mass(*projectile)
+        self.Zz = projectile[1] * target[1]
+        self.kinematics = [
+            kinematics.classical_kinematics(
+                self.mass_target, self.mass_projectile, E, Zz=self.Zz
+            )
+            for E in self.Elab
+        ]
+        self.interaction_scalar, self.interaction_spin_orbit = omp.interactions(
+            projectile
+        )
+        self.args = [
+            omp.params(projectile, 0, *target, kin.mu, E, kin.k)
+            for E, kin in zip(self.Elab, self.kinematics)
+        ]
+        self.solvers = {}
+
+    def solver(self, nbasis: np.int32):
+        if nbasis not in self.solvers:
+            self.solvers[nbasis] = Solver(nbasis)
+        return self.solvers[nbasis]
+
+    def evaluate(self, nbasis: np.int32, channel_radius_fm: np.float64):
+        r"""
+        @returns, at each energy, the S-matrix elements (lmax + 1, 2) and the
+        concatenated observables: dsdo at each angle, the reaction cross
+        section and, for neutral projectiles, the total cross section
+        """
+        results = []
+        for kin, (scalar, spin_orbit) in zip(self.kinematics, self.args):
+            sys = ProjectileTargetSystem(
+                channel_radius=channel_radius_fm * kin.k,
+                lmax=self.lmax,
+                mass_target=self.mass_target,
+                mass_projectile=self.mass_projectile,
+                Ztarget=self.target[1],
+                Zproj=self.projectile[1],
+                coupling=spin_half_orbit_coupling,
+            )
+            ws = MultiEnergyWorkspace(
+                self.projectile,
+                self.target,
+                sys,
+                kin,
+                self.solver(nbasis),
+                self.angles,
+            )
+            splus, sminus = ws.smatrix(
+                self.interaction_scalar,
+                self.interaction_spin_orbit,
+                scalar,
+                spin_orbit,
+            )
+            dsdo, _, xst, xsrxn = differential_elastic_xs_batched(
+                ws.k,
+                splus,
+                sminus,
+                ws.P_l_costheta,
+                ws.P_1_l_costheta,
+                ws.f_c,
+                ws.sigma_l,
+            )
+            observables = [dsdo[0], xsrxn]
+            if self.Zz == 0:
+                observables.append(xst)
+            results.append(
+                (np.stack([splus[0], sminus[0]], axis=-1), np.concatenate(observables))
+            )
+        return results
+
+
+def errors(results: list, reference: list):
+    r"""
+    @returns the largest absolute S-matrix error, and the largest relative
+    observable error, over the energies
+    """
+    smatrix_error = max(
+        np.max(np.absolute(S - Sref)) for (S, _), (Sref, _) in zip(results, reference)
+    )
+    observable_error = max(
+        np.max(np.absolute(obs - ref) / np.absolute(ref))
+        for (_, obs), (_, ref) in zip(results, reference)
+    )
+    return float(smatrix_error), float(observable_error)
+
+
+def tune(
+    projectile: tuple,
+    target: tuple,
+    Elab_min: np.float64,
+    Elab_max: np.float64,
+    omp: GlobalOMP = None,
+    rtol: np.float64 = 1e-3,
+    smatrix_atol: np.float64 = 1e-4,
+    nbasis=None,
+    radii=None,
+    lmax: np.int32 = None,
+    nenergies: np.int32 = 3,
+    nbasis_ref: np.int32 = None,
+    radius_ref: np.float64 = None,
+    angles: np.ndarray = None,
+):
+    r"""
+    Finds the cheapest basis size and channel radius for which the S-matrix
+    elements and elastic observables of a projectile and target are
+    converged over a range of lab energies, by comparison against a
+    reference solve with a larger basis and channel radius.
+
+    The radii are searched in increasing order, and for each, the basis
+    sizes in increasing order up to the smallest found so far. A setting is
+    accepted once it, and the next larger basis size, both agree with the
+    reference to within the tolerances at every energy, so that accidental
+    agreement of an unconverged solution is not mistaken for convergence.
+    Of the accepted settings, the one with the smallest basis (and then the
+    smallest radius) is returned, as the cost of a solve scales with the
+    cube of the basis size.
+
+    @parameters:
+        projectile, target (tuple) : (A, Z)
+        Elab_min, Elab_max (float) : lab energy range [MeV]
+        omp (GlobalOMP) : the interaction; defaults to Koning-Delaroche
+        rtol (float) : tolerance of the relative error in the differential
+            and integral cross sections
+        smatrix_atol (float) : tolerance of the absolute error in the
+            S-matrix elements
+        nbasis : candidate basis sizes; defaults to 10, 15, ... up to the
+            reference basis size
+        radii : candidate channel radii [fm]; defaults to 3 to 13 fm past
+            the nuclear radius 1.25 A^(1/3) fm
+        lmax (int) : largest partial wave, the same for all candidates;
+            defaults to the grazing partial wave at the reference radius and
+            highest energy, plus 10
+        nenergies (int) : number of energies sampled in the range
+        nbasis_ref (int) : basis size of the reference solve; defaults to
+            the larger of 80 and 4 k R / pi, with k the wavenumber at the
+            highest energy and R the reference radius, i.e. about 4 mesh
+            points per node of the wavefunction
+        radius_ref (float) : channel radius of the reference solve [fm];
+            defaults to 2 fm beyond the largest candidate radius
+        angles (np.ndarray) : angles [radians] of the differential cross
+            section
+    @returns:
+        the Recommendation, or None if no candidate is converged
+    """
+    omp = omp if omp is not None else GlobalOMP("KD")
+    angles = angles if angles is not None else np.linspace(0.05, np.pi - 0.05, 60)
+    Elab = np.linspace(Elab_min, Elab_max, nenergies)
+
+    if radii is None:
+        radii = 1.25 * target[0] ** (1.0 / 3.0) + np.arange(3.0, 14.0, 2.0)
+    radii = np.sort(np.atleast_1d(np.asarray(radii, dtype=np.float64)))
+    radius_ref = radius_ref if radius_ref is not None else radii[-1] + 2.0
+
+    kmax = kinematics.classical_kinematics(
+        kinematics.mass(*target),
+        kinematics.mass(*projectile),
+        Elab_max,
+        Zz=projectile[1] * target[1],
+    ).k
+    if lmax is None:
+        lmax = int(np.ceil(kmax * radius_ref)) + 10
+    if nbasis_ref is None:
+        nbasis_ref = max(80, int(np.ceil(4 * kmax * radius_ref / np.pi)))
+    if nbasis is None:
+        nbasis = np.arange(10, nbasis_ref, 5)
+    nbasis = np.sort(np.atleast_1d(nbasis)).astype(int)
+
+    problem = ConvergenceProblem(projectile, target, Elab, lmax, omp, angles)
+    reference = problem.evaluate(nbasis_ref, radius_ref)
+
+    def converged(nb, radius):
+        smatrix_error, observable_error = errors(
+            problem.evaluate(nb, radius), reference
+        )
+        ok = smatrix_error <= smatrix_atol and observable_error <= rtol
+        return ok, smatrix_error, observable_error
+
+    best = None
+    for radius in radii:
+        previous = None
+        for nb in nbasis:
+            if best is not None and nb > best.nbasis:
+                break
+            ok, smatrix_error, observable_error = converged(nb, radius)
+            if ok and previous is not None:
+                if best is None or previous.nbasis < best.nbasis:
+                    best = previous
+                break
+            previous = (
+                Recommendation(
+                    int(nb), float(radius), lmax, smatrix_error, observable_error
+                )
+                if ok
+                else None
+            )
+    return best
+
+
+def tune_table(
+    projectiles: list,
+    targets: list,
+    bands: list = None,
+    table: RecommendationTable = None,
+    **kwargs,
+):
+    r"""
+    Tunes each projectile and target over each energy band, and stores the
+    Recommendations in a table
+
+    @parameters:
+        projectiles, targets (list) : (A, Z) of each
+        bands (list) : indices of the bands to tune; defaults to all
+        table (RecommendationTable) : the table to add to; if None, a new one
+            with the default bands is created
+        kwargs : passed to `tune`
+    @returns:
+        the RecommendationTable
+    """
+    table = table if table is not None else RecommendationTable()
+    bands = bands if bands is not None else range(table.nbands)
+    for projectile in projectiles:
+        for target in targets:
+            for band in bands:
+                Elab_min, Elab_max = table.band_range(band)
+                # the lowest band starts at 0 MeV
+                Elab_min = max(Elab_min, 0.1)
+                rec = tune(projectile, target, Elab_min, Elab_max, **kwargs)
+                if rec is not None:
+                    table.add(projectile, target, band, rec)
+    return table
@@ -2,6 +2,9 @@ from .utils import *
 from . import kinematics
 from . import constants
 from . import free_solutions
+from . import angular
+from . import partial_waves
+from . import numerov
 
 # read AME mass table into memory for fast lookup later
 kinematics.init_AME_db()
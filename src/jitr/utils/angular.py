@@ -0,0 +1,125 @@
+from collections import OrderedDict
+
+import numpy as np
+from numba import njit
+
+from scipy.special import gamma
+
+
+@njit
+def legendre_recurrence(lmax: np.int32, x: np.ndarray):
+    r"""
+    @returns the Legendre polynomials P_l(x) and associated Legendre
+    polynomials P_l^1(x) (with the Condon-Shortley phase, as in
+    scipy.special.lpmv) for l = 0, ..., lmax, each of shape (lmax + 1, x.size),
+    filled together using Bonnet's recurrence
+
+        l P_l = (2l - 1) x P_{l-1} - (l - 1) P_{l-2}
+
+    and its m = 1 analog
+
+        (l - 1) P_l^1 = (2l - 1) x P_{l-1}^1 - l P_{l-2}^1
+    """
+    n = x.shape[0]
+    P = np.zeros((lmax + 1, n), dtype=np.float64)
+    P1 = np.zeros((lmax + 1, n), dtype=np.float64)
+    for i in range(n):
+        P[0, i] = 1.0
+        if lmax > 0:
+            P[1, i] = x[i]
+            P1[1, i] = -np.sqrt(1.0 - x[i] * x[i])
+        for l in range(2, lmax + 1):
+            P[l, i] = ((2 * l - 1) * x[i] * P[l - 1, i] - (l - 1) * P[l - 2, i]) / l
+            P1[l, i] = ((2 * l - 1) * x[i] * P1[l - 1, i] - l * P1[l - 2, i]) / (l - 1)
+    return P, P1
+
+
+def coulomb_amplitude(eta: np.float64, k: np.float64, angles: np.ndarray):
+    r"""
+    @returns the Coulomb scattering amplitude f_c(theta) and the Rutherford
+    cross section [mb/sr] at the given center of mass angles, for Sommerfeld
+    parameter eta and wavenumber k [fm^-1]
+    """
+    sigma_0 = np.angle(gamma(1 + 1j * eta))
+    sin2 = np.sin(angles / 2) ** 2
+    rutherford = 10 * eta**2 / (4 * k**2 * sin2**2)
+    f_c = -eta / (2 * k * sin2) * np.exp(-1j * eta * np.log(sin2) + 2j * sigma_0)
+    return f_c, rutherford
+
+
+class AngularCache:
+    r"""
+    Bounded least-recently-used cache of angular quantities that only depend
+    on the angle grid and a few scalars: the Legendre tables P_l and P_l^1,
+    keyed by (lmax, hash of the angle grid), and the Coulomb amplitudes,
+    keyed by (eta, k, hash of the angle grid). When fitting many data sets,
+    each with its own angle grid, this avoids re-evaluating them in every
+    likelihood call. Cached arrays are returned read-only, as they are
+    shared between callers.
+    """
+
+    def __init__(self, maxsize: np.int32 = 256):
+        r"""
+        @parameters:
+            maxsize (int) : maximum number of entries of each kind
+        """
+        self.maxsize = maxsize
+        self.legendre_cache = OrderedDict()
+        self.coulomb_cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def grid_key(angles: np.ndarray):
+        angles = np.ascontiguousarray(angles, dtype=np.float64)
+        return (angles.size, hash(angles.tobytes()))
+
+    def lookup(self, cache: OrderedDict, key, compute):
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = compute()
+        for array in value:
+            if array is not None:
+                array.flags.writeable = False
+        cache[key] = value
+        if len(cache) > self.maxsize:
+            cache.popitem(last=False)
+        return value
+
+    def legendre(self, lmax: np.int32, angles: np.ndarray):
+        r"""
+        @returns P_l(cos(theta)) and P_l^1(cos(theta)) for l = 0, ..., lmax
+        (see `legendre_recurrence`)
+        """
+        return self.lookup(
+            self.legendre_cache,
+            (int(lmax),) + self.grid_key(angles),
+            lambda: legendre_recurrence(
+                int(lmax), np.cos(np.asarray(angles, dtype=np.float64))
+            ),
+        )
+
+    def coulomb(self, eta: np.float64, k: np.float64, angles: np.ndarray):
+        r"""
+        @returns the Coulomb amplitude and Rutherford cross section (see
+        `coulomb_amplitude`)
+        """
+        return self.lookup(
+            self.coulomb_cache,
+            (float(eta), float(k)) + self.grid_key(angles),
+            lambda: coulomb_amplitude(eta, k, np.asarray(angles, dtype=np.float64)),
+        )
+
+    def clear(self):
+        self.legendre_cache.clear()
+        self.coulomb_cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# shared by all workspaces
+angular_cache = AngularCache()
@@ -109,3 +109,67 @@ def H_minus_prime(s, l, eta, dx=1e-6, asym=CoulombAsymptotics):
     Derivative of the Hankel function (second kind) with respect to s.
     """
     return coulomb_func_deriv(H_minus, s, l, eta)
+
+
+@njit
+def coulomb_recurrence(
+    s: np.float64,
+    eta: np.float64,
+    F_top: np.ndarray,
+    G_bottom: np.ndarray,
+    F: np.ndarray,
+    G: np.ndarray,
+):
+    r"""
+    Fills F and G with the regular and irregular Coulomb functions for
+    l = 0, ..., F.shape[0] - 1, at fixed s and eta, using the three-term
+    recurrence (Abramowitz and Stegun 14.2.3)
+
+        l sqrt((l+1)^2 + eta^2) u_{l+1} = (2l+1) (eta + l (l+1) / s) u_l
+            - (l+1) sqrt(l^2 + eta^2) u_{l-1}
+
+    upward for G, starting from G_0 and G_1 (G_bottom), and downward for F,
+    starting from the two highest l (F_top), which are the stable directions
+    for each.
+    """
+    L = F.shape[0] - 1
+    F[L - 1] = F_top[0]
+    F[L] = F_top[1]
+    G[0] = G_bottom[0]
+    G[1] = G_bottom[1]
+    for l in range(1, L):
+        G[l + 1] = (
+            (2 * l + 1) * (eta + l * (l + 1) / s) * G[l]
+            - (l + 1) * np.sqrt(l**2 + eta**2) * G[l - 1]
+        ) / (l * np.sqrt((l + 1) ** 2 + eta**2))
+    for l in range(L - 1, 0, -1):
+        F[l - 1] = (
+            (2 * l + 1) * (eta + l * (l + 1) / s) * F[l]
+            - l * np.sqrt((l + 1) ** 2 + eta**2) * F[l + 1]
+        ) / ((l + 1) * np.sqrt(l**2 + eta**2))
+
+
+def coulomb_hankel_sequence(s: np.float64, lmax: np.int32, eta: np.float64):
+    r"""
+    @returns H_plus, H_minus, H_plus_prime and H_minus_prime at s for all
+    l = 0, ..., lmax, each as an array of shape (lmax + 1,). Only the four
+    Coulomb functions seeding `coulomb_recurrence` are evaluated with mpmath,
+    so this is much faster than evaluating each l separately.
+    """
+    L = lmax + 2
+    F = np.zeros(L + 1, dtype=np.float64)
+    G = np.zeros(L + 1, dtype=np.float64)
+    F_top = np.array([float(coulombf(L - 1, eta, s)), float(coulombf(L, eta, s))])
+    G_bottom = np.array([float(coulombg(0, eta, s)), float(coulombg(1, eta, s))])
+    coulomb_recurrence(s, eta, F_top, G_bottom, F, G)
+
+    Hp = G + 1j * F
+    Hm = G - 1j * F
+
+    # dlmf Eq. 33.4.4, as in coulomb_func_deriv
+    l = np.arange(0, lmax + 1)
+    R = np.sqrt(1 + eta**2 / (l + 1) ** 2)
+    S = (l + 1) / s + eta / (l + 1)
+    Hpp = S * Hp[:-2] - R * Hp[1:-1]
+    Hmp = S * Hm[:-2] - R * Hm[1:-1]
+    return Hp[:-2], Hm[:-2], Hpp, Hmp
@@ -0,0 +1,169 @@
+import numpy as np
+from numba import njit
+
+
+@njit
+def numerov(
+    h: np.float64,
+    ls: np.ndarray,
+    l_dot_s: np.ndarray,
+    v_scalar: np.ndarray,
+    v_spin_orbit: np.ndarray,
+):
+    r"""
+    Integrates the reduced, scaled radial Schrödinger equation
+        u''(s) = (l (l + 1) / s^2 + v_scalar(s) + l_dot_s v_spin_orbit(s) - 1) u(s)
+    outward from the origin with the Numerov method, for all channels and
+    interaction samples at once, on the uniform grid s_n = n h,
+    n = 0, ..., N + 1, with the channel radius a = N h.
+
+    @parameters:
+        h (float) : step size in s = k r
+        ls (np.ndarray) : orbital angular momentum of each of nch channels
+        l_dot_s (np.ndarray) : coefficient of the spin-orbit interaction in
+            each channel
+        v_scalar (np.ndarray) : (nsamples, N + 2) scalar interaction, divided
+            by the energy, on the grid
+        v_spin_orbit (np.ndarray) : (nsamples, N + 2) spin-orbit interaction,
+            divided by the energy, on the grid
+    @returns:
+        the R-matrix R = u(a) / (a u'(a)) of each sample and channel, as an
+        (nsamples, nch) array
+    """
+    nsamples, npoints = v_scalar.shape
+    nch = ls.size
+    N = npoints - 2
+    a = N * h
+    h12 = h**2 / 12
+    R = np.zeros((nsamples, nch), dtype=np.complex128)
+
+    for idx in range(nsamples * nch):
+        i = idx // nch
+        c = idx % nch
+        l = ls[c]
+        centrifugal = l * (l + 1)
+
+        # u(0) = 0 and u(h) is an arbitrary normalization, as only the ratio
+        # of u and u' enters R; Numerov is written in w = (1 - h^2 f / 12) u,
+        # with the limit of f u at the origin being 2 u(h) / h^2 for l = 1,
+        # and 0 otherwise
+        u_prev = 0.0j
+        u = 1.0e-10 + 0.0j
+        w_prev = -u / 6 if l == 1 else 0.0j
+        f = centrifugal / h**2 + v_scalar[i, 1] + l_dot_s[c] * v_spin_orbit[i, 1] - 1
+        w = (1 - h12 * f) * u
+        f_prev = 0.0j
+        for n in range(1, N + 1):
+            w_next = 2 * w - w_prev + h**2 * f * u
+            s = (n + 1) * h
+            f_next = (
+                centrifugal / s**2
+                + v_scalar[i, n + 1]
+                + l_dot_s[c] * v_spin_orbit[i, n + 1]
+                - 1
+            )
+            u_next = w_next / (1 - h12 * f_next)
+
+            if n == N:
+                # u'(a) to O(h^4) from u(a - h) and u(a + h)
+                uprime = (
+                    (1 - 2 * h12 * f_next) * u_next - (1 - 2 * h12 * f_prev) * u_prev
+                ) / (2 * h)
+                R[i, c] = u / (a * uprime)
+                break
+
+            # rescale to stay within floating point range under the barrier
+            scale = np.abs(u_next)
+            if scale > 1.0e100:
+                u_next /= scale
+                w_next /= scale
+                u /= scale
+                w /= scale
+
+            u_prev, u, f_prev, f = u, u_next, f, f_next
+            w_prev, w = w, w_next
+
+    return R
+
+
+class NumerovIntegrator:
+    r"""
+    A compiled reference integrator for local interactions with spin-orbit
+    coupling, for validation of the Lagrange-mesh results at scale. All
+    channels and interaction parameter samples are propagated at once on a
+    shared radial grid (see `numerov`), and the R and S-matrices follow the
+    conventions of `Solver.solve`.
+    """
+
+    def __init__(self, a: np.float64, nsteps: np.int32 = 4000):
+        r"""
+        @parameters:
+            a (float) : dimensionless channel radius
+            nsteps (int) : number of steps from the origin to a; the
+                truncation error in R scales as 1/nsteps^4
+        """
+        self.a = a
+        self.nsteps = nsteps
+        self.h = a / nsteps
+        self.s = self.h * np.arange(nsteps + 2)
+
+    def rmatrix(
+        self,
+        k: np.float64,
+        E: np.float64,
+        ls: np.ndarray,
+        interaction_scalar,
+        args_scalar: list,
+        interaction_spin_orbit=None,
+        args_spin_orbit: list = None,
+        l_dot_s: np.ndarray = None,
+    ):
+        r"""
+        @returns the R-matrix of each sample in each channel, an (nsamples,
+        nch) array, defined by u(a) = a R u'(a) as in `Solver.solve`
+        @parameters:
+            k (float) : wavenumber [fm^-1]
+            E (float) : center of mass energy [MeV]
+            ls (np.ndarray) : orbital angular momentum in each channel
+            interaction_scalar (callable) : function of r and *args
+            args_scalar (list) : args for interaction_scalar for each sample
+            interaction_spin_orbit (callable) : function of r and *args
+            args_spin_orbit (list) : args for interaction_spin_orbit for each
+                sample
+            l_dot_s (np.ndarray) : coefficient of the spin-orbit interaction
+                in each channel
+        """
+        ls = np.asarray(ls, dtype=np.int64)
+        r = self.s / k
+        # the origin is never evaluated in the interaction
+        r[0] = r[1]
+        v_scalar = np.array(
+            [interaction_scalar(r, *args) / E for args in args_scalar],
+            dtype=np.complex128,
+        )
+        if interaction_spin_orbit is None:
+            v_spin_orbit = np.zeros_like(v_scalar)
+            l_dot_s = np.zeros(ls.size)
+        else:
+            v_spin_orbit = np.array(
+                [interaction_spin_orbit(r, *args) / E for args in args_spin_orbit],
+                dtype=np.complex128,
+            )
+        l_dot_s = np.asarray(l_dot_s, dtype=np.float64)
+        return numerov(self.h, ls, l_dot_s, v_scalar, v_spin_orbit)
+
+    def smatrix(
+        self,
+        R: np.ndarray,
+        Hp: np.ndarray,
+        Hm: np.ndarray,
+        Hpp: np.ndarray,
+        Hmp: np.ndarray,
+    ):
+        r"""
+        @returns the S-matrix from the R-matrix of each sample in each
+        channel, given the asymptotic Coulomb-Hankel functions and their
+        derivatives in each channel at the channel radius (Eqns 16 and 17 in
+        Descouvemont, 2016, for uncoupled channels)
+        """
+        return (Hm - self.a * R * Hmp) / (Hp - self.a * R * Hpp)
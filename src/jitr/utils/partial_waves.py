@@ -0,0 +1,96 @@
+import numpy as np
+
+from .constants import ALPHA, HBARC
+
+
+def grazing_partial_wave(k: np.float64, eta: np.float64, r: np.float64):
+    r"""
+    @returns the (real valued) partial wave l whose classical turning point
+    in the Coulomb plus centrifugal barrier is at radius r [fm], from
+    l (l + 1) = rho^2 - 2 eta rho with rho = k r
+    """
+    rho = k * r
+    return np.sqrt(max(rho**2 - 2 * eta * rho, 0.0) + 0.25) - 0.5
+
+
+def interaction_range(r: np.ndarray, potentials: list, tol: np.float64):
+    r"""
+    @returns the largest radius in r [fm] at which any of the potentials
+    [MeV], given on r, exceeds tol in magnitude, or 0 if none do
+    """
+    mask = np.zeros(r.shape, dtype=bool)
+    for v in potentials:
+        mask |= np.absolute(v) > tol
+    idx = np.nonzero(mask)[0]
+    return r[idx[-1]] if idx.size > 0 else 0.0
+
+
+def point_coulomb(r: np.ndarray, Zz: np.float64):
+    r"""
+    @returns the point Coulomb potential [MeV] at r [fm]
+    """
+    return Zz * ALPHA * HBARC / r
+
+
+def semiclassical_lmax(
+    k: np.float64,
+    eta: np.float64,
+    r_range: np.float64,
+    lmax: np.int32,
+    margin: np.int32 = 1,
+):
+    r"""
+    @returns the largest partial wave, no larger than lmax, that feels the
+    nuclear interaction, estimated as the grazing partial wave at the range
+    r_range [fm] of the interaction, plus a margin. Above it, the turning
+    point lies outside of the interaction, and the S-matrix is that of pure
+    Coulomb scattering, i.e. the nuclear S-matrix is 1.
+
+    If r_range is inside the Coulomb barrier, i.e. within the turning point
+    2 eta / k of the s-wave, every partial wave reaches the interaction only
+    by tunneling, and there is no grazing partial wave to cut at, so lmax is
+    returned.
+
+    Taking the range as the radius beyond which the nuclear interaction is
+    below tol [MeV], |1 - S_l| at the estimate is typically below tol as
+    well (see `interaction_range`).
+    """
+    if k * r_range < 2 * eta:
+        return lmax
+    return min(int(np.ceil(grazing_partial_wave(k, eta, r_range))) + margin, lmax)
+
+
+class PartialWaveSequence:
+    r"""
+    A read-only sequence of per partial wave data for l = 0, ..., size - 1,
+    each built by build(l) on first access, so that data for partial waves
+    that are never reached are never built
+    """
+
+    def __init__(self, build, size: np.int32):
+        self.build = build
+        self.size = size
+        self.items = []
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbuilt(self):
+        return len(self.items)
+
+    def __getitem__(self, l):
+        if isinstance(l, slice):
+            return [self[i] for i in range(*l.indices(self.size))]
+        l = int(l)
+        if l < 0:
+            l += self.size
+        if l < 0 or l >= self.size:
+            raise IndexError(f"partial wave {l} out of range")
+        while len(self.items) <= l:
+            self.items.append(self.build(len(self.items)))
+        return self.items[l]
+
+    def __iter__(self):
+        for l in range(self.size):
+            yield self[l]
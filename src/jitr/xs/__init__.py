@@ -1,2 +1,4 @@
 from . import elastic
 from . import quasielastic_pn
+from . import transmission
+from . import excitation
@@ -1,10 +1,20 @@
 from numba import njit
 from dataclasses import dataclass
-from scipy.special import eval_legendre, lpmv, gamma
+from copy import copy
+from scipy.special import gamma
 import numpy as np
 import pickle
 
+from .. import profiling
 from ..utils import constants
+from ..utils.free_solutions import coulomb_hankel_sequence
+from ..utils.angular import angular_cache
+from ..utils.partial_waves import (
+    PartialWaveSequence,
+    interaction_range,
+    point_coulomb,
+    semiclassical_lmax,
+)
 from ..utils.kinematics import ChannelKinematics
 from ..reactions import ProjectileTargetSystem
 from ..rmatrix import Solver
@@ -23,11 +33,37 @@ class ElasticXS:
     rxn: np.float64
     rutherford: np.ndarray = None
 
+    def __post_init__(self):
+        # the Rutherford cross section may be a read-only array shared
+        # through the `angular_cache`; the caller gets its own copy
+        if self.rutherford is not None and not self.rutherford.flags.writeable:
+            self.rutherford = self.rutherford.copy()
+
+
+@dataclass
+class ElasticXSJacobian:
+    r"""
+    Holds the Jacobians of the differential cross section, analyzing power,
+    total cross section and reaction cross section w.r.t. a set of nparams
+    interaction parameters, all at a given energy
+    """
+
+    dsdo: np.ndarray
+    Ay: np.ndarray
+    t: np.ndarray
+    rxn: np.ndarray
+
 
 class IntegralWorkspace:
     r"""
     Workspace for integral observables like S-matrix elements and total and reaction cross sections for
     local interactions with spin-orbit coupling
+
+    The channels, asymptotics and free matrices of each partial wave are
+    built lazily, the first time that partial wave is solved. Optionally,
+    partial waves beyond the grazing partial wave of the range of the nuclear
+    interaction (see `semiclassical_lmax`) are not solved at all, as their
+    nuclear S-matrix is 1 (pure Coulomb scattering).
     """
 
     def __init__(
@@ -38,7 +74,22 @@ class IntegralWorkspace:
         kinematics: ChannelKinematics,
         solver: Solver,
         smatrix_abs_tol: np.float64 = 1e-6,
+        semiclassical: bool = False,
+        lmax_margin: np.int32 = 1,
+        potential_tol: np.float64 = None,
     ):
+        r"""
+        @parameters:
+            smatrix_abs_tol (float) : partial waves are solved until both
+                S-matrix elements are within this of 1
+            semiclassical (bool) : whether to skip the partial waves beyond
+                the grazing partial wave of the range of the interaction
+            lmax_margin (int) : number of partial waves beyond the grazing
+                one to solve
+            potential_tol (float) : the interaction is considered to vanish
+                where its nuclear part is below this [MeV]; defaults to
+                smatrix_abs_tol
+        """
         # system info
         self.projectile = projectile
         self.target = target
@@ -46,6 +97,11 @@ class IntegralWorkspace:
         self.solver = solver
         self.nbasis = solver.kernel.quadrature.nbasis
         self.smatrix_abs_tol = smatrix_abs_tol
+        self.semiclassical = semiclassical
+        self.lmax_margin = lmax_margin
+        self.potential_tol = (
+            potential_tol if potential_tol is not None else smatrix_abs_tol
+        )
 
         # kinematic info
         self.mu = kinematics.mu
@@ -54,19 +110,16 @@ class IntegralWorkspace:
         self.eta = kinematics.eta
 
         # precompute things
-        self.free_matrices = self.solver.free_matrix(
-            sys.channel_radius, sys.l, coupled=False
-        )
         self.basis_boundary = self.solver.precompute_boundaries(sys.channel_radius)
+        self.solver_workspace = self.solver.workspace(1)
 
-        # get information for each channel
-        channels, asymptotics = sys.get_partial_wave_channels(
-            self.Ecm, self.mu, self.k, self.eta
-        )
-
-        # de couple into two independent systems per partial wave
-        self.channels = [ch.decouple() for ch in channels]
-        self.asymptotics = [asym.decouple() for asym in asymptotics]
+        # information for each partial wave, de coupled into two independent
+        # systems, built on first use
+        nl = sys.lmax + 1
+        self.partial_waves = PartialWaveSequence(self.build_partial_wave, nl)
+        self.channels = PartialWaveSequence(self.build_channels, nl)
+        self.asymptotics = PartialWaveSequence(self.build_asymptotics, nl)
+        self.free_matrices = PartialWaveSequence(self.build_free_matrix, nl)
         self.l_dot_s = np.array([np.diag(coupling) for coupling in sys.couplings[1:]])
 
         # precompute things related to Coulomb interaction
@@ -81,75 +134,189 @@ class IntegralWorkspace:
             self.k_c = 0
             self.eta = 0
 
+        # radial grid [fm] on which the range of the interaction is found
+        self.r_range_grid = np.linspace(0, sys.channel_radius / self.k, 400)[1:]
+
+    def build_partial_wave(self, l: np.int32):
+        channels, asymptotics = self.sys.partial_wave_channels(
+            l, self.Ecm, self.mu, self.k, self.eta
+        )
+        return channels.decouple(), asymptotics.decouple()
+
+    def build_channels(self, l: np.int32):
+        return self.partial_waves[l][0]
+
+    def build_asymptotics(self, l: np.int32):
+        return self.partial_waves[l][1]
+
+    def build_free_matrix(self, l: np.int32):
+        return self.solver.free_matrix(self.sys.channel_radius, l, coupled=False)[0]
+
+    def predicted_lmax(
+        self,
+        interaction_scalar,
+        interaction_spin_orbit,
+        args_scalar=None,
+        args_spin_orbit=None,
+    ):
+        r"""
+        @returns the largest partial wave, no larger than the lmax of the
+        system, in which the S-matrix for the given interaction differs from
+        1, estimated as the grazing partial wave at the range of the nuclear
+        part of the interaction (see `semiclassical_lmax`)
+        """
+        r = self.r_range_grid
+        v_scalar = interaction_scalar(r, *args_scalar)
+        if self.Zz > 0:
+            v_scalar = v_scalar - point_coulomb(r, self.Zz)
+        v_spin_orbit = interaction_spin_orbit(r, *args_spin_orbit)
+        r_range = interaction_range(r, [v_scalar, v_spin_orbit], self.potential_tol)
+        return semiclassical_lmax(
+            self.k, self.eta, r_range, self.sys.lmax, self.lmax_margin
+        )
+
     def smatrix(
         self,
         interaction_scalar,
         interaction_spin_orbit,
         args_scalar=None,
         args_spin_orbit=None,
+        grad_scalar=None,
+        grad_spin_orbit=None,
     ):
         r"""
         returns the partial wave S-matrix elements as two arrays over partial
         wave l, one for for the l+1/2 and a ssecond for the l-1/2 partial waves
+
+        If either of `grad_scalar` or `grad_spin_orbit` are provided, the
+        derivatives of the respective interaction w.r.t. each of its
+        parameters (a callable of r and *args returning an (nparams, nr)
+        array, e.g. `KD_scalar_grad`), the Jacobians of the two S-matrix
+        arrays w.r.t. the scalar parameters followed by the spin-orbit
+        parameters are also returned, each of shape (nparams, nl). These are
+        computed with the adjoint method (see `Solver.solve`), at the cost of
+        a single extra back substitution per partial wave.
+
+        The returned arrays end at the first partial wave beyond which the
+        S-matrix is 1, either because it has converged to within
+        `smatrix_abs_tol` of 1, or because it lies beyond the predicted lmax
+        (see `predicted_lmax`), so that l is only solved up to there.
         """
+        lmax = self.sys.lmax
+        if self.semiclassical:
+            lmax = self.predicted_lmax(
+                interaction_scalar,
+                interaction_spin_orbit,
+                args_scalar,
+                args_spin_orbit,
+            )
+            if lmax < self.sys.lmax:
+                profiling.count(
+                    "smatrix_semiclassical_cutoff", self.sys.lmax - lmax, l=lmax
+                )
+
         splus = np.zeros(self.sys.lmax + 1, dtype=np.complex128)
         sminus = np.zeros(self.sys.lmax + 1, dtype=np.complex128)
+        ch0 = self.channels[0][0]
 
         # precompute the interaction matrix
         im_scalar = self.solver.interaction_matrix(
-            self.channels[0][0].k[0],
-            self.channels[0][0].E[0],
-            self.channels[0][0].a,
-            self.channels[0][0].size,
+            ch0.k[0],
+            ch0.E[0],
+            ch0.a,
+            ch0.size,
             local_interaction=interaction_scalar,
             local_args=args_scalar,
         )
         im_spin_orbit = self.solver.interaction_matrix(
-            self.channels[0][0].k[0],
-            self.channels[0][0].E[0],
-            self.channels[0][0].a,
-            self.channels[0][0].size,
+            ch0.k[0],
+            ch0.E[0],
+            ch0.a,
+            ch0.size,
             local_interaction=interaction_spin_orbit,
             local_args=args_spin_orbit,
         )
 
+        # precompute the derivatives of the interaction matrices
+        gradient = grad_scalar is not None or grad_spin_orbit is not None
+        if gradient:
+            dim_scalar, dim_spin_orbit = [], []
+            if grad_scalar is not None:
+                dim_scalar = self.solver.interaction_gradient(
+                    ch0.k[0], ch0.E[0], ch0.a, ch0.size, grad_scalar, args_scalar
+                )
+            if grad_spin_orbit is not None:
+                dim_spin_orbit = self.solver.interaction_gradient(
+                    ch0.k[0],
+                    ch0.E[0],
+                    ch0.a,
+                    ch0.size,
+                    grad_spin_orbit,
+                    args_spin_orbit,
+                )
+            nparams = len(dim_scalar) + len(dim_spin_orbit)
+            dsplus = np.zeros((nparams, self.sys.lmax + 1), dtype=np.complex128)
+            dsminus = np.zeros((nparams, self.sys.lmax + 1), dtype=np.complex128)
+
+        def solve(l, ch, asym, lds):
+            with profiling.stage("partial_wave", l):
+                interaction_matrix = im_scalar
+                if lds != 0:
+                    interaction_matrix = im_scalar + lds * im_spin_orbit
+                if not gradient:
+                    _, S, _ = self.solver.solve(
+                        ch,
+                        asym,
+                        free_matrix=self.free_matrices[l],
+                        interaction_matrix=interaction_matrix,
+                        basis_boundary=self.basis_boundary,
+                        workspace=self.solver_workspace,
+                    )
+                    return S[0, 0], None
+                _, S, _, _, dS = self.solver.solve(
+                    ch,
+                    asym,
+                    free_matrix=self.free_matrices[l],
+                    interaction_matrix=interaction_matrix,
+                    basis_boundary=self.basis_boundary,
+                    workspace=self.solver_workspace,
+                    interaction_gradient=dim_scalar + [lds * g for g in dim_spin_orbit],
+                )
+                return S[0, 0], dS[:, 0, 0]
+
         # s-wave, l = 0, j = 1/2
-        _, splus[0], _ = self.solver.solve(
-            self.channels[0][0],
-            self.asymptotics[0][0],
-            free_matrix=self.free_matrices[0],
-            interaction_matrix=im_scalar,
-            basis_boundary=self.basis_boundary,
-        )
+        splus[0], dS = solve(0, self.channels[0][0], self.asymptotics[0][0], 0)
+        if gradient:
+            dsplus[:, 0] = dS
 
-        # higher partial waves
-        for l in self.sys.l[1:]:
+        # higher partial waves, up to and including lmax unless the S-matrix
+        # converges to 1 before
+        l = 0
+        for l in range(1, lmax + 1):
             ch = self.channels[l]
             asym = self.asymptotics[l]
             lds = self.l_dot_s[l - 1]  # starts from 1 not 0
             # j = l + 1/2
-            _, splus[l], _ = self.solver.solve(
-                ch[0],
-                asym[0],
-                free_matrix=self.free_matrices[l],
-                interaction_matrix=im_scalar + lds[0] * im_spin_orbit,
-                basis_boundary=self.basis_boundary,
-            )
+            splus[l], dS = solve(l, ch[0], asym[0], lds[0])
+            if gradient:
+                dsplus[:, l] = dS
 
             # j = l - 1/2
-            _, sminus[l], _ = self.solver.solve(
-                ch[1],
-                asym[1],
-                free_matrix=self.free_matrices[l],
-                interaction_matrix=im_scalar + lds[1] * im_spin_orbit,
-                basis_boundary=self.basis_boundary,
-            )
+            sminus[l], dS = solve(l, ch[1], asym[1], lds[1])
+            if gradient:
+                dsminus[:, l] = dS
 
             if (np.absolute(1 - splus[l])) < self.smatrix_abs_tol and (
                 np.absolute(1 - sminus[l])
             ) < self.smatrix_abs_tol:
+                profiling.count("smatrix_early_termination", l=l)
                 break
+        else:
+            l += 1
 
+        profiling.count("smatrix_calls")
+        if gradient:
+            return splus[:l], sminus[:l], dsplus[:, :l], dsminus[:, :l]
         return splus[:l], sminus[:l]
 
     def xs(
@@ -159,17 +326,35 @@ class IntegralWorkspace:
         args_scalar=None,
         args_spin_orbit=None,
         angles=None,
+        grad_scalar=None,
+        grad_spin_orbit=None,
     ):
         r"""
-        returns the angle-integrated total, elastic and reaction cross sections
+        returns the angle-integrated total, elastic and reaction cross
+        sections. If either of `grad_scalar` or `grad_spin_orbit` are provided
+        (see `smatrix`), their Jacobians w.r.t. the interaction parameters are
+        also returned.
         """
-        splus, sminus = self.smatrix(
+        if grad_scalar is None and grad_spin_orbit is None:
+            splus, sminus = self.smatrix(
+                interaction_scalar,
+                interaction_spin_orbit,
+                args_scalar,
+                args_spin_orbit,
+            )
+            return integral_elastic_xs(self.k, splus, sminus, self.ls, self.sigma_l)
+
+        splus, sminus, dsplus, dsminus = self.smatrix(
             interaction_scalar,
             interaction_spin_orbit,
             args_scalar,
             args_spin_orbit,
+            grad_scalar,
+            grad_spin_orbit,
         )
-        return integral_elastic_xs(self.k, splus, sminus, self.ls, self.sigma_l)
+        return integral_elastic_xs(
+            self.k, splus, sminus, self.ls, self.sigma_l
+        ) + integral_elastic_xs_jacobian(self.k, splus, sminus, dsplus, dsminus)
 
     def transmission_coefficients(
         self,
@@ -209,7 +394,15 @@ class DifferentialWorkspace:
         solver: Solver,
         angles: np.array,
         smatrix_abs_tol: np.float64 = 1e-6,
+        semiclassical: bool = False,
+        lmax_margin: np.int32 = 1,
+        potential_tol: np.float64 = None,
     ):
+        r"""
+        @returns a DifferentialWorkspace over a new IntegralWorkspace, to
+        which smatrix_abs_tol, semiclassical, lmax_margin and potential_tol
+        are passed
+        """
         integral_workspace = IntegralWorkspace(
             projectile,
             target,
@@ -217,6 +410,9 @@ class DifferentialWorkspace:
             kinematics,
             solver,
             smatrix_abs_tol,
+            semiclassical=semiclassical,
+            lmax_margin=lmax_margin,
+            potential_tol=potential_tol,
         )
         return cls(integral_workspace, angles, smatrix_abs_tol)
 
@@ -240,31 +436,37 @@ class DifferentialWorkspace:
         self.k = integral_workspace.k
         self.eta = integral_workspace.eta
 
-        # precompute angular distributions in each partial wave
-        self.angles = angles
-        self.ls = self.integral_workspace.ls
-        self.P_l_costheta = eval_legendre(self.ls, np.cos(self.angles))
-        self.P_1_l_costheta = lpmv(1, self.ls, np.cos(self.angles))
-
         # precompute things related to Coulomb interaction
         self.sigma_l = self.integral_workspace.sigma_l
         self.Zz = self.integral_workspace.Zz
         self.k_c = self.integral_workspace.k_c
         self.eta = self.integral_workspace.eta
+
+        # precompute angular distributions in each partial wave
+        self.angles = angles
+        self.ls = self.integral_workspace.ls
+        (
+            self.P_l_costheta,
+            self.P_1_l_costheta,
+            self.f_c,
+            self.rutherford,
+        ) = self.angular_factors(angles)
+
+    def angular_factors(self, angles: np.array):
+        r"""
+        @returns the Legendre polynomials P_l(cos(theta)) and associated
+        Legendre polynomials P_l^1(cos(theta)) for each partial wave, the
+        Coulomb scattering amplitude, and the Rutherford cross section (or
+        None for neutral projectiles), at the given angles. These are looked up
+        in, or added to, the shared `angular_cache`, and are read-only.
+        """
+        P_l_costheta, P_1_l_costheta = angular_cache.legendre(self.sys.lmax, angles)
         if self.Zz > 0:
-            sin2 = np.sin(self.angles / 2.0) ** 2
-            self.f_c = (
-                -self.eta
-                / (2 * self.k * sin2)
-                * np.exp(
-                    2j * self.sigma_l[0]
-                    - 2j * self.eta * np.log(np.sin(self.angles / 2))
-                )
-            )
-            self.rutherford = 10 * self.eta**2 / (4 * self.k**2 * sin2**2)
+            f_c, rutherford = angular_cache.coulomb(self.eta, self.k, angles)
         else:
-            self.f_c = np.zeros_like(angles)
-            self.rutherford = None
+            rutherford = None
+            f_c = np.zeros_like(angles)
+        return P_l_costheta, P_1_l_costheta, f_c, rutherford
 
     def xs(
         self,
@@ -273,7 +475,15 @@ class DifferentialWorkspace:
         args_scalar=None,
         args_spin_orbit=None,
         angles=None,
+        grad_scalar=None,
+        grad_spin_orbit=None,
     ):
+        r"""
+        returns the ElasticXS for the given interaction. If either of
+        `grad_scalar` or `grad_spin_orbit` are provided (see
+        `IntegralWorkspace.smatrix`), returns a tuple of the ElasticXS and its
+        ElasticXSJacobian w.r.t. the interaction parameters.
+        """
         if angles is None:
             angles = self.angles
             P_l_costheta = self.P_l_costheta
@@ -281,37 +491,454 @@ class DifferentialWorkspace:
             rutherford = self.rutherford
             f_c = self.f_c
         else:
-            P_l_costheta = eval_legendre(self.ls, np.cos(angles))
-            P_1_l_costheta = lpmv(1, self.ls, np.cos(angles))
-            if self.Zz > 0:
-                sin2 = np.sin(angles / 2) ** 2
-                rutherford = 10 * self.eta**2 / (4 * self.k**2 * sin2**2)
-                f_c = (
-                    -self.eta
-                    / (2 * self.k * sin2)
-                    * np.exp(-1j * self.eta * np.log(sin2) + 2j * self.sigma_l[0])
+            P_l_costheta, P_1_l_costheta, f_c, rutherford = self.angular_factors(angles)
+
+        if grad_scalar is not None or grad_spin_orbit is not None:
+            splus, sminus, dsplus, dsminus = self.integral_workspace.smatrix(
+                interaction_scalar,
+                interaction_spin_orbit,
+                args_scalar,
+                args_spin_orbit,
+                grad_scalar,
+                grad_spin_orbit,
+            )
+            with profiling.stage("legendre_sums"):
+                xs = ElasticXS(
+                    *differential_elastic_xs(
+                        self.k,
+                        angles,
+                        splus,
+                        sminus,
+                        self.ls,
+                        P_l_costheta,
+                        P_1_l_costheta,
+                        f_c,
+                        self.sigma_l,
+                    ),
+                    rutherford,
+                )
+            jacobian = ElasticXSJacobian(
+                *differential_elastic_xs_jacobian(
+                    self.k,
+                    angles,
+                    splus,
+                    sminus,
+                    dsplus,
+                    dsminus,
+                    P_l_costheta,
+                    P_1_l_costheta,
+                    f_c,
+                    self.sigma_l,
                 )
-            else:
-                rutherford = None
-                f_c = np.zeros_like(angles)
+            )
+            return xs, jacobian
 
         splus, sminus = self.integral_workspace.smatrix(
             interaction_scalar, interaction_spin_orbit, args_scalar, args_spin_orbit
         )
-        return ElasticXS(
-            *differential_elastic_xs(
+        with profiling.stage("legendre_sums"):
+            return ElasticXS(
+                *differential_elastic_xs(
+                    self.k,
+                    angles,
+                    splus,
+                    sminus,
+                    self.ls,
+                    P_l_costheta,
+                    P_1_l_costheta,
+                    f_c,
+                    self.sigma_l,
+                ),
+                rutherford,
+            )
+
+    def xs_batch(
+        self,
+        interaction_scalar,
+        interaction_spin_orbit,
+        args_scalar: list,
+        args_spin_orbit: list,
+        angles=None,
+    ):
+        r"""
+        returns the ElasticXS for a batch of nsamples interaction parameter
+        samples, with dsdo and Ay of shape (nsamples, nangles), and t and rxn
+        of shape (nsamples,). The S-matrix is solved for each sample, and the
+        scattering amplitudes for all samples are then accumulated at once
+        (see `differential_elastic_xs_batched`).
+        @parameters:
+            args_scalar (list) : args for interaction_scalar for each sample
+            args_spin_orbit (list) : args for interaction_spin_orbit for each
+                sample
+        """
+        if angles is None:
+            angles = self.angles
+            P_l_costheta = self.P_l_costheta
+            P_1_l_costheta = self.P_1_l_costheta
+            rutherford = self.rutherford
+            f_c = self.f_c
+        else:
+            P_l_costheta, P_1_l_costheta, f_c, rutherford = self.angular_factors(angles)
+
+        # partial waves beyond where each sample's S-matrix has converged
+        # are padded with S = 1, which contribute nothing
+        nsamples = len(args_scalar)
+        nl = self.sys.lmax + 1
+        splus = np.ones((nsamples, nl), dtype=np.complex128)
+        sminus = np.ones((nsamples, nl), dtype=np.complex128)
+        for i in range(nsamples):
+            sp, sm = self.integral_workspace.smatrix(
+                interaction_scalar,
+                interaction_spin_orbit,
+                args_scalar[i],
+                args_spin_orbit[i],
+            )
+            splus[i, : sp.size] = sp
+            sminus[i, : sm.size] = sm
+
+        with profiling.stage("legendre_sums"):
+            return ElasticXS(
+                *differential_elastic_xs_batched(
+                    self.k,
+                    splus,
+                    sminus,
+                    P_l_costheta,
+                    P_1_l_costheta,
+                    f_c,
+                    self.sigma_l[:, 0],
+                ),
+                rutherford,
+            )
+
+
+class MultiEnergyWorkspace:
+    r"""
+    Workspace for differential elastic scattering observables for local
+    interactions with spin-orbit coupling on a grid of energies, e.g. for
+    excitation functions or for fitting data sets at many energies at once.
+
+    Everything that depends only on the energy is precomputed for the whole
+    grid at once: the kinematics, asymptotic Coulomb-Hankel functions (by
+    recurrence in l, see `coulomb_hankel_sequence`), Coulomb phase shifts and
+    amplitudes, and the free matrices, which are the same at every energy
+    for a fixed dimensionless channel radius. The Bloch-Schrödinger
+    equations for all partial waves at a batch of energies are then solved
+    in a single batched call.
+    """
+
+    def __init__(
+        self,
+        projectile: tuple,
+        target: tuple,
+        sys: ProjectileTargetSystem,
+        kinematics: ChannelKinematics,
+        solver: Solver,
+        angles: np.array,
+        batch_size: np.int32 = 16,
+    ):
+        r"""
+        @parameters:
+            projectile (tuple) : (A, Z) of the projectile
+            target (tuple) : (A, Z) of the target
+            sys (ProjectileTargetSystem) : the system, with spin-orbit
+                coupling
+            kinematics (ChannelKinematics) : kinematics with array valued
+                Ecm, mu, k and eta, one element per energy (e.g. from
+                `classical_kinematics` with an array of Elab)
+            solver (Solver) : the R-matrix solver
+            angles (np.array) : center of mass angles [radians]
+            batch_size (int) : number of energies to solve in each batched
+                call; the batched Bloch-Schrödinger matrices take
+                2 (lmax + 1) nbasis^2 complex elements per energy
+        """
+        # system info
+        self.projectile = projectile
+        self.target = target
+        self.sys = sys
+        self.solver = solver
+        self.nbasis = solver.kernel.quadrature.nbasis
+        self.batch_size = batch_size
+
+        # the same free matrices and boundary values apply at all energies
+        a = sys.channel_radius
+        self.free_matrices = np.array(solver.free_matrix(a, sys.l, coupled=False))
+        self.basis_boundary = solver.precompute_boundaries(a)
+        self.l_dot_s = np.zeros((sys.lmax + 1, 2))
+        self.l_dot_s[0, 0] = np.diag(sys.couplings[0])[0]
+        self.l_dot_s[1:] = [np.diag(coupling) for coupling in sys.couplings[1:]]
+        self.ls = self.sys.l[:, np.newaxis]
+        self.Zz = self.projectile[1] * self.target[1]
+        self.angles = angles
+        self.set_kinematics(kinematics)
+
+    def set_kinematics(self, kinematics: ChannelKinematics):
+        r"""
+        (re)computes everything that depends on the energy grid: the
+        kinematics, asymptotics, Coulomb phase shifts and angular factors
+        """
+        a = self.sys.channel_radius
+
+        # kinematic info, indexed by energy
+        self.Ecm = np.atleast_1d(kinematics.Ecm)
+        self.nenergies = self.Ecm.size
+        self.mu = np.broadcast_to(kinematics.mu, self.Ecm.shape)
+        self.k = np.broadcast_to(kinematics.k, self.Ecm.shape)
+        self.eta = np.broadcast_to(kinematics.eta, self.Ecm.shape)
+
+        # asymptotics, indexed by (energy, l); for neutral projectiles these
+        # are the same at every energy
+        etas, inverse = np.unique(self.eta, return_inverse=True)
+        with profiling.stage("asymptotics"):
+            H = np.array(
+                [coulomb_hankel_sequence(a, self.sys.lmax, eta) for eta in etas]
+            )
+        self.Hp, self.Hm, self.Hpp, self.Hmp = np.transpose(
+            H[inverse.ravel()], (1, 0, 2)
+        )
+
+        # precompute things related to Coulomb interaction
+        self.sigma_l = np.angle(gamma(1 + self.sys.l + 1j * self.eta[:, np.newaxis]))
+
+        # precompute angular distributions in each partial wave
+        (
+            self.P_l_costheta,
+            self.P_1_l_costheta,
+            self.f_c,
+            self.rutherford,
+        ) = self.angular_factors(self.angles)
+
+    def at_kinematics(self, kinematics: ChannelKinematics):
+        r"""
+        @returns a copy of this workspace on another energy grid, sharing the
+        free matrices and boundary values, which don't depend on energy
+        """
+        ws = copy(self)
+        ws.set_kinematics(kinematics)
+        return ws
+
+    def angular_factors(self, angles: np.array):
+        r"""
+        @returns the Legendre polynomials P_l(cos(theta)) and associated
+        Legendre polynomials P_l^1(cos(theta)) for each partial wave, and the
+        Coulomb scattering amplitude and the Rutherford cross section (or None
+        for neutral projectiles) at each energy, at the given angles (see
+        `angular_cache`)
+        """
+        P_l_costheta, P_1_l_costheta = angular_cache.legendre(self.sys.lmax, angles)
+        if self.Zz > 0:
+            f_c, rutherford = map(
+                np.array,
+                zip(
+                    *[
+                        angular_cache.coulomb(eta, k, angles)
+                        for eta, k in zip(self.eta, self.k)
+                    ]
+                ),
+            )
+        else:
+            rutherford = None
+            f_c = np.zeros((self.nenergies, angles.size), dtype=np.complex128)
+        return P_l_costheta, P_1_l_costheta, f_c, rutherford
+
+    def smatrix(
+        self,
+        interaction_scalar,
+        interaction_spin_orbit,
+        args_scalar=None,
+        args_spin_orbit=None,
+        smatrix_abs_tol: np.float64 = None,
+        lblock: np.int32 = 8,
+    ):
+        r"""
+        returns the partial wave S-matrix elements as two arrays of shape
+        (nenergies, lmax + 1), one for for the l+1/2 and a second for the
+        l-1/2 partial waves.
+
+        The args for each interaction may either be a tuple, used at every
+        energy, or a list with one tuple per energy (e.g. for energy
+        dependent global potentials).
+
+        If `smatrix_abs_tol` is provided, the partial waves at each batch of
+        energies are solved in blocks of `lblock`, stopping once |1 - S| is
+        below the tolerance for both j at some l > 0 at every energy in the
+        batch, as in `IntegralWorkspace.smatrix`. The largest l before
+        convergence at each energy is also returned, and S is set to 1 for
+        all partial waves above it, whether solved or not.
+        """
+        args_scalar = self.args_per_energy(args_scalar)
+        args_spin_orbit = self.args_per_energy(args_spin_orbit)
+        a = self.sys.channel_radius
+        nl = self.sys.lmax + 1
+
+        S = np.ones((self.nenergies, nl, 2), dtype=np.complex128)
+        lmax = np.full(self.nenergies, self.sys.lmax, dtype=np.int32)
+        for start in range(0, self.nenergies, self.batch_size):
+            batch = np.arange(start, min(start + self.batch_size, self.nenergies))
+
+            # interactions on the mesh at each energy, scaled by 1/E
+            r = self.solver.kernel.quadrature.abscissa[np.newaxis, :] * (
+                a / self.k[batch, np.newaxis]
+            )
+            v_scalar = np.array(
+                [interaction_scalar(r[i], *args_scalar[e]) for i, e in enumerate(batch)]
+            ) / (self.Ecm[batch, np.newaxis])
+            v_spin_orbit = np.array(
+                [
+                    interaction_spin_orbit(r[i], *args_spin_orbit[e])
+                    for i, e in enumerate(batch)
+                ]
+            ) / (self.Ecm[batch, np.newaxis])
+
+            if smatrix_abs_tol is None:
+                S[batch] = self.solve_partial_waves(
+                    batch, 0, nl, v_scalar, v_spin_orbit
+                )
+                continue
+
+            converged = np.zeros(batch.size, dtype=bool)
+            for l0 in range(0, nl, lblock):
+                l1 = min(l0 + lblock, nl)
+                S[batch, l0:l1] = self.solve_partial_waves(
+                    batch, l0, l1, v_scalar, v_spin_orbit
+                )
+                small = np.all(
+                    np.absolute(1 - S[batch, l0:l1]) < smatrix_abs_tol, axis=-1
+                )
+                # as in `IntegralWorkspace.smatrix`, the s-wave is always kept
+                if l0 == 0:
+                    small[:, 0] = False
+                first = np.argmax(small, axis=1)
+                done = ~converged & np.any(small, axis=1)
+                lmax[batch[done]] = l0 + first[done] - 1
+                converged |= done
+                if np.all(converged):
+                    break
+
+            # waves solved beyond convergence in the last block are dropped
+            dropped = self.sys.l[np.newaxis, :] > lmax[batch, np.newaxis]
+            S[batch] = np.where(dropped[..., np.newaxis], 1, S[batch])
+
+        splus = S[..., 0]
+        sminus = S[..., 1]
+        sminus[:, 0] = 0
+        if smatrix_abs_tol is not None:
+            return splus, sminus, lmax
+        return splus, sminus
+
+    def solve_partial_waves(
+        self,
+        batch: np.ndarray,
+        l0: np.int32,
+        l1: np.int32,
+        v_scalar: np.ndarray,
+        v_spin_orbit: np.ndarray,
+    ):
+        r"""
+        @returns the (len(batch), l1 - l0, 2) S-matrix elements for partial
+        waves l0 <= l < l1 at a batch of energies, given the interactions on
+        the mesh at each energy scaled by 1/E, in a single batched solve
+        """
+        a = self.sys.channel_radius
+        nb = self.nbasis
+        diag = np.arange(nb)
+
+        # (energy, l, j, nbasis, nbasis) Bloch-Schrödinger matrices
+        A = np.zeros((batch.size, l1 - l0, 2, nb, nb), dtype=np.complex128)
+        A[...] = self.free_matrices[np.newaxis, l0:l1, np.newaxis, :, :]
+        A[..., diag, diag] += (
+            v_scalar[:, np.newaxis, np.newaxis, :]
+            + self.l_dot_s[np.newaxis, l0:l1, :, np.newaxis]
+            * v_spin_orbit[:, np.newaxis, np.newaxis, :]
+        )
+        with profiling.stage("batched_solve"):
+            X = np.linalg.solve(
+                A,
+                np.broadcast_to(
+                    self.basis_boundary[:, np.newaxis], A.shape[:-1] + (1,)
+                ),
+            )
+        R = (self.basis_boundary @ X)[..., 0] / a**2
+
+        # Eqns 16 and 17 in Descouvemont, 2016, for a single channel
+        Hp = self.Hp[batch, l0:l1, np.newaxis]
+        Hm = self.Hm[batch, l0:l1, np.newaxis]
+        Hpp = self.Hpp[batch, l0:l1, np.newaxis]
+        Hmp = self.Hmp[batch, l0:l1, np.newaxis]
+        return (Hm - a * Hmp * R) / (Hp - a * Hpp * R)
+
+    def transmission_coefficients(
+        self,
+        interaction_scalar,
+        interaction_spin_orbit,
+        args_scalar=None,
+        args_spin_orbit=None,
+        smatrix_abs_tol: np.float64 = None,
+    ):
+        r"""
+        returns the partial wave transmission coefficients 1 - |S|^2 as an
+        array of shape (nenergies, lmax + 1, 2), for j = l + 1/2 and
+        j = l - 1/2, respectively. If `smatrix_abs_tol` is provided, the
+        partial waves are truncated adaptively at each energy (see
+        `smatrix`), the coefficients above the truncation are 0, and the
+        largest l at each energy is also returned.
+        """
+        S = self.smatrix(
+            interaction_scalar,
+            interaction_spin_orbit,
+            args_scalar,
+            args_spin_orbit,
+            smatrix_abs_tol,
+        )
+        T = 1.0 - np.absolute(np.stack(S[:2], axis=-1)) ** 2
+        T[:, 0, 1] = 0
+        if smatrix_abs_tol is None:
+            return T
+        return T, S[2]
+
+    def xs(
+        self,
+        interaction_scalar,
+        interaction_spin_orbit,
+        args_scalar=None,
+        args_spin_orbit=None,
+        angles=None,
+    ):
+        r"""
+        returns the ElasticXS at every energy for the given interaction (see
+        `smatrix`), with dsdo, Ay and rutherford of shape (nenergies,
+        nangles), and t and rxn of shape (nenergies,)
+        """
+        if angles is None:
+            angles = self.angles
+            P_l_costheta = self.P_l_costheta
+            P_1_l_costheta = self.P_1_l_costheta
+            rutherford = self.rutherford
+            f_c = self.f_c
+        else:
+            P_l_costheta, P_1_l_costheta, f_c, rutherford = self.angular_factors(angles)
+
+        splus, sminus = self.smatrix(
+            interaction_scalar, interaction_spin_orbit, args_scalar, args_spin_orbit
+        )
+        with profiling.stage("legendre_sums"):
+            dsdo, Ay, xst, xsrxn = differential_elastic_xs_batched(
                 self.k,
-                angles,
                 splus,
                 sminus,
-                self.ls,
                 P_l_costheta,
                 P_1_l_costheta,
                 f_c,
                 self.sigma_l,
-            ),
-            rutherford,
-        )
+            )
+        return ElasticXS(dsdo, Ay, xst, xsrxn, rutherford)
+
+    def args_per_energy(self, args):
+        if isinstance(args, list):
+            assert len(args) == self.nenergies
+            return args
+        if args is None:
+            args = ()
+        return [args] * self.nenergies
 
 
 @njit
@@ -383,3 +1010,152 @@ def differential_elastic_xs(
     xst *= 10 * 2 * np.pi / k**2
 
     return dsdo, Ay, xst, xsrxn
+
+
+def differential_elastic_xs_batched(
+    k,
+    splus: np.array,
+    sminus: np.array,
+    P_l_costheta: np.array,
+    P_1_l_costheta: np.array,
+    f_c: np.array = 0,
+    sigma_l: np.array = 0,
+):
+    r"""
+    Calculates differential, total and reaction cross sections and analyzing
+    powers for spin-1/2 spin-0 scattering (see `differential_elastic_xs`) for
+    a batch of nsamples sets of partial wave S-matrix elements at once.
+
+    The partial wave sums for the amplitudes are matrix products of the
+    (nsamples, nl) partial wave coefficients with the (nl, nangles) Legendre
+    tables, each evaluated as a single real GEMM by stacking the real and
+    imaginary parts of the coefficients.
+
+    @parameters:
+        k : wavenumber, either a scalar or an (nsamples,) array
+        splus, sminus (np.array) : (nsamples, nl) S-matrix elements for the
+            l+1/2 and l-1/2 partial waves
+        P_l_costheta, P_1_l_costheta (np.array) : (>= nl, nangles) Legendre and
+            associated Legendre polynomials
+        f_c : Coulomb amplitude, of shape (nangles,) or (nsamples, nangles)
+        sigma_l : Coulomb phase shifts, of shape (nl,) or (nsamples, nl)
+    @returns:
+        dsdo and Ay, each of shape (nsamples, nangles), and the total and
+        reaction cross sections, each of shape (nsamples,)
+    """
+    nsamples, nl = splus.shape
+    l = np.arange(nl)
+    k = np.asarray(k, dtype=np.float64)
+    phase = np.exp(2j * np.asarray(sigma_l)) / (2j * k[..., np.newaxis])
+    A = phase * ((l + 1) * (splus - 1) + l * (sminus - 1))
+    B = phase * (splus - sminus)
+
+    a = complex_real_matmul(A, P_l_costheta[:nl]) + f_c
+    b = complex_real_matmul(B, P_1_l_costheta[:nl])
+
+    dsdo = (np.absolute(a) ** 2 + np.absolute(b) ** 2) * 10
+    Ay = np.imag(a.conj() * b) * 10 / dsdo
+    xsrxn = np.sum(
+        (l + 1) * (1 - np.absolute(splus) ** 2) + l * (1 - np.absolute(sminus) ** 2),
+        axis=1,
+    )
+    xst = np.sum((l + 1) * (1 - np.real(splus)) + l * (1 - np.real(sminus)), axis=1)
+    xsrxn *= 10 * np.pi / k**2
+    xst *= 10 * 2 * np.pi / k**2
+
+    return dsdo, Ay, xst, xsrxn
+
+
+def complex_real_matmul(A: np.array, P: np.array):
+    r"""
+    @returns A @ P for complex A of shape (n, m) and real P of shape (m, p),
+    as a single real GEMM
+    """
+    n = A.shape[0]
+    AP = np.concatenate([A.real, A.imag]) @ P
+    return AP[:n] + 1j * AP[n:]
+
+
+@njit
+def integral_elastic_xs_jacobian(
+    k: float,
+    splus: np.array,
+    sminus: np.array,
+    dsplus: np.array,
+    dsminus: np.array,
+):
+    r"""
+    Jacobians of the total and reaction cross sections w.r.t. a set of
+    parameters, given the Jacobians of the partial wave S-matrix elements,
+    each of shape (nparams, nl)
+    """
+    nparams = dsplus.shape[0]
+    dxsrxn = np.zeros(nparams, dtype=np.float64)
+    dxst = np.zeros(nparams, dtype=np.float64)
+
+    for l in range(splus.shape[0]):
+        dxsrxn -= 2 * (l + 1) * np.real(np.conj(splus[l]) * dsplus[:, l]) + 2 * l * (
+            np.real(np.conj(sminus[l]) * dsminus[:, l])
+        )
+        dxst -= (l + 1) * np.real(dsplus[:, l]) + l * np.real(dsminus[:, l])
+
+    dxsrxn *= 10 * np.pi / k**2
+    dxst *= 10 * 2 * np.pi / k**2
+
+    return dxst, dxsrxn
+
+
+@njit
+def differential_elastic_xs_jacobian(
+    k: float,
+    angles: np.array,
+    splus: np.array,
+    sminus: np.array,
+    dsplus: np.array,
+    dsminus: np.array,
+    P_l_costheta: np.array,
+    P_1_l_costheta: np.array,
+    f_c: np.array = 0,
+    sigma_l: np.array = 0,
+):
+    r"""
+    Jacobians of the differential, total and reaction cross sections and
+    analyzing power w.r.t. a set of parameters (see
+    `differential_elastic_xs`), given the Jacobians of the partial wave
+    S-matrix elements, each of shape (nparams, nl)
+    """
+    nparams = dsplus.shape[0]
+    a = np.zeros_like(angles, dtype=np.complex128) + f_c
+    b = np.zeros_like(angles, dtype=np.complex128)
+    da = np.zeros((nparams, angles.shape[0]), dtype=np.complex128)
+    db = np.zeros((nparams, angles.shape[0]), dtype=np.complex128)
+
+    for l in range(splus.shape[0]):
+        phase = np.exp(2j * sigma_l[l]) / (2j * k)
+        a += (
+            P_l_costheta[l, :]
+            * phase
+            * ((l + 1) * (splus[l] - 1) + l * (sminus[l] - 1))
+        )
+        b += P_1_l_costheta[l, :] * phase * (splus[l] - sminus[l])
+        for p in range(nparams):
+            da[p, :] += (
+                P_l_costheta[l, :]
+                * phase
+                * ((l + 1) * dsplus[p, l] + l * dsminus[p, l])
+            )
+            db[p, :] += P_1_l_costheta[l, :] * phase * (dsplus[p, l] - dsminus[p, l])
+
+    dsdo = (np.absolute(a) ** 2 + np.absolute(b) ** 2) * 10
+    Ay = np.imag(a.conj() * b) * 10 / dsdo
+    ddsdo = np.zeros((nparams, angles.shape[0]), dtype=np.float64)
+    dAy = np.zeros((nparams, angles.shape[0]), dtype=np.float64)
+    for p in range(nparams):
+        ddsdo[p, :] = 20 * np.real(a.conj() * da[p, :] + b.conj() * db[p, :])
+        dAy[p, :] = (
+            10 * np.imag(da[p, :].conj() * b + a.conj() * db[p, :]) - Ay * ddsdo[p, :]
+        ) / dsdo
+
+    dxst, dxsrxn = integral_elastic_xs_jacobian(k, splus, sminus, dsplus, dsminus)
+
+    return ddsdo, dAy, dxst, dxsrxn
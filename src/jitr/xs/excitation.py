@@ -0,0 +1,143 @@
+from dataclasses import dataclass
+
+import numpy as np
+from scipy.interpolate import CubicSpline
+
+from ..utils.kinematics import classical_kinematics
+from .elastic import MultiEnergyWorkspace, integral_elastic_xs
+
+
+@dataclass
+class ExcitationFunction:
+    r"""
+    Total and reaction cross sections [mb] and partial wave S-matrix
+    elements (each of shape (nenergies, lmax + 1)) on an adaptively refined
+    grid of lab energies [MeV]
+    """
+
+    Elab: np.ndarray
+    t: np.ndarray
+    rxn: np.ndarray
+    splus: np.ndarray
+    sminus: np.ndarray
+
+
+def excitation_function(
+    workspace: MultiEnergyWorkspace,
+    interaction_scalar,
+    interaction_spin_orbit,
+    Elab_min: np.float64,
+    Elab_max: np.float64,
+    args_scalar=None,
+    args_spin_orbit=None,
+    params=None,
+    rtol: np.float64 = 1e-3,
+    atol: np.float64 = 0.0,
+    refine_on: str = "xs",
+    npoints: np.int32 = 9,
+    max_points: np.int32 = 512,
+    min_spacing: np.float64 = 1e-6,
+):
+    r"""
+    Computes an excitation function on an adaptively refined energy grid.
+    Starting from a coarse uniform grid, the midpoint of every interval is
+    predicted with a cubic spline through the current grid, and all the
+    midpoints are then solved at once in a batched multi-energy solve. An
+    interval is accepted if the prediction agrees with the solution to
+    within atol + rtol |value|; otherwise the midpoint is added to the grid,
+    and both halves are refined in the next round. This resolves resonances
+    with far fewer solves than a uniformly fine grid.
+
+    The free matrices and boundary values of the workspace are reused for
+    every new energy (see `MultiEnergyWorkspace.at_kinematics`), so each
+    round only computes the asymptotics at the new energies.
+
+    @parameters:
+        workspace (MultiEnergyWorkspace) : workspace for the system, on any
+            energy grid; its angles should be empty to skip angular factors
+        interaction_scalar (callable) : scalar interaction
+        interaction_spin_orbit (callable) : spin-orbit interaction
+        Elab_min, Elab_max (float) : lab energy range [MeV]
+        args_scalar, args_spin_orbit (tuple) : energy independent args for
+            the interactions
+        params (callable) : if given, a function of (Elab, mu, k) returning
+            (args_scalar, args_spin_orbit) at each energy, e.g. for a global
+            optical potential, used instead of args_scalar and
+            args_spin_orbit
+        rtol, atol (float) : tolerance of the interpolated values
+        refine_on (str) : "xs" to refine on the total and reaction cross
+            sections, or "smatrix" to refine on every S-matrix element, with
+            tolerance atol + rtol
+        npoints (int) : size of the initial uniform grid, at least 4
+        max_points (int) : maximum size of the refined grid
+        min_spacing (float) : intervals narrower than this [MeV] are not
+            refined further
+    @returns:
+        the ExcitationFunction on the refined grid
+    """
+    assert npoints >= 4
+    assert refine_on in ("xs", "smatrix")
+    mass_target = workspace.sys.mass_target
+    mass_projectile = workspace.sys.mass_projectile
+
+    def solve(Elab):
+        kinematics = classical_kinematics(
+            mass_target, mass_projectile, Elab, Zz=workspace.Zz
+        )
+        ws = workspace.at_kinematics(kinematics)
+        if params is not None:
+            args = [params(Elab[i], ws.mu[i], ws.k[i]) for i in range(Elab.size)]
+            scalar = [s for s, _ in args]
+            spin_orbit = [so for _, so in args]
+        else:
+            scalar, spin_orbit = args_scalar, args_spin_orbit
+        splus, sminus = ws.smatrix(
+            interaction_scalar, interaction_spin_orbit, scalar, spin_orbit
+        )
+        xs = np.array(
+            [
+                integral_elastic_xs(ws.k[i], splus[i], sminus[i], ws.ls, ws.sigma_l[i])
+                for i in range(Elab.size)
+            ]
+        )
+        return xs, splus, sminus
+
+    def refinement_values(xs, splus, sminus):
+        if refine_on == "xs":
+            return xs
+        S = np.concatenate([splus, sminus], axis=1)
+        return np.concatenate([S.real, S.imag], axis=1)
+
+    Elab = np.linspace(Elab_min, Elab_max, npoints)
+    xs, splus, sminus = solve(Elab)
+    intervals = list(zip(Elab[:-1], Elab[1:]))
+    while len(intervals) > 0 and Elab.size < max_points:
+        intervals = [(lo, hi) for lo, hi in intervals if hi - lo > min_spacing]
+        intervals = intervals[: max_points - Elab.size]
+        if len(intervals) == 0:
+            break
+        midpoints = np.array([(lo + hi) / 2 for lo, hi in intervals])
+
+        spline = CubicSpline(Elab, refinement_values(xs, splus, sminus), axis=0)
+        predicted = spline(midpoints)
+        xs_mid, splus_mid, sminus_mid = solve(midpoints)
+        values = refinement_values(xs_mid, splus_mid, sminus_mid)
+        scale = np.absolute(values) if refine_on == "xs" else 1.0
+        failed = np.any(np.absolute(predicted - values) > atol + rtol * scale, axis=1)
+
+        # every solved midpoint joins the grid
+        Elab = np.concatenate([Elab, midpoints])
+        xs = np.concatenate([xs, xs_mid])
+        splus = np.concatenate([splus, splus_mid])
+        sminus = np.concatenate([sminus, sminus_mid])
+        order = np.argsort(Elab)
+        Elab, xs, splus, sminus = Elab[order], xs[order], splus[order], sminus[order]
+
+        intervals = [
+            half
+            for (lo, hi), m, f in zip(intervals, midpoints, failed)
+            if f
+            for half in ((lo, m), (m, hi))
+        ]
+
+    return ExcitationFunction(Elab, xs[:, 0], xs[:, 1], splus, sminus)
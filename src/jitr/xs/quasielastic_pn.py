@@ -4,7 +4,13 @@ import numpy as np
 from scipy.special import sph_harm, gamma
 from sympy.physics.wigner import clebsch_gordan
 
+from .. import profiling
 from ..utils import constants
+from ..utils.partial_waves import (
+    PartialWaveSequence,
+    interaction_range,
+    semiclassical_lmax,
+)
 from ..utils.kinematics import (
     ChannelKinematics,
     mass,
@@ -89,17 +95,28 @@ class System:
 class Workspace:
     r"""
     Workspace for (p,n) quasi-elastic scattering observables for local interactions
+
+    As in `IntegralWorkspace`, the data for each partial wave are built
+    lazily, and, optionally, partial waves beyond the grazing partial wave of
+    the range of the nuclear interactions, in which the T-matrix vanishes,
+    are not solved.
     """
 
     @classmethod
     def load(obj, filename):
         with open(filename, "rb") as f:
             ws = pickle.load(f)
+        # workspaces saved before Solver was picklable have no solver
+        if ws.solver is None:
             ws.solver = Solver(ws.nbasis)
+        # workspaces saved before the semiclassical lmax solve all waves
+        if not hasattr(ws, "semiclassical"):
+            ws.semiclassical = False
+            ws.lmax_margin = 1
+            ws.potential_tol = ws.tmatrix_abs_tol
         return ws
 
     def save(self, filename):
-        self.solver = None
         with open(filename, "wb") as f:
             pickle.dump(self, f)
 
@@ -113,7 +130,22 @@ class Workspace:
         solver: Solver,
         angles: np.array,
         tmatrix_abs_tol: np.float64 = 1e-6,
+        semiclassical: bool = False,
+        lmax_margin: np.int32 = 1,
+        potential_tol: np.float64 = None,
     ):
+        r"""
+        @parameters:
+            tmatrix_abs_tol (float) : partial waves are solved until both
+                T-matrix elements are below this
+            semiclassical (bool) : whether to skip the partial waves beyond
+                the grazing partial wave of the range of the interactions
+            lmax_margin (int) : number of partial waves beyond the grazing
+                one to solve
+            potential_tol (float) : the nuclear interactions are considered
+                to vanish where they are below this [MeV]; defaults to
+                tmatrix_abs_tol
+        """
         assert np.all(np.diff(angles) > 0)
         assert angles[0] >= 0.0 and angles[-1] <= np.pi
         self.sys = sys
@@ -129,36 +161,38 @@ class Workspace:
         self.solver = solver
         self.nbasis = solver.kernel.quadrature.nbasis
         self.tmatrix_abs_tol = tmatrix_abs_tol
+        self.semiclassical = semiclassical
+        self.lmax_margin = lmax_margin
+        self.potential_tol = (
+            potential_tol if potential_tol is not None else tmatrix_abs_tol
+        )
+        nl = sys.lmax + 1
 
         # precompute things for entrance channel
-        self.free_matrices_p = self.solver.free_matrix(
-            sys.entrance.channel_radius, sys.l, coupled=False
-        )
+        self.free_matrices_p = PartialWaveSequence(self.build_free_matrix_p, nl)
         self.basis_boundary_p = self.solver.precompute_boundaries(
             sys.entrance.channel_radius
         )
+        self.solver_workspace_p = self.solver.workspace(1)
 
         # precompute things for exit channel
-        self.free_matrices_n = self.solver.free_matrix(
-            sys.exit.channel_radius, sys.l, coupled=False
-        )
+        self.free_matrices_n = PartialWaveSequence(self.build_free_matrix_n, nl)
         self.basis_boundary_n = self.solver.precompute_boundaries(
             sys.exit.channel_radius
         )
+        self.solver_workspace_n = self.solver.workspace(1)
 
-        # get partial wave information for entrance channel
-        channels, asymptotics = sys.entrance.get_partial_wave_channels(
-            *self.kinematics_entrance
-        )
-        self.p_channels = [ch.decouple() for ch in channels]
-        self.p_asymptotics = [asym.decouple() for asym in asymptotics]
+        # partial wave information for entrance and exit channels, built on
+        # first use
+        self.p_partial_waves = PartialWaveSequence(self.build_partial_wave_p, nl)
+        self.p_channels = PartialWaveSequence(self.build_channels_p, nl)
+        self.p_asymptotics = PartialWaveSequence(self.build_asymptotics_p, nl)
+        self.n_partial_waves = PartialWaveSequence(self.build_partial_wave_n, nl)
+        self.n_channels = PartialWaveSequence(self.build_channels_n, nl)
+        self.n_asymptotics = PartialWaveSequence(self.build_asymptotics_n, nl)
 
-        # get partial wave information for exit channel
-        channels, asymptotics = sys.exit.get_partial_wave_channels(
-            *self.kinematics_exit
-        )
-        self.n_channels = [ch.decouple() for ch in channels]
-        self.n_asymptotics = [asym.decouple() for asym in asymptotics]
+        # radial grid [fm] on which the range of the interactions is found
+        self.r_range_grid = np.linspace(0, sys.channel_radius_fm, 400)[1:]
 
         # l . s for p-wave and up
         self.l_dot_s = np.array(
@@ -200,6 +234,86 @@ class Workspace:
                                 * ylm
                             )
 
+    def build_free_matrix_p(self, l: np.int32):
+        return self.solver.free_matrix(
+            self.sys.entrance.channel_radius, l, coupled=False
+        )[0]
+
+    def build_free_matrix_n(self, l: np.int32):
+        return self.solver.free_matrix(self.sys.exit.channel_radius, l, coupled=False)[
+            0
+        ]
+
+    def build_partial_wave_p(self, l: np.int32):
+        channels, asymptotics = self.sys.entrance.partial_wave_channels(
+            l, *self.kinematics_entrance
+        )
+        return channels.decouple(), asymptotics.decouple()
+
+    def build_partial_wave_n(self, l: np.int32):
+        channels, asymptotics = self.sys.exit.partial_wave_channels(
+            l, *self.kinematics_exit
+        )
+        return channels.decouple(), asymptotics.decouple()
+
+    def build_channels_p(self, l: np.int32):
+        return self.p_partial_waves[l][0]
+
+    def build_asymptotics_p(self, l: np.int32):
+        return self.p_partial_waves[l][1]
+
+    def build_channels_n(self, l: np.int32):
+        return self.n_partial_waves[l][0]
+
+    def build_asymptotics_n(self, l: np.int32):
+        return self.n_partial_waves[l][1]
+
+    def predicted_lmax(
+        self,
+        U_p_scalar,
+        U_p_spin_orbit,
+        U_n_scalar,
+        U_n_spin_orbit,
+        args_p_scalar,
+        args_p_spin_orbit,
+        args_n_scalar,
+        args_n_spin_orbit,
+    ):
+        r"""
+        @returns the largest partial wave, no larger than the lmax of the
+        system, in which the T-matrix for the given nuclear interactions is
+        nonzero, estimated as the larger of the entrance and exit channel
+        grazing partial waves at the range of the interactions (see
+        `semiclassical_lmax`)
+        """
+        r = self.r_range_grid
+        r_range = interaction_range(
+            r,
+            [
+                U_p_scalar(r, *args_p_scalar),
+                U_p_spin_orbit(r, *args_p_spin_orbit),
+                U_n_scalar(r, *args_n_scalar),
+                U_n_spin_orbit(r, *args_n_spin_orbit),
+            ],
+            self.potential_tol,
+        )
+        return max(
+            semiclassical_lmax(
+                self.kinematics_entrance.k,
+                self.kinematics_entrance.eta,
+                r_range,
+                self.sys.lmax,
+                self.lmax_margin,
+            ),
+            semiclassical_lmax(
+                self.kinematics_exit.k,
+                self.kinematics_exit.eta,
+                r_range,
+                self.sys.lmax,
+                self.lmax_margin,
+            ),
+        )
+
     def tmatrix(
         self,
         U_p_coulomb=None,
@@ -213,6 +327,23 @@ class Workspace:
         args_n_scalar=None,
         args_n_spin_orbit=None,
     ):
+        lmax = self.sys.lmax
+        if self.semiclassical:
+            lmax = self.predicted_lmax(
+                U_p_scalar,
+                U_p_spin_orbit,
+                U_n_scalar,
+                U_n_spin_orbit,
+                args_p_scalar,
+                args_p_spin_orbit,
+                args_n_scalar,
+                args_n_spin_orbit,
+            )
+            if lmax < self.sys.lmax:
+                profiling.count(
+                    "tmatrix_semiclassical_cutoff", self.sys.lmax - lmax, l=lmax
+                )
+
         Tpn = np.zeros((self.sys.lmax + 1, 2), dtype=np.complex128)
         Sn = np.zeros((self.sys.lmax + 1, 2), dtype=np.complex128)
         Sp = np.zeros((self.sys.lmax + 1, 2), dtype=np.complex128)
@@ -298,6 +429,7 @@ class Workspace:
                 interaction_matrix=im_scalar_n + l_dot_s * im_spin_orbit_n,
                 basis_boundary=self.basis_boundary_n,
                 wavefunction=True,
+                workspace=self.solver_workspace_n,
             )
             _, splj, xp, up = self.solver.solve(
                 pch[ji],
@@ -308,6 +440,7 @@ class Workspace:
                 ),
                 basis_boundary=self.basis_boundary_p,
                 wavefunction=True,
+                workspace=self.solver_workspace_p,
             )
 
             tlj = (
@@ -319,18 +452,21 @@ class Workspace:
             return tlj, snlj, splj
 
         # S-wave
-        Tpn[0, 0], Sn[0, 0], Sp[0, 0] = tmatrix_element(0, 0, 0)
+        with profiling.stage("partial_wave", 0):
+            Tpn[0, 0], Sn[0, 0], Sp[0, 0] = tmatrix_element(0, 0, 0)
 
         # higher partial waves
-        for l in self.sys.l[1:]:
+        for l in range(1, lmax + 1):
             l_dot_s = self.l_dot_s[l - 1]
-            Tpn[l, 0], Sn[l, 0], Sp[l, 0] = tmatrix_element(l, 0, l_dot_s[0])
-            Tpn[l, 1], Sn[l, 1], Sp[l, 1] = tmatrix_element(l, 1, l_dot_s[1])
+            with profiling.stage("partial_wave", l):
+                Tpn[l, 0], Sn[l, 0], Sp[l, 0] = tmatrix_element(l, 0, l_dot_s[0])
+                Tpn[l, 1], Sn[l, 1], Sp[l, 1] = tmatrix_element(l, 1, l_dot_s[1])
 
             if (
                 np.absolute(Tpn[l, 0]) < self.tmatrix_abs_tol
                 and np.absolute(Tpn[l, 1]) < self.tmatrix_abs_tol
             ):
+                profiling.count("tmatrix_early_termination", l=l)
                 break
 
         return Tpn, Sn, Sp
@@ -0,0 +1,160 @@
+import json
+from dataclasses import dataclass
+
+import numpy as np
+
+from .elastic import MultiEnergyWorkspace
+
+MAGIC = b"JITRTLJ1"
+
+
+@dataclass
+class TransmissionTable:
+    r"""
+    Transmission coefficients T_lj on an energy grid for one projectile and
+    target, as consumed by Hauser-Feshbach codes: T[e, l, 0] for j = l + 1/2
+    and T[e, l, 1] for j = l - 1/2 at lab energy Elab[e], with lmax[e] the
+    largest partial wave retained at that energy
+    """
+
+    projectile: tuple
+    target: tuple
+    Elab: np.ndarray
+    lmax: np.ndarray
+    T: np.ndarray
+
+    def __call__(self, Elab: np.float64):
+        r"""
+        @returns T_lj (lmax + 1, 2) at Elab, linearly interpolated in energy
+        """
+        T = self.T.reshape(self.Elab.size, -1)
+        return np.array(
+            [np.interp(Elab, self.Elab, T[:, i]) for i in range(T.shape[1])]
+        ).reshape(self.T.shape[1:])
+
+
+def transmission_table(
+    workspace: MultiEnergyWorkspace,
+    Elab: np.ndarray,
+    interaction_scalar,
+    interaction_spin_orbit,
+    args_scalar=None,
+    args_spin_orbit=None,
+    smatrix_abs_tol: np.float64 = 1e-6,
+):
+    r"""
+    @returns the TransmissionTable on the energy grid of a
+    MultiEnergyWorkspace, from batched solves with partial waves truncated
+    adaptively at each energy (see `MultiEnergyWorkspace.smatrix`)
+    @parameters:
+        workspace (MultiEnergyWorkspace) : workspace on the energy grid
+        Elab (np.ndarray) : the lab energies of the workspace grid
+        interaction_scalar, interaction_spin_orbit, args_scalar,
+            args_spin_orbit : see `MultiEnergyWorkspace.smatrix`
+        smatrix_abs_tol (float) : partial waves are truncated once |1 - S| is
+            below this for both j
+    """
+    T, lmax = workspace.transmission_coefficients(
+        interaction_scalar,
+        interaction_spin_orbit,
+        args_scalar,
+        args_spin_orbit,
+        smatrix_abs_tol,
+    )
+    return TransmissionTable(
+        tuple(workspace.projectile), tuple(workspace.target), Elab, lmax, T
+    )
+
+
+def write_tables(filename, tables: list):
+    r"""
+    Writes TransmissionTables to a compact binary file. After a magic number
+    and the size of the index, the file holds a JSON index with the
+    projectile, target, grid shape and data offsets of each table, followed
+    by the data: for each table, Elab (float64), lmax (int16) and T (float32,
+    truncated to the largest lmax of the table).
+    """
+    index = []
+    blobs = []
+    offset = 0
+    for table in tables:
+        nl = int(np.max(table.lmax)) + 1
+        arrays = [
+            np.ascontiguousarray(table.Elab, dtype="<f8"),
+            np.ascontiguousarray(table.lmax, dtype="<i2"),
+            np.ascontiguousarray(table.T[:, :nl, :], dtype="<f4"),
+        ]
+        entry = {
+            "projectile": list(table.projectile),
+            "target": list(table.target),
+            "nenergies": int(table.Elab.size),
+            "nl": nl,
+        }
+        for name, array in zip(("Elab", "lmax", "T"), arrays):
+            entry[name] = offset
+            blobs.append(array.tobytes())
+            offset += array.nbytes
+            # keep each array aligned for memory mapping
+            pad = -offset % 8
+            blobs.append(b"\0" * pad)
+            offset += pad
+        index.append(entry)
+
+    header = json.dumps(index).encode()
+    header += b" " * (-(len(MAGIC) + 8 + len(header)) % 8)
+    with open(filename, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(header)).tobytes())
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+
+
+class TransmissionTableFile:
+    r"""
+    Read access to a file written by `write_tables`. Only the index is read
+    on opening; the data are memory mapped, so that looking up a single
+    (projectile, target) table in a chart-wide file is cheap.
+    """
+
+    def __init__(self, filename):
+        with open(filename, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{filename} is not a transmission table file")
+            size = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+            self.index = json.loads(f.read(size))
+        self.data = np.memmap(
+            filename, dtype=np.uint8, mode="r", offset=len(MAGIC) + 8 + size
+        )
+        self.entries = {
+            (tuple(e["projectile"]), tuple(e["target"])): e for e in self.index
+        }
+
+    def keys(self):
+        r"""
+        @returns the (projectile, target) of each table
+        """
+        return list(self.entries.keys())
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __getitem__(self, key):
+        r"""
+        @returns the TransmissionTable for key = (projectile, target)
+        """
+        e = self.entries[key]
+        ne, nl = e["nenergies"], e["nl"]
+
+        def view(name, dtype, shape):
+            start = e[name]
+            nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            return self.data[start : start + nbytes].view(dtype).reshape(shape)
+
+        return TransmissionTable(
+            key[0],
+            key[1],
+            view("Elab", "<f8", (ne,)),
+            view("lmax", "<i2", (ne,)),
+            view("T", "<f4", (ne, nl, 2)),
+        )
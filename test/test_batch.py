@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from jitr import rmatrix, xs, batch
+from jitr.reactions import (
+    ProjectileTargetSystem,
+    spin_half_orbit_coupling,
+    KDGlobal,
+    KD_spin_orbit,
+)
+from jitr.utils import kinematics
+
+spec = batch.JobSpec(
+    projectiles=[(1, 1)],
+    targets=[(48, 20)],
+    energies=[14.1, 30.0],
+    omp={"model": "KDUQ", "samples": 3},
+    observables=["t", "rxn"],
+    nbasis=30,
+    lmax=20,
+    chunk_size=2,
+)
+
+
+def test_batch_resume(tmp_path):
+    driver = batch.BatchDriver(spec, tmp_path)
+    assert driver.run(nworkers=1) == 4
+    results = driver.collect()
+    assert results["rxn"].shape == (2, 3)
+
+    # a killed job loses at most its chunks in flight
+    lost = sorted((tmp_path / "chunks").glob("*.npz"))[1]
+    lost.unlink()
+    assert batch.BatchDriver.resume(tmp_path).status() == (3, 4)
+    assert batch.cli.main(["resume", str(tmp_path), "-j", "1", "-q"]) == 0
+    np.testing.assert_array_equal(driver.collect()["rxn"], results["rxn"])
+
+    # the output directory can't be reused for another job
+    with pytest.raises(ValueError):
+        batch.BatchDriver(batch.JobSpec(**{**spec.to_dict(), "lmax": 25}), tmp_path)
+
+    # check against a direct calculation, for the second sample at 30 MeV
+    target, proton = (48, 20), (1, 1)
+    sys = ProjectileTargetSystem(
+        channel_radius=spec.channel_radius,
+        lmax=spec.lmax,
+        mass_target=kinematics.mass(*target),
+        mass_projectile=kinematics.mass(*proton),
+        Ztarget=target[1],
+        Zproj=proton[1],
+        coupling=spin_half_orbit_coupling,
+    )
+    kin = kinematics.classical_kinematics(
+        sys.mass_target, sys.mass_projectile, 30.0, Zz=target[1]
+    )
+    ws = xs.elastic.IntegralWorkspace(proton, target, sys, kin, rmatrix.Solver(30))
+    omp = KDGlobal(proton, batch.omp.DATA_DIR / "KDUQFederal/1/parameters.json")
+    coulomb, scalar, spin_orbit = omp.get_params(*target, kin.mu, 30.0, kin.k)
+    t, rxn = ws.xs(
+        batch.KD_scalar_coulomb,
+        KD_spin_orbit,
+        scalar + coulomb,
+        spin_orbit,
+    )
+    np.testing.assert_allclose(results["rxn"][1, 1], rxn)
+    np.testing.assert_allclose(results["t"][1, 1], t)
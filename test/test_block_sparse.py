@@ -0,0 +1,86 @@
+from jitr import rmatrix
+import numpy as np
+
+nbasis = 20
+nch = 3
+solver = rmatrix.Solver(nbasis)
+a = 4 * np.pi
+
+
+def potential_3level(r, depth, coupling):
+    diag = -depth * np.exp(-r)
+    off = -coupling * np.exp(-r)
+    zero = np.zeros_like(r)
+    return np.array([[diag, off, zero], [off, diag, zero], [zero, zero, diag]])
+
+
+def potential_nonlocal(r, rp, depth):
+    return -depth * np.exp(-((r - rp) ** 2)) * np.ones((nch, nch, 1, 1))
+
+
+def dense_interaction(k0, E0, local_args, nonlocal_args):
+    r"""reference dense assembly of the full interaction matrix"""
+    sz = nch * nbasis
+    V = np.zeros((sz, sz), dtype=np.complex128)
+    Vl = solver.kernel.matrix_local(potential_3level, a / k0, local_args)
+    Vnl = solver.kernel.matrix_nonlocal(potential_nonlocal, a / k0, args=nonlocal_args)
+    for i in range(nch):
+        for j in range(nch):
+            V[i * nbasis : (i + 1) * nbasis, j * nbasis : (j + 1) * nbasis] = (
+                np.diag(Vl[i, j]) + Vnl[i, j] / k0
+            )
+    return V / E0
+
+
+def test_block_sparse_interaction():
+    k0, E0 = 1.3, 12.0
+    V = solver.interaction_matrix(
+        k0,
+        E0,
+        a,
+        nch,
+        local_interaction=potential_3level,
+        local_args=(10.0, 2.0),
+    )
+    assert isinstance(V, rmatrix.BlockSparseMatrix)
+    # 3 diagonal blocks and the (0,1), (1,0) couplings
+    assert V.nnz_blocks == 5
+    assert V.nbytes == 5 * nbasis * np.dtype(np.complex128).itemsize
+
+    Vnl = solver.interaction_matrix(
+        k0,
+        E0,
+        a,
+        nch,
+        local_interaction=potential_3level,
+        local_args=(10.0, 2.0),
+        nonlocal_interaction=potential_nonlocal,
+        nonlocal_args=(3.0,),
+    )
+    np.testing.assert_allclose(
+        Vnl.todense(), dense_interaction(k0, E0, (10.0, 2.0), (3.0,)), atol=1e-12
+    )
+
+
+def test_block_sparse_arithmetic():
+    l = np.array([0, 1, 2])
+    E = np.array([1.0, 0.8, 0.5])
+    F = solver.free_matrix(a, l, E)
+    V = solver.interaction_matrix(
+        1.0, 1.0, a, nch, local_interaction=potential_3level, local_args=(10.0, 2.0)
+    )
+    A = F + 0.5 * V - V / 4
+    Ad = F.todense() + 0.5 * V.todense() - V.todense() / 4
+    np.testing.assert_allclose(A.todense(), Ad, atol=1e-12)
+    np.testing.assert_allclose(F.todense() + V, F + V.todense(), atol=1e-12)
+
+    x = np.random.default_rng(13).normal(size=(nch * nbasis, 2))
+    np.testing.assert_allclose(A @ x, Ad @ x, atol=1e-10)
+
+    blocks = solver.free_matrix(a, l, E, coupled=False)
+    for i in range(nch):
+        np.testing.assert_allclose(blocks[i], solver.get_channel_block(F, i))
+        np.testing.assert_allclose(
+            solver.get_channel_block(Ad, i, 2 - i),
+            solver.get_channel_block(A, i, 2 - i),
+        )
@@ -0,0 +1,80 @@
+import numpy as np
+
+from jitr.bound import BoundStateSolver, spin_orbit_coupling
+from jitr.quadrature import LagrangeLaguerreQuadrature, generate_laguerre_quadrature
+from jitr.utils.constants import HBARC
+
+mu = 938.0  # MeV
+hw = 10.0  # MeV
+solver = BoundStateSolver(40, 0.15)
+channels = [(0, 0.5), (1, 1.5), (1, 0.5), (2, 2.5), (2, 1.5)]
+
+
+def oscillator(r, depth):
+    return 0.5 * mu * (hw / HBARC) ** 2 * r**2 - depth
+
+
+def constant(r, c):
+    return c * np.ones_like(r)
+
+
+def test_laguerre_overlap():
+    x, w = generate_laguerre_quadrature(10)
+    q = LagrangeLaguerreQuadrature(x, w)
+    np.testing.assert_allclose(np.diag(q.overlap), 1 + 1 / x)
+
+
+def test_harmonic_oscillator():
+    depths = [50.0, 60.0]
+    so = [0.5, -1.0]
+    states = solver.solve(
+        mu, channels, oscillator, [(d,) for d in depths], constant, [(c,) for c in so]
+    )
+    assert states.energies.shape == (2, len(channels), solver.nbasis)
+
+    # the coefficient is l for j = l + 1/2 and -(l + 1) for j = l - 1/2
+    np.testing.assert_allclose(
+        [spin_orbit_coupling(l, j) for l, j in channels], [0, 1, -2, 2, -3]
+    )
+
+    n = np.arange(3)
+    for i, (depth, c) in enumerate(zip(depths, so)):
+        for k, (l, j) in enumerate(channels):
+            expected = hw * (2 * n + l + 1.5) - depth + c * spin_orbit_coupling(l, j)
+            np.testing.assert_allclose(states.energies[i, k, :3], expected, atol=1e-6)
+            np.testing.assert_allclose(
+                states.binding_energies(0)[i, k], -expected[0], atol=1e-6
+            )
+
+
+def test_batched():
+    args = [(50.0,), (60.0,), (70.0,)]
+    batched = solver.solve(mu, channels, oscillator, args)
+    for i, a in enumerate(args):
+        for k, channel in enumerate(channels):
+            single = solver.solve(mu, [channel], oscillator, [a])
+            np.testing.assert_allclose(
+                batched.energies[i, k], single.energies[0, 0], atol=1e-10
+            )
+            np.testing.assert_allclose(
+                batched.wavefunction_on_mesh(1)[i, k],
+                single.wavefunction_on_mesh(1)[0, 0],
+                atol=1e-10,
+            )
+
+
+def test_wavefunction():
+    states = solver.solve(mu, channels[:1], oscillator, [(50.0,)])
+    u = states.wavefunction_on_mesh(0)[0, 0]
+    np.testing.assert_allclose(np.sum(u**2 * solver.scale * solver.lambdas), 1.0)
+
+    # analytic ground state of the 3D oscillator in the s-wave
+    b = HBARC / np.sqrt(mu * hw)
+    r = np.linspace(0.1, 8, 20)
+    u_exact = 2 / (np.pi**0.25 * b**1.5) * r * np.exp(-0.5 * (r / b) ** 2)
+    np.testing.assert_allclose(states.wavefunction(r, 0)[0, 0], u_exact, atol=1e-6)
+    np.testing.assert_allclose(
+        u,
+        2 / (np.pi**0.25 * b**1.5) * solver.r * np.exp(-0.5 * (solver.r / b) ** 2),
+        atol=1e-6,
+    )
@@ -0,0 +1,136 @@
+import multiprocessing
+import time
+
+import numpy as np
+import pytest
+
+from jitr import rmatrix, xs, cache
+from jitr.reactions import (
+    ProjectileTargetSystem,
+    spin_half_orbit_coupling,
+    KDGlobal,
+    KD_scalar,
+    KD_spin_orbit,
+)
+from jitr.utils import kinematics
+
+Ca48, proton, Elab = (48, 20), (1, 1), 30.0
+sys = ProjectileTargetSystem(
+    channel_radius=8 * np.pi,
+    lmax=20,
+    mass_target=kinematics.mass(*Ca48),
+    mass_projectile=kinematics.mass(*proton),
+    Ztarget=Ca48[1],
+    Zproj=proton[1],
+    coupling=spin_half_orbit_coupling,
+)
+kin = kinematics.classical_kinematics(
+    sys.mass_target, sys.mass_projectile, Elab, Zz=Ca48[1]
+)
+angles = np.linspace(0.1, np.pi - 0.1, 20)
+_, scalar, spin_orbit = KDGlobal(proton).get_params(*Ca48, kin.mu, Elab, kin.k)
+
+
+def slow_square(x):
+    time.sleep(0.2)
+    return x**2
+
+
+def compute_shared(args):
+    store, x = args
+    return store.get_or_compute(cache.fingerprint("square", x), lambda: slow_square(x))
+
+
+def test_cached_workspace(tmp_path):
+    store = cache.ResultCache(tmp_path / "cache.sqlite")
+    ws = xs.elastic.DifferentialWorkspace.build_from_system(
+        proton, Ca48, sys, kin, rmatrix.Solver(40), angles
+    )
+    cached = cache.CachedWorkspace(ws, store)
+    ref = ws.xs(KD_scalar, KD_spin_orbit, scalar, spin_orbit)
+    x1 = cached.xs(KD_scalar, KD_spin_orbit, scalar, spin_orbit)
+    # parameters given as an array hash the same as a tuple
+    x2 = cached.xs(KD_scalar, KD_spin_orbit, np.array(scalar), spin_orbit)
+    np.testing.assert_array_equal(x1.dsdo, ref.dsdo)
+    np.testing.assert_array_equal(x2.Ay, ref.Ay)
+    assert (store.hits, store.misses) == (1, 1)
+
+    # a different workspace, parameter or interaction is a different key
+    ws2 = xs.elastic.DifferentialWorkspace.build_from_system(
+        proton, Ca48, sys, kin, rmatrix.Solver(41), angles
+    )
+    cache.CachedWorkspace(ws2, store).xs(KD_scalar, KD_spin_orbit, scalar, spin_orbit)
+    cached.xs(KD_scalar, KD_spin_orbit, scalar[:-1] + (1.01 * scalar[-1],), spin_orbit)
+    cached.integral_workspace.smatrix(KD_scalar, KD_spin_orbit, scalar, spin_orbit)
+    assert store.misses == 3
+    assert cached.k == ws.k
+
+    # as is the same workspace with a different partial wave truncation
+    keys = {cache.workspace_key(ws)}
+    for options in [
+        dict(semiclassical=True),
+        dict(semiclassical=True, lmax_margin=2),
+        dict(semiclassical=True, potential_tol=1e-3),
+    ]:
+        keys.add(
+            cache.workspace_key(
+                xs.elastic.DifferentialWorkspace.build_from_system(
+                    proton, Ca48, sys, kin, rmatrix.Solver(40), angles, **options
+                )
+            )
+        )
+    assert len(keys) == 4
+
+    # another process (or a restarted job) sees the same entries
+    again = cache.ResultCache(tmp_path / "cache.sqlite")
+    cached = cache.CachedWorkspace(ws, again)
+    np.testing.assert_array_equal(
+        cached.xs(KD_scalar, KD_spin_orbit, scalar, spin_orbit).dsdo, ref.dsdo
+    )
+    assert again.hits == 1
+    assert again.metrics["hits"] == 2 and again.metrics["entries"] == 3
+
+
+def test_lru_eviction(tmp_path):
+    store = cache.ResultCache(tmp_path / "lru.sqlite", max_bytes=3500)
+    for i in range(3):
+        store.put(str(i), np.zeros(100))
+    store.get("0")
+    store.put("3", np.zeros(100))
+    assert "1" not in store
+    assert all(k in store for k in ["0", "2", "3"])
+    assert store.metrics["evictions"] == 1 and store.metrics["nbytes"] <= 3500
+
+
+def test_concurrent_processes(tmp_path):
+    store = cache.ResultCache(tmp_path / "shared.sqlite")
+    with multiprocessing.get_context("spawn").Pool(4) as pool:
+        values = pool.map(compute_shared, [(store, 3.0)] * 4 + [(store, 4.0)] * 4)
+    assert values == [9.0] * 4 + [16.0] * 4
+    # each distinct point was computed exactly once
+    assert store.metrics["misses"] == 2
+    assert store.metrics["hits"] == 6
+
+
+def test_fingerprint_callees(monkeypatch):
+    namespace = {}
+    exec(
+        "def shape(r):\n    return r**2\n\ndef potential(r):\n    return shape(r)",
+        namespace,
+    )
+    before = cache.fingerprint(namespace["potential"])
+    assert cache.fingerprint(namespace["potential"]) == before
+
+    # editing a global called by the interaction invalidates its fingerprint
+    exec("def shape(r):\n    return r**3", namespace)
+    assert cache.fingerprint(namespace["potential"]) != before
+
+    # including the numba compiled potentials called by KD_scalar
+    before = cache.fingerprint(KD_scalar)
+    monkeypatch.setitem(
+        KD_scalar.__globals__, "woods_saxon_safe", namespace["potential"]
+    )
+    assert cache.fingerprint(KD_scalar) != before
+
+    with pytest.raises(TypeError):
+        cache.workspace_key(None)
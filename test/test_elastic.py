@@ -0,0 +1,390 @@
+import numpy as np
+from scipy.special import eval_legendre, lpmv
+from scipy.interpolate import CubicSpline
+import pickle
+
+from jitr import rmatrix, xs
+from jitr.batch.omp import GlobalOMP
+from jitr.reactions import (
+    ProjectileTargetSystem,
+    spin_half_orbit_coupling,
+    KDGlobal,
+    KD_scalar,
+    KD_spin_orbit,
+    KD_scalar_grad,
+    KD_spin_orbit_grad,
+)
+from jitr.utils import kinematics, free_solutions, angular, partial_waves
+
+Ca48 = (48, 20)
+neutron = (1, 0)
+Elab = 14.1
+angles = np.linspace(0.05, np.pi - 0.05, 30)
+
+sys = ProjectileTargetSystem(
+    channel_radius=6 * np.pi,
+    lmax=15,
+    mass_target=kinematics.mass(*Ca48),
+    mass_projectile=kinematics.mass(*neutron),
+    Ztarget=Ca48[1],
+    Zproj=neutron[1],
+    coupling=spin_half_orbit_coupling,
+)
+kin = kinematics.classical_kinematics(sys.mass_target, sys.mass_projectile, Elab)
+workspace = xs.elastic.DifferentialWorkspace.build_from_system(
+    neutron, Ca48, sys, kin, rmatrix.Solver(40), angles, smatrix_abs_tol=1e-10
+)
+_, scalar_params, spin_orbit_params = KDGlobal(neutron).get_params(
+    *Ca48, kin.mu, Elab, kin.k
+)
+
+
+def test_elastic_jacobian():
+    obs, jac = workspace.xs(
+        KD_scalar,
+        KD_spin_orbit,
+        scalar_params,
+        spin_orbit_params,
+        grad_scalar=KD_scalar_grad,
+        grad_spin_orbit=KD_spin_orbit_grad,
+    )
+    ref = workspace.xs(KD_scalar, KD_spin_orbit, scalar_params, spin_orbit_params)
+    np.testing.assert_allclose(obs.dsdo, ref.dsdo)
+    assert jac.dsdo.shape == (15, angles.size)
+
+    theta = np.array(scalar_params + spin_orbit_params)
+    ns = len(scalar_params)
+    # real central depth, radius and diffuseness
+    for p in [0, 1, 2]:
+        h = 1e-6 * theta[p]
+        tp, tm = theta.copy(), theta.copy()
+        tp[p] += h
+        tm[p] -= h
+        xp = workspace.xs(KD_scalar, KD_spin_orbit, tuple(tp[:ns]), tuple(tp[ns:]))
+        xm = workspace.xs(KD_scalar, KD_spin_orbit, tuple(tm[:ns]), tuple(tm[ns:]))
+        np.testing.assert_allclose(
+            jac.dsdo[p], (xp.dsdo - xm.dsdo) / (2 * h), rtol=1e-4, atol=1e-6
+        )
+        np.testing.assert_allclose(
+            jac.Ay[p], (xp.Ay - xm.Ay) / (2 * h), rtol=1e-4, atol=1e-6
+        )
+        np.testing.assert_allclose(jac.rxn[p], (xp.rxn - xm.rxn) / (2 * h), rtol=1e-5)
+        np.testing.assert_allclose(jac.t[p], (xp.t - xm.t) / (2 * h), rtol=1e-5)
+
+
+def test_multi_energy():
+    energies = np.array([5.0, 10.0, Elab])
+    kd = KDGlobal(neutron)
+    kins = kinematics.classical_kinematics(
+        sys.mass_target, sys.mass_projectile, energies
+    )
+    multi = xs.elastic.MultiEnergyWorkspace(
+        neutron, Ca48, sys, kins, rmatrix.Solver(40), angles, batch_size=2
+    )
+    params = [kd.get_params(*Ca48, kins.mu, E, k)[1:] for E, k in zip(energies, kins.k)]
+    obs = multi.xs(
+        KD_scalar,
+        KD_spin_orbit,
+        [p[0] for p in params],
+        [p[1] for p in params],
+    )
+    assert obs.dsdo.shape == (energies.size, angles.size)
+    for i, E in enumerate(energies):
+        ws = xs.elastic.DifferentialWorkspace.build_from_system(
+            neutron,
+            Ca48,
+            sys,
+            kinematics.classical_kinematics(sys.mass_target, sys.mass_projectile, E),
+            rmatrix.Solver(40),
+            angles,
+            smatrix_abs_tol=1e-10,
+        )
+        ref = ws.xs(KD_scalar, KD_spin_orbit, *params[i])
+        # MultiEnergyWorkspace always includes all partial waves up to lmax
+        np.testing.assert_allclose(obs.dsdo[i], ref.dsdo, rtol=1e-5)
+        np.testing.assert_allclose(obs.Ay[i], ref.Ay, atol=1e-5)
+        np.testing.assert_allclose(obs.t[i], ref.t, rtol=1e-5)
+        np.testing.assert_allclose(obs.rxn[i], ref.rxn, rtol=1e-5)
+
+
+def test_multi_energy_lmax():
+    energies = np.array([5.0, 10.0, 30.0])
+    kd = KDGlobal(neutron)
+    kins = kinematics.classical_kinematics(
+        sys.mass_target, sys.mass_projectile, energies
+    )
+    multi = xs.elastic.MultiEnergyWorkspace(
+        neutron, Ca48, sys, kins, rmatrix.Solver(40), angles, batch_size=2
+    )
+    params = [kd.get_params(*Ca48, kins.mu, E, k)[1:] for E, k in zip(energies, kins.k)]
+    # loose enough that j = l + 1/2 converges first at some l > 0 at 10 MeV,
+    # and that the s-wave converges before the higher partial waves at 30 MeV
+    for tol in [0.5, 0.65]:
+        splus, sminus, lmax = multi.smatrix(
+            KD_scalar,
+            KD_spin_orbit,
+            [p[0] for p in params],
+            [p[1] for p in params],
+            smatrix_abs_tol=tol,
+            lblock=8,
+        )
+        T, lmax_T = multi.transmission_coefficients(
+            KD_scalar,
+            KD_spin_orbit,
+            [p[0] for p in params],
+            [p[1] for p in params],
+            smatrix_abs_tol=tol,
+        )
+        np.testing.assert_array_equal(lmax_T, lmax)
+        for i, E in enumerate(energies):
+            ws = xs.elastic.IntegralWorkspace(
+                neutron,
+                Ca48,
+                sys,
+                kinematics.classical_kinematics(
+                    sys.mass_target, sys.mass_projectile, E
+                ),
+                rmatrix.Solver(40),
+                smatrix_abs_tol=tol,
+            )
+            splus_ref, sminus_ref = ws.smatrix(KD_scalar, KD_spin_orbit, *params[i])
+            # both stop at the first l > 0 at which both j have converged
+            nl = splus_ref.size
+            assert lmax[i] + 1 == nl
+            np.testing.assert_allclose(splus[i, :nl], splus_ref, atol=1e-5)
+            np.testing.assert_allclose(sminus[i, 1:nl], sminus_ref[1:], atol=1e-5)
+            np.testing.assert_array_equal(splus[i, nl:], 1)
+            np.testing.assert_array_equal(sminus[i, nl:], 1)
+            np.testing.assert_allclose(
+                T[i, :nl, 0], 1 - np.absolute(splus_ref) ** 2, atol=1e-5
+            )
+            np.testing.assert_array_equal(T[i, nl:], 0)
+
+
+def test_coulomb_hankel_sequence():
+    s, lmax = 5 * np.pi, 20
+    for eta in [0.0, 0.8, 5.0]:
+        H = free_solutions.coulomb_hankel_sequence(s, lmax, eta)
+        for f, Hl in zip(
+            [
+                free_solutions.H_plus,
+                free_solutions.H_minus,
+                free_solutions.H_plus_prime,
+                free_solutions.H_minus_prime,
+            ],
+            H,
+        ):
+            ref = np.array([f(s, l, eta) for l in range(lmax + 1)])
+            np.testing.assert_allclose(Hl, ref, rtol=1e-10)
+
+
+def test_angular_cache():
+    x = np.cos(angles)
+    ls = np.arange(0, 41)[:, np.newaxis]
+    P, P1 = angular.legendre_recurrence(40, x)
+    np.testing.assert_allclose(P, eval_legendre(ls, x), atol=1e-12)
+    np.testing.assert_allclose(P1, lpmv(1, ls, x), rtol=1e-10, atol=1e-10)
+
+    cache = angular.AngularCache(maxsize=2)
+    P, _ = cache.legendre(40, angles)
+    assert cache.legendre(40, angles.copy())[0] is P
+    assert not P.flags.writeable
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.legendre(20, angles)
+    cache.legendre(40, angles[:-1])
+    assert len(cache.legendre_cache) == 2
+    assert cache.legendre(40, angles)[0] is not P
+
+    f_c, rutherford = cache.coulomb(0.5, 1.2, angles)
+    assert cache.coulomb(0.5, 1.2, angles)[0] is f_c
+    np.testing.assert_allclose(np.absolute(f_c) ** 2 * 10, rutherford)
+
+    # cached arrays are read-only, but the cross sections handed out aren't
+    proton = (1, 1)
+    sys_p = ProjectileTargetSystem(
+        channel_radius=6 * np.pi,
+        lmax=15,
+        mass_target=kinematics.mass(*Ca48),
+        mass_projectile=kinematics.mass(*proton),
+        Ztarget=Ca48[1],
+        Zproj=proton[1],
+        coupling=spin_half_orbit_coupling,
+    )
+    kin_p = kinematics.classical_kinematics(
+        sys_p.mass_target, sys_p.mass_projectile, Elab, Zz=Ca48[1]
+    )
+    ws = xs.elastic.DifferentialWorkspace.build_from_system(
+        proton, Ca48, sys_p, kin_p, rmatrix.Solver(40), angles
+    )
+    _, scalar, spin_orbit = KDGlobal(proton).get_params(*Ca48, kin_p.mu, Elab, kin_p.k)
+    obs = ws.xs(KD_scalar, KD_spin_orbit, scalar, spin_orbit)
+    obs.rutherford *= 2
+    np.testing.assert_allclose(obs.rutherford, 2 * ws.rutherford)
+
+
+def test_xs_batch():
+    rng = np.random.default_rng(7)
+    theta = np.array(scalar_params + spin_orbit_params)
+    samples = theta * (1 + 0.05 * rng.uniform(-1, 1, (4, theta.size)))
+    ns = len(scalar_params)
+    args_scalar = [tuple(s[:ns]) for s in samples]
+    args_spin_orbit = [tuple(s[ns:]) for s in samples]
+    batch = workspace.xs_batch(KD_scalar, KD_spin_orbit, args_scalar, args_spin_orbit)
+    assert batch.dsdo.shape == (4, angles.size)
+    for i in range(4):
+        ref = workspace.xs(KD_scalar, KD_spin_orbit, args_scalar[i], args_spin_orbit[i])
+        np.testing.assert_allclose(batch.dsdo[i], ref.dsdo, rtol=1e-12)
+        np.testing.assert_allclose(batch.Ay[i], ref.Ay, rtol=1e-10, atol=1e-12)
+        np.testing.assert_allclose(batch.t[i], ref.t, rtol=1e-12)
+        np.testing.assert_allclose(batch.rxn[i], ref.rxn, rtol=1e-12)
+
+
+def test_excitation_function():
+    kins = kinematics.classical_kinematics(
+        sys.mass_target, sys.mass_projectile, np.array([Elab])
+    )
+    multi = xs.elastic.MultiEnergyWorkspace(
+        neutron, Ca48, sys, kins, rmatrix.Solver(40), np.zeros(0)
+    )
+    # weak absorption, for sharp shape resonances
+    scalar = scalar_params[:6] + (0.5,) + scalar_params[7:]
+    ef = xs.excitation.excitation_function(
+        multi, KD_scalar, KD_spin_orbit, 0.2, 8.0, scalar, spin_orbit_params
+    )
+    energies = np.random.default_rng(5).uniform(0.2, 8.0, 20)
+    ref = multi.at_kinematics(
+        kinematics.classical_kinematics(sys.mass_target, sys.mass_projectile, energies)
+    ).xs(KD_scalar, KD_spin_orbit, scalar, spin_orbit_params)
+    interpolated = CubicSpline(ef.Elab, ef.rxn)(energies)
+    np.testing.assert_allclose(interpolated, ref.rxn, rtol=1e-2)
+    assert ef.Elab.size < 400
+
+
+def test_semiclassical_lmax():
+    l = partial_waves.grazing_partial_wave(1.5, 0.0, 10.0)
+    np.testing.assert_allclose(l * (l + 1), 15.0**2)
+    assert partial_waves.grazing_partial_wave(0.5, 2.0, 3.0) == 0
+
+    proton = (1, 1)
+    sys_p = ProjectileTargetSystem(
+        channel_radius=8 * np.pi,
+        lmax=40,
+        mass_target=kinematics.mass(*Ca48),
+        mass_projectile=kinematics.mass(*proton),
+        Ztarget=Ca48[1],
+        Zproj=proton[1],
+        coupling=spin_half_orbit_coupling,
+    )
+    kin_p = kinematics.classical_kinematics(
+        sys_p.mass_target, sys_p.mass_projectile, 30.0, Zz=Ca48[1]
+    )
+    omp = GlobalOMP("KD")
+    interaction_scalar, interaction_spin_orbit = omp.interactions(proton)
+    scalar, spin_orbit = omp.params(proton, 0, *Ca48, kin_p.mu, 30.0, kin_p.k)
+    solver = rmatrix.Solver(40)
+
+    # no early termination, so the cutoff is due to the prediction alone
+    full = xs.elastic.IntegralWorkspace(
+        proton, Ca48, sys_p, kin_p, solver, smatrix_abs_tol=0, semiclassical=False
+    )
+    ws = xs.elastic.IntegralWorkspace(
+        proton,
+        Ca48,
+        sys_p,
+        kin_p,
+        solver,
+        smatrix_abs_tol=0,
+        semiclassical=True,
+        potential_tol=1e-6,
+    )
+    splus_ref, sminus_ref = full.smatrix(
+        interaction_scalar, interaction_spin_orbit, scalar, spin_orbit
+    )
+    splus, sminus = ws.smatrix(
+        interaction_scalar, interaction_spin_orbit, scalar, spin_orbit
+    )
+    assert splus_ref.size == sys_p.lmax + 1
+    assert splus.size < splus_ref.size
+    assert ws.partial_waves.nbuilt == splus.size
+
+    # the tail is pure Coulomb scattering, S = 1
+    nl = splus.size
+    np.testing.assert_allclose(splus, splus_ref[:nl], atol=1e-12)
+    np.testing.assert_allclose(sminus, sminus_ref[:nl], atol=1e-12)
+    np.testing.assert_allclose(splus_ref[nl:], 1, atol=1e-6)
+    np.testing.assert_allclose(sminus_ref[nl:], 1, atol=1e-6)
+
+    # the truncation can be turned on through the common builder as well
+    dws = xs.elastic.DifferentialWorkspace.build_from_system(
+        proton,
+        Ca48,
+        sys_p,
+        kin_p,
+        solver,
+        angles,
+        smatrix_abs_tol=0,
+        semiclassical=True,
+        lmax_margin=2,
+        potential_tol=1e-6,
+    )
+    assert dws.integral_workspace.semiclassical
+    assert dws.integral_workspace.lmax_margin == 2
+    assert dws.integral_workspace.potential_tol == 1e-6
+    splus_dws, _ = dws.integral_workspace.smatrix(
+        interaction_scalar, interaction_spin_orbit, scalar, spin_orbit
+    )
+    assert splus_dws.size == nl + 1
+
+    # lazily built partial waves survive pickling
+    copy = pickle.loads(pickle.dumps(ws))
+    assert copy.partial_waves.nbuilt == nl
+    np.testing.assert_allclose(
+        copy.smatrix(interaction_scalar, interaction_spin_orbit, scalar, spin_orbit)[0],
+        splus,
+    )
+
+
+def test_semiclassical_lmax_sub_barrier():
+    Pb208 = (208, 82)
+    proton = (1, 1)
+    sys_p = ProjectileTargetSystem(
+        channel_radius=10 * np.pi,
+        lmax=60,
+        mass_target=kinematics.mass(*Pb208),
+        mass_projectile=kinematics.mass(*proton),
+        Ztarget=Pb208[1],
+        Zproj=proton[1],
+        coupling=spin_half_orbit_coupling,
+    )
+    kin_p = kinematics.classical_kinematics(
+        sys_p.mass_target, sys_p.mass_projectile, 5.0, Zz=Pb208[1]
+    )
+    omp = GlobalOMP("KD")
+    interaction_scalar, interaction_spin_orbit = omp.interactions(proton)
+    scalar, spin_orbit = omp.params(proton, 0, *Pb208, kin_p.mu, 5.0, kin_p.k)
+    solver = rmatrix.Solver(80)
+
+    # the interaction is reached only by tunneling through the barrier, so
+    # there is no grazing partial wave to truncate at
+    full = xs.elastic.IntegralWorkspace(proton, Pb208, sys_p, kin_p, solver)
+    ws = xs.elastic.IntegralWorkspace(
+        proton, Pb208, sys_p, kin_p, solver, semiclassical=True
+    )
+    lmax = ws.predicted_lmax(
+        interaction_scalar, interaction_spin_orbit, scalar, spin_orbit
+    )
+    assert lmax == sys_p.lmax
+    splus_ref, _ = full.smatrix(
+        interaction_scalar, interaction_spin_orbit, scalar, spin_orbit
+    )
+    splus, _ = ws.smatrix(
+        interaction_scalar, interaction_spin_orbit, scalar, spin_orbit
+    )
+    assert splus_ref.size > 2
+    np.testing.assert_allclose(splus, splus_ref, atol=1e-12)
+    t_ref, rxn_ref = full.xs(
+        interaction_scalar, interaction_spin_orbit, scalar, spin_orbit
+    )
+    t, rxn = ws.xs(interaction_scalar, interaction_spin_orbit, scalar, spin_orbit)
+    assert rxn_ref > 0
+    np.testing.assert_allclose([t, rxn], [t_ref, rxn_ref], rtol=1e-12)
@@ -0,0 +1,141 @@
+import numpy as np
+
+from jitr import rmatrix, xs, emulate
+from jitr.reactions import (
+    ProjectileTargetSystem,
+    spin_half_orbit_coupling,
+    KDGlobal,
+    KD_scalar,
+    KD_spin_orbit,
+)
+from jitr.utils import kinematics
+
+Ca48 = (48, 20)
+proton = (1, 1)
+Elab = 25.0
+angles = np.linspace(0.05, np.pi - 0.05, 50)
+
+sys = ProjectileTargetSystem(
+    channel_radius=6 * np.pi,
+    lmax=20,
+    mass_target=kinematics.mass(*Ca48),
+    mass_projectile=kinematics.mass(*proton),
+    Ztarget=Ca48[1],
+    Zproj=proton[1],
+    coupling=spin_half_orbit_coupling,
+)
+kin = kinematics.classical_kinematics(
+    sys.mass_target, sys.mass_projectile, Elab, Ca48[1] * proton[1]
+)
+workspace = xs.elastic.DifferentialWorkspace.build_from_system(
+    proton, Ca48, sys, kin, rmatrix.Solver(40), angles, smatrix_abs_tol=1e-8
+)
+_, scalar_params, spin_orbit_params = KDGlobal(proton).get_params(
+    *Ca48, kin.mu, Elab, kin.k
+)
+theta0 = np.array(scalar_params + spin_orbit_params)
+ns = len(scalar_params)
+rng = np.random.default_rng(42)
+
+
+def sample():
+    theta = theta0 * (1 + 0.1 * rng.uniform(-1, 1, theta0.size))
+    return tuple(theta[:ns]), tuple(theta[ns:])
+
+
+training = [sample() for _ in range(25)]
+emulator = emulate.ElasticEmulator(
+    workspace,
+    KD_scalar,
+    KD_spin_orbit,
+    [s for s, _ in training],
+    [so for _, so in training],
+)
+
+
+def test_empirical_interpolation():
+    r = np.linspace(0.1, 10, 50)
+    samples = np.array([KD_scalar(r, *s) for s, _ in training])
+    eim = emulate.EmpiricalInterpolation(samples)
+    assert eim.size < r.size
+    for v in samples:
+        np.testing.assert_allclose(eim(v[eim.indices]), v, atol=1e-6)
+
+    # a function that vanishes at every sample has rank 0
+    eim = emulate.EmpiricalInterpolation(np.zeros((5, r.size), dtype=np.complex128))
+    assert eim.size == 0
+    np.testing.assert_array_equal(eim(np.zeros(0)), np.zeros(r.size))
+
+
+def test_elastic_emulator():
+    # reproduces the training samples
+    s, so = training[0]
+    ref = workspace.xs(KD_scalar, KD_spin_orbit, s, so)
+    emu = emulator.xs(s, so)
+    np.testing.assert_allclose(emu.dsdo, ref.dsdo, rtol=1e-6)
+
+    # and held out samples
+    for _ in range(3):
+        s, so = sample()
+        ref = workspace.xs(KD_scalar, KD_spin_orbit, s, so)
+        emu = emulator.xs(s, so)
+        np.testing.assert_allclose(emu.dsdo, ref.dsdo, rtol=1e-4)
+        np.testing.assert_allclose(emu.Ay, ref.Ay, atol=1e-4)
+        np.testing.assert_allclose(emu.rxn, ref.rxn, rtol=1e-5)
+        rplus, rminus = emulator.error_estimate(s, so)
+        assert rplus.shape == (emulator.nl,)
+        assert np.max(rplus) < 1e-3 and np.max(rminus) < 1e-3
+
+    # custom angles
+    a = np.linspace(0.1, 3.0, 10)
+    np.testing.assert_allclose(
+        emulator.xs(s, so, angles=a).dsdo,
+        workspace.xs(KD_scalar, KD_spin_orbit, s, so, angles=a).dsdo,
+        rtol=1e-4,
+    )
+
+
+def no_spin_orbit(r, *args):
+    return np.zeros_like(r, dtype=np.complex128)
+
+
+def test_emulator_without_spin_orbit():
+    emulator = emulate.ElasticEmulator(
+        workspace,
+        KD_scalar,
+        no_spin_orbit,
+        [s for s, _ in training],
+        [so for _, so in training],
+    )
+    assert emulator.eim_spin_orbit.size == 0
+    s, so = sample()
+    ref = workspace.xs(KD_scalar, no_spin_orbit, s, so)
+    emu = emulator.xs(s, so)
+    np.testing.assert_allclose(emu.dsdo, ref.dsdo, rtol=1e-4)
+    np.testing.assert_allclose(emu.rxn, ref.rxn, rtol=1e-5)
+
+
+def test_emulator_partial_waves():
+    # the partial waves emulated don't depend on the semiclassical estimate
+    ws = xs.elastic.DifferentialWorkspace.build_from_system(
+        proton,
+        Ca48,
+        sys,
+        kin,
+        rmatrix.Solver(40),
+        angles,
+        smatrix_abs_tol=1e-8,
+        semiclassical=True,
+        potential_tol=1e-3,
+    )
+    subset = training[:5]
+    truncated = ws.integral_workspace.smatrix(KD_scalar, KD_spin_orbit, *subset[0])[0]
+    emulator = emulate.ElasticEmulator(
+        ws,
+        KD_scalar,
+        KD_spin_orbit,
+        [s for s, _ in subset],
+        [so for _, so in subset],
+    )
+    assert truncated.size < emulator.nl
+    assert ws.integral_workspace.semiclassical
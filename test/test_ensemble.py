@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from jitr import rmatrix, xs, ensemble
+from jitr.reactions import (
+    ProjectileTargetSystem,
+    spin_half_orbit_coupling,
+    KDGlobal,
+    KD_scalar,
+    KD_spin_orbit,
+)
+from jitr.utils import kinematics
+
+rng = np.random.default_rng(11)
+
+
+def test_reducer_merge():
+    x = rng.gamma(2.0, size=(20000, 4)) * np.arange(1, 5)
+    r1 = ensemble.EnsembleReducer((4,), covariance=True, capacity=128, seed=1)
+    r2 = ensemble.EnsembleReducer((4,), covariance=True, capacity=128, seed=2)
+    for batch in np.array_split(x[:15000], 17):
+        r1.update(batch)
+    for batch in np.array_split(x[15000:], 3):
+        r2.update(batch)
+    r1.merge(r2)
+
+    assert r1.count == x.shape[0]
+    np.testing.assert_allclose(r1.mean, np.mean(x, axis=0), rtol=1e-12)
+    np.testing.assert_allclose(r1.covariance, np.cov(x.T), rtol=1e-10)
+    np.testing.assert_allclose(r1.std, np.std(x, axis=0, ddof=1), rtol=1e-10)
+
+    # sketch memory is bounded, with small rank error
+    assert r1.sketch.nbytes < x.nbytes / 10
+    q = np.array([0.05, 0.16, 0.5, 0.84, 0.95])
+    estimate = r1.quantile(q)
+    ranks = np.mean(x[:, np.newaxis, :] <= estimate[np.newaxis, :, :], axis=0)
+    np.testing.assert_allclose(ranks, np.tile(q[:, np.newaxis], (1, 4)), atol=0.02)
+
+    lower, upper = r1.credible_interval(0.9)
+    np.testing.assert_allclose(lower, estimate[0])
+
+    with pytest.raises(ValueError):
+        ensemble.EnsembleReducer((4,)).quantile(0.5)
+
+
+def test_propagate():
+    Ca48, neutron, Elab = (48, 20), (1, 0), 14.1
+    angles = np.linspace(0.1, np.pi - 0.1, 20)
+    sys = ProjectileTargetSystem(
+        channel_radius=6 * np.pi,
+        lmax=15,
+        mass_target=kinematics.mass(*Ca48),
+        mass_projectile=kinematics.mass(*neutron),
+        Ztarget=Ca48[1],
+        Zproj=neutron[1],
+        coupling=spin_half_orbit_coupling,
+    )
+    kin = kinematics.classical_kinematics(sys.mass_target, sys.mass_projectile, Elab)
+    workspace = xs.elastic.DifferentialWorkspace.build_from_system(
+        neutron, Ca48, sys, kin, rmatrix.Solver(30), angles
+    )
+    _, scalar, spin_orbit = KDGlobal(neutron).get_params(*Ca48, kin.mu, Elab, kin.k)
+    theta = np.array(scalar + spin_orbit)
+    thetas = theta * (1 + 0.05 * rng.normal(size=(30, theta.size)))
+    samples = [(tuple(t[: len(scalar)]), tuple(t[len(scalar) :])) for t in thetas]
+
+    result = ensemble.propagate(
+        workspace,
+        KD_scalar,
+        KD_spin_orbit,
+        iter(samples),
+        batch_size=8,
+        covariance=True,
+    )
+    ref = workspace.xs_batch(
+        KD_scalar,
+        KD_spin_orbit,
+        [s for s, _ in samples],
+        [so for _, so in samples],
+    )
+    assert result.count == 30
+    np.testing.assert_allclose(result.dsdo.mean, np.mean(ref.dsdo, axis=0))
+    np.testing.assert_allclose(result.Ay.covariance, np.cov(ref.Ay.T), atol=1e-12)
+    np.testing.assert_allclose(result.rxn.std, np.std(ref.rxn, ddof=1))
+
+    # integral observables, merged from two halves
+    integral = ensemble.propagate(
+        workspace.integral_workspace, KD_scalar, KD_spin_orbit, samples[:10]
+    )
+    integral.merge(
+        ensemble.propagate(
+            workspace.integral_workspace, KD_scalar, KD_spin_orbit, samples[10:]
+        )
+    )
+    assert integral.dsdo is None
+    np.testing.assert_allclose(integral.t.mean, np.mean(ref.t))
+    np.testing.assert_allclose(integral.rxn.mean, np.mean(ref.rxn))
+
+    # ensembles of different observables can't be merged
+    with pytest.raises(ValueError):
+        integral.merge(
+            ensemble.propagate(workspace, KD_scalar, KD_spin_orbit, samples[:2])
+        )
+
+    # by default only the variances are tracked, with memory linear in the
+    # number of angles
+    default = ensemble.propagate(workspace, KD_scalar, KD_spin_orbit, samples)
+    assert default.dsdo.covariance is None
+    assert default.dsdo.moments.M2.shape == angles.shape
+    np.testing.assert_allclose(default.Ay.std, np.std(ref.Ay, axis=0, ddof=1))
+
+    with pytest.raises(TypeError):
+        ensemble.evaluate_batch(None, KD_scalar, KD_spin_orbit, samples[:1])
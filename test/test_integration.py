@@ -78,3 +78,84 @@ def test_nonlocal_integration():
     x[solver_le.upper_mask] = upper
     np.testing.assert_allclose(x - full, 0.0, atol=1e-7)
     np.testing.assert_allclose(np.sum(full), np.sum(lower) + np.sum(upper))
+
+
+def gaussian(r, b):
+    return np.exp(-0.5 * (r / b) ** 2)
+
+
+def gaussian_nonlocal(r, rp, b):
+    return gaussian(r, b) * gaussian(rp, b)
+
+
+def test_fourier_bessel_transform():
+    b = 1.0
+    k = np.linspace(0.1, 3, 25)
+    kernel = quadrature.Kernel(40)
+
+    # int_0^inf j_0(kr) exp(-r^2/2b^2) r^2 dr
+    analytic = np.sqrt(np.pi / 2) * b**3 * np.exp(-0.5 * (k * b) ** 2)
+    np.testing.assert_allclose(
+        kernel.fourier_bessel_transform(0, gaussian, k, 8.0, b), analytic, atol=1e-10
+    )
+
+    ls = np.arange(4)
+    batched = kernel.fourier_bessel_transform(ls, gaussian, k, 8.0, b)
+    double = kernel.double_fourier_bessel_transform(ls, gaussian_nonlocal, k, 8.0, b)
+    assert batched.shape == (4, 25)
+    assert double.shape == (4, 25, 25)
+    for l in ls:
+        single = kernel.fourier_bessel_transform(l, gaussian, k, 8.0, b)
+        np.testing.assert_allclose(batched[l], single, atol=1e-14)
+        # a separable kernel transforms into the product of the transforms
+        np.testing.assert_allclose(
+            double[l], 2 / np.pi * np.outer(single, single), atol=1e-14
+        )
+
+    # the Bessel matrix cache is bounded, and shared read-only
+    small = quadrature.Kernel(20, bessel_cache_size=4)
+    for E in range(10):
+        J = small.bessel_matrix(0, k * (1 + 0.01 * E), 8.0)
+    assert len(small.bessel_matrices) == 4
+    assert not J.flags.writeable
+    assert small.bessel_matrix(0, k * 1.09, 8.0) is J
+
+
+def test_dwba_batch():
+    rng = np.random.default_rng(0)
+    nb = solver_le.quadrature.nbasis
+    bras = rng.normal(size=(5, nb)) + 1j * rng.normal(size=(5, nb))
+    kets = rng.normal(size=(4, nb)) + 1j * rng.normal(size=(4, nb))
+    params = [(2, 3), (1, -1), (0.5, 2)]
+    local = np.array([solver_le.matrix_local(V, a, p) for p in params])
+    nonlocal_ = np.array(
+        [solver_le.matrix_nonlocal(Vnl_asym, a, False, p) for p in params]
+    )
+
+    M = solver_le.dwba_local_batch(bras, kets, local)
+    Mnl = solver_le.dwba_nonlocal_batch(bras, kets, nonlocal_)
+    assert M.shape == (3, 5, 4)
+    assert Mnl.shape == (3, 5, 4)
+    for p, args in enumerate(params):
+        for i, bra in enumerate(bras):
+            for j, ket in enumerate(kets):
+                np.testing.assert_allclose(
+                    M[p, i, j], solver_le.dwba_local(bra, ket, a, V, args), rtol=1e-12
+                )
+                np.testing.assert_allclose(
+                    Mnl[p, i, j],
+                    solver_le.dwba_nonlocal(bra, ket, a, Vnl_asym, args, False),
+                    rtol=1e-12,
+                )
+
+    pairs = np.array([[0, 1, 2], [4, 3, 0], [2, 2, 1]])
+    np.testing.assert_allclose(
+        solver_le.dwba_local_batch(bras, kets, local, pairs),
+        M[pairs[:, 2], pairs[:, 0], pairs[:, 1]],
+        rtol=1e-12,
+    )
+    np.testing.assert_allclose(
+        solver_le.dwba_nonlocal_batch(bras, kets, nonlocal_, pairs),
+        Mnl[pairs[:, 2], pairs[:, 0], pairs[:, 1]],
+        rtol=1e-12,
+    )
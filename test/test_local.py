@@ -1,16 +1,21 @@
 import numpy as np
 from scipy.integrate import solve_ivp
 from numba import njit
-from jitr import rmatrix
+from jitr import rmatrix, xs
 from jitr.reactions import (
     ProjectileTargetSystem,
     make_channel_data,
+    spin_half_orbit_coupling,
+    KDGlobal,
+    KD_scalar,
+    KD_spin_orbit,
 )
 from jitr.reactions.potentials import (
     woods_saxon_potential,
     coulomb_charged_sphere,
 )
 from jitr.utils import delta, smatrix, schrodinger_eqn_ivp_order1, kinematics
+from jitr.utils.numerov import NumerovIntegrator
 
 
 def interaction(r, *args):
@@ -108,3 +113,66 @@ def test_local():
 
     rtol = 1.0e-2  # 1 % max error
     np.testing.assert_array_less(error_matrix, rtol)
+
+
+def test_numerov_batch():
+    r"""All partial waves and parameter samples at once against the
+    Lagrange-mesh S-matrix for Koning-Delaroche with spin-orbit coupling"""
+    Ca48 = (48, 20)
+    neutron = (1, 0)
+    Elab = 14.1
+    sys = ProjectileTargetSystem(
+        channel_radius=8 * np.pi,
+        lmax=15,
+        mass_target=kinematics.mass(*Ca48),
+        mass_projectile=kinematics.mass(*neutron),
+        Ztarget=Ca48[1],
+        Zproj=neutron[1],
+        coupling=spin_half_orbit_coupling,
+    )
+    kin = kinematics.classical_kinematics(sys.mass_target, sys.mass_projectile, Elab)
+    _, scalar, spin_orbit = KDGlobal(neutron).get_params(*Ca48, kin.mu, Elab, kin.k)
+    samples = [1.0, 0.95, 1.05]
+    args_scalar = [(scalar[0] * f,) + tuple(scalar[1:]) for f in samples]
+    args_spin_orbit = [spin_orbit] * len(samples)
+
+    ws = xs.elastic.IntegralWorkspace(
+        neutron, Ca48, sys, kin, rmatrix.Solver(60), smatrix_abs_tol=0
+    )
+
+    # channels j = l + 1/2 for all l, then j = l - 1/2 for l > 0
+    ls = np.concatenate([sys.l, sys.l[1:]])
+    l_dot_s = np.concatenate([[0], ws.l_dot_s[:, 0], ws.l_dot_s[:, 1]])
+    asym = [ws.asymptotics[l][0] for l in sys.l] + [
+        ws.asymptotics[l][1] for l in sys.l[1:]
+    ]
+
+    integrator = NumerovIntegrator(sys.channel_radius)
+    R = integrator.rmatrix(
+        kin.k,
+        kin.Ecm,
+        ls,
+        KD_scalar,
+        args_scalar,
+        KD_spin_orbit,
+        args_spin_orbit,
+        l_dot_s,
+    )
+    S = integrator.smatrix(
+        R,
+        *[
+            np.array([getattr(a, H)[0] for a in asym])
+            for H in ["Hp", "Hm", "Hpp", "Hmp"]
+        ],
+    )
+    assert S.shape == (len(samples), ls.size)
+
+    for i in range(len(samples)):
+        splus, sminus = ws.smatrix(
+            KD_scalar, KD_spin_orbit, args_scalar[i], args_spin_orbit[i]
+        )
+        nl = splus.size
+        np.testing.assert_allclose(S[i, :nl], splus, atol=1e-5)
+        np.testing.assert_allclose(
+            S[i, sys.lmax + 1 : sys.lmax + nl], sminus[1:], atol=1e-5
+        )
@@ -0,0 +1,48 @@
+# run across ranks with `mpirun -n 4 python -m pytest test/test_mpi.py`
+import numpy as np
+import pytest
+
+MPI = pytest.importorskip("mpi4py.MPI")
+
+from jitr import parallel, ensemble
+from jitr.reactions import KD_scalar, KD_spin_orbit
+
+from test_parallel import workspace
+
+comm = MPI.COMM_WORLD
+ws, theta, nscalar = workspace((48, 20), 14.1)
+thetas = theta * (1 + 0.05 * np.random.default_rng(17).normal(size=(23, theta.size)))
+samples = [(tuple(t[:nscalar]), tuple(t[nscalar:])) for t in thetas]
+ref = ensemble.propagate(ws, KD_scalar, KD_spin_orbit, samples, covariance=True)
+
+
+def test_mpi_propagate():
+    result = parallel.mpi.propagate(
+        ws,
+        KD_scalar,
+        KD_spin_orbit,
+        samples if comm.Get_rank() == 0 else None,
+        comm=comm,
+        all=True,
+        covariance=True,
+    )
+    assert result.count == 23
+    np.testing.assert_allclose(result.dsdo.mean, ref.dsdo.mean)
+    np.testing.assert_allclose(result.dsdo.covariance, ref.dsdo.covariance, atol=1e-10)
+    np.testing.assert_allclose(result.rxn.std, ref.rxn.std)
+
+
+def test_mpi_run_subcommunicator():
+    # a user communicator, with the samples on its last rank
+    sub = comm.Split(comm.Get_rank() % 2, comm.Get_rank())
+    root = sub.Get_size() - 1
+    model = parallel.ElasticModel(KD_scalar, KD_spin_orbit, nscalar)
+    dsdo = parallel.mpi.run(
+        {"Ca48": ws}, model, thetas if sub.Get_rank() == root else None, sub, root
+    )
+    if sub.Get_rank() == root:
+        assert dsdo["Ca48"].shape == (23, ws.angles.size)
+        np.testing.assert_allclose(dsdo["Ca48"].mean(axis=0), ref.dsdo.mean)
+    else:
+        assert dsdo is None
+    sub.Free()
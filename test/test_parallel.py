@@ -0,0 +1,74 @@
+import pickle
+
+import numpy as np
+
+from jitr import rmatrix, xs, parallel
+from jitr.reactions import (
+    ProjectileTargetSystem,
+    spin_half_orbit_coupling,
+    KDGlobal,
+    KD_scalar,
+    KD_spin_orbit,
+)
+from jitr.utils import kinematics
+
+rng = np.random.default_rng(13)
+neutron = (1, 0)
+angles = np.linspace(0.1, np.pi - 0.1, 20)
+
+
+def workspace(target, Elab):
+    sys = ProjectileTargetSystem(
+        channel_radius=6 * np.pi,
+        lmax=15,
+        mass_target=kinematics.mass(*target),
+        mass_projectile=kinematics.mass(*neutron),
+        Ztarget=target[1],
+        Zproj=neutron[1],
+        coupling=spin_half_orbit_coupling,
+    )
+    kin = kinematics.classical_kinematics(sys.mass_target, sys.mass_projectile, Elab)
+    ws = xs.elastic.DifferentialWorkspace.build_from_system(
+        neutron, target, sys, kin, rmatrix.Solver(30), angles
+    )
+    _, scalar, spin_orbit = KDGlobal(neutron).get_params(*target, kin.mu, Elab, kin.k)
+    return ws, np.array(scalar + spin_orbit), len(scalar)
+
+
+def test_pickle_workspace():
+    ws, theta, nscalar = workspace((48, 20), 14.1)
+    ws2 = pickle.loads(pickle.dumps(ws))
+    args = (tuple(theta[:nscalar]), tuple(theta[nscalar:]))
+    np.testing.assert_allclose(
+        ws2.xs(KD_scalar, KD_spin_orbit, *args).dsdo,
+        ws.xs(KD_scalar, KD_spin_orbit, *args).dsdo,
+    )
+
+
+def test_parallel_executor():
+    workspaces = {}
+    for target, Elab in [((48, 20), 14.1), ((48, 20), 30.0), ((208, 82), 14.1)]:
+        workspaces[target, Elab], theta, nscalar = workspace(target, Elab)
+    samples = theta * (1 + 0.05 * rng.normal(size=(10, theta.size)))
+    model = parallel.ElasticModel(
+        KD_scalar, KD_spin_orbit, nscalar, observables=("dsdo", "Ay", "rxn")
+    )
+    with parallel.ParallelExecutor(
+        workspaces, model, nworkers=2, warmup_sample=theta
+    ) as executor:
+        results = executor.run(samples, chunk_size=3)
+        # the pool and shared workspaces are reused between runs
+        again = executor.run(samples[:2])
+
+    for key, ws in workspaces.items():
+        ref = ws.xs_batch(
+            KD_scalar,
+            KD_spin_orbit,
+            [tuple(s[:nscalar]) for s in samples],
+            [tuple(s[nscalar:]) for s in samples],
+        )
+        assert results[key].shape == (10, 2 * angles.size + 1)
+        np.testing.assert_allclose(results[key][:, : angles.size], ref.dsdo)
+        np.testing.assert_allclose(results[key][:, angles.size : -1], ref.Ay)
+        np.testing.assert_allclose(results[key][:, -1], ref.rxn)
+        np.testing.assert_array_equal(again[key], results[key][:2])
@@ -0,0 +1,88 @@
+import json
+
+import numpy as np
+
+from jitr import rmatrix, xs, profiling
+from jitr.reactions import (
+    ProjectileTargetSystem,
+    spin_half_orbit_coupling,
+    KDGlobal,
+    KD_scalar,
+    KD_spin_orbit,
+)
+from jitr.utils import kinematics
+
+Ca48, neutron, Elab = (48, 20), (1, 0), 14.1
+angles = np.linspace(0.1, np.pi - 0.1, 20)
+sys = ProjectileTargetSystem(
+    channel_radius=6 * np.pi,
+    lmax=30,
+    mass_target=kinematics.mass(*Ca48),
+    mass_projectile=kinematics.mass(*neutron),
+    Ztarget=Ca48[1],
+    Zproj=neutron[1],
+    coupling=spin_half_orbit_coupling,
+)
+kin = kinematics.classical_kinematics(sys.mass_target, sys.mass_projectile, Elab)
+_, scalar, spin_orbit = KDGlobal(neutron).get_params(*Ca48, kin.mu, Elab, kin.k)
+
+
+def test_profile(tmp_path):
+    with profiling.profile(trace=True) as prof:
+        workspace = xs.elastic.DifferentialWorkspace.build_from_system(
+            neutron, Ca48, sys, kin, rmatrix.Solver(30), angles
+        )
+        for _ in range(3):
+            workspace.xs(KD_scalar, KD_spin_orbit, scalar, spin_orbit)
+    assert profiling.active is None
+
+    report = prof.report()
+    stages = report["stages"]
+    for name in [
+        "asymptotics",
+        "free_matrix",
+        "boundaries",
+        "potential",
+        "assemble",
+        "factorize",
+        "back_substitution",
+        "smatrix",
+        "partial_wave",
+        "legendre_sums",
+    ]:
+        assert stages[name]["calls"] > 0
+    assert stages["legendre_sums"]["calls"] == 3
+    # partial waves are only built up to where the S-matrix converges
+    nl = workspace.integral_workspace.partial_waves.nbuilt
+    assert nl < sys.lmax + 1
+    assert stages["asymptotics"]["calls"] == nl
+    # each partial wave beyond the s-wave is solved for j = l +/- 1/2
+    nsolves = stages["factorize"]["calls"]
+    assert stages["partial_wave"]["calls"] == nsolves
+    assert stages["partial_wave"]["l"][1]["calls"] == 6
+    assert sum(s["calls"] for s in stages["partial_wave"]["l"].values()) == nsolves
+    assert stages["partial_wave"]["time"] <= report["wall_time"]
+
+    # the partial waves converge well before lmax, at the same l every time
+    counters = report["counters"]
+    assert counters["smatrix_calls"]["count"] == 3
+    assert counters["smatrix_early_termination"]["count"] == 3
+    (l,) = counters["smatrix_early_termination"]["l"].keys()
+    assert l < sys.lmax
+    assert nsolves == 3 * (2 * l + 1)
+    assert nl == l + 1
+
+    prof.save_json(tmp_path / "profile.json")
+    with open(tmp_path / "profile.json") as f:
+        assert json.load(f)["counters"]["smatrix_calls"]["count"] == 3
+    prof.save_trace(tmp_path / "trace.json")
+    with open(tmp_path / "trace.json") as f:
+        events = json.load(f)["traceEvents"]
+    complete = [e for e in events if e["ph"] == "X"]
+    assert len(complete) == sum(s["calls"] for s in stages.values())
+    assert all(e["dur"] >= 0 for e in complete)
+
+    # nothing is recorded while disabled
+    workspace.xs(KD_scalar, KD_spin_orbit, scalar, spin_orbit)
+    assert prof.report() == {**report, "wall_time": prof.wall_time}
+    assert profiling.stage("factorize") is profiling.NULL_STAGE
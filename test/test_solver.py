@@ -0,0 +1,238 @@
+import numpy as np
+
+from jitr import rmatrix
+from jitr.reactions import ProjectileTargetSystem
+from jitr.reactions import potentials
+from jitr.reactions.potentials import woods_saxon_potential, coulomb_charged_sphere
+from jitr.utils import kinematics
+
+
+def interaction(r, V0, W0, R0, a0, zz):
+    return -woods_saxon_potential(r, V0, W0, R0, a0) + coulomb_charged_sphere(r, zz, R0)
+
+
+sys = ProjectileTargetSystem(
+    channel_radius=5 * np.pi,
+    lmax=5,
+    mass_target=44657.26581995028,
+    mass_projectile=938.271653086152,
+    Ztarget=20,
+    Zproj=1,
+)
+channels, asymptotics = sys.get_partial_wave_channels(
+    *kinematics.classical_kinematics(sys.mass_target, sys.mass_projectile, 25.0, 20)
+)
+solver = rmatrix.Solver(40)
+params = [(55.0, 12.0, 4.2, 0.65, 20), (45.0, 8.0, 4.5, 0.7, 20)]
+
+
+def test_workspace_reuse():
+    ws = solver.workspace(1)
+    A_buffer = ws.A
+    for l in sys.l:
+        for p in params:
+            R, S, x, u = solver.solve(
+                channels[l], asymptotics[l], interaction, p, wavefunction=True
+            )
+            Rw, Sw, xw, uw = solver.solve(
+                channels[l],
+                asymptotics[l],
+                interaction,
+                p,
+                wavefunction=True,
+                workspace=ws,
+            )
+            # results are views into the preallocated buffers
+            assert Sw is ws.S and Rw is ws.R and xw is ws.coeffs
+            assert ws.A is A_buffer
+            np.testing.assert_allclose(Rw, R, rtol=1e-12)
+            np.testing.assert_allclose(Sw, S, rtol=1e-12)
+            np.testing.assert_allclose(xw, x, rtol=1e-12)
+            np.testing.assert_allclose(uw, u, rtol=1e-12)
+            assert np.absolute(S[0, 0]) <= 1
+
+
+def test_mixed_precision():
+    solver_mp = rmatrix.Solver(40, mixed_precision=True, refinement_tol=1e-12)
+    ws = solver_mp.workspace(1)
+    for l in sys.l:
+        R, S, x, u = solver.solve(
+            channels[l], asymptotics[l], interaction, params[0], wavefunction=True
+        )
+        Rm, Sm, xm, um = solver_mp.solve(
+            channels[l],
+            asymptotics[l],
+            interaction,
+            params[0],
+            wavefunction=True,
+            workspace=ws,
+        )
+        assert ws.refinement_residual <= 1e-12
+        assert ws.refinement_iterations > 0
+        assert not ws.refinement_fallback
+        np.testing.assert_allclose(Sm, S, rtol=1e-8)
+        np.testing.assert_allclose(Rm, R, rtol=1e-8)
+        np.testing.assert_allclose(xm, x, rtol=1e-8, atol=1e-10)
+
+    # the adjoint solve of the gradient keeps its own statistics
+    ch, asym = channels[3], asymptotics[3]
+    dV = solver_mp.interaction_gradient(
+        ch.k[0], ch.E[0], ch.a, ch.size, interaction_gradient, params[0]
+    )
+    solver_mp.solve(ch, asym, interaction_fixed_coulomb, params[0], workspace=ws)
+    forward = (ws.refinement_residual, ws.refinement_iterations)
+    solver_mp.solve(
+        ch,
+        asym,
+        interaction_fixed_coulomb,
+        params[0],
+        workspace=ws,
+        interaction_gradient=dV,
+    )
+    assert (ws.refinement_residual, ws.refinement_iterations) == forward
+    assert 0 < ws.adjoint_refinement_residual <= 1e-12
+    assert ws.adjoint_refinement_residual != forward[0]
+
+    # without refinement steps, we fall back to double precision
+    solver_fb = rmatrix.Solver(
+        40, mixed_precision=True, refinement_tol=1e-16, max_refinement_iterations=0
+    )
+    ws = solver_fb.workspace(1)
+    _, Sf, _ = solver_fb.solve(
+        channels[0], asymptotics[0], interaction, params[0], workspace=ws
+    )
+    _, S, _ = solver.solve(channels[0], asymptotics[0], interaction, params[0])
+    assert ws.refinement_fallback
+    np.testing.assert_allclose(Sf, S, rtol=1e-12)
+
+
+def interaction_fixed_coulomb(r, V0, W0, R0, a0, zz):
+    return -woods_saxon_potential(r, V0, W0, R0, a0) + coulomb_charged_sphere(
+        r, zz, 4.2
+    )
+
+
+def interaction_gradient(r, V0, W0, R0, a0, zz):
+    r"""derivatives of `interaction_fixed_coulomb` w.r.t. V0, W0, R0 and a0"""
+    ws = potentials.woods_saxon_safe(r, R0, a0)
+    dws = potentials.woods_saxon_gradient_safe(r, R0, a0)
+    return np.array([-ws, -1j * ws, -(V0 + 1j * W0) * dws[0], -(V0 + 1j * W0) * dws[1]])
+
+
+def test_gradient():
+    h = 1e-6
+    for l in [0, 3]:
+        ch, asym = channels[l], asymptotics[l]
+        dV = solver.interaction_gradient(
+            ch.k[0], ch.E[0], ch.a, ch.size, interaction_gradient, params[0]
+        )
+        R, S, u, dR, dS = solver.solve(
+            ch, asym, interaction_fixed_coulomb, params[0], interaction_gradient=dV
+        )
+        assert dR.shape == (4, 1, 1) and dS.shape == (4, 1, 1)
+        for p in range(4):
+            pp, pm = list(params[0]), list(params[0])
+            pp[p] += h
+            pm[p] -= h
+            Rp, Sp, _ = solver.solve(ch, asym, interaction_fixed_coulomb, tuple(pp))
+            Rm, Sm, _ = solver.solve(ch, asym, interaction_fixed_coulomb, tuple(pm))
+            np.testing.assert_allclose(dR[p], (Rp - Rm) / (2 * h), rtol=1e-5)
+            np.testing.assert_allclose(dS[p], (Sp - Sm) / (2 * h), rtol=1e-5)
+
+
+def test_propagation():
+    # the Coulomb interaction has a kink at R0, so compare to a large basis
+    reference = rmatrix.Solver(120)
+    propagation = rmatrix.PropagationSolver(20, 4)
+    for l in sys.l:
+        for p in params:
+            R, S, u = reference.solve(channels[l], asymptotics[l], interaction, p)
+            Rp, Sp, up = propagation.solve(channels[l], asymptotics[l], interaction, p)
+            np.testing.assert_allclose(Rp, R, rtol=1e-4)
+            np.testing.assert_allclose(Sp, S, atol=1e-5)
+            np.testing.assert_allclose(up, u, atol=1e-5)
+
+    # unequal sectors
+    edges = np.array([0, 0.3, 0.55, 0.8, 1.0]) * sys.channel_radius
+    _, S, _ = reference.solve(channels[2], asymptotics[2], interaction, params[0])
+    _, Sp, _ = propagation.solve(
+        channels[2], asymptotics[2], interaction, params[0], edges=edges
+    )
+    np.testing.assert_allclose(Sp, S, atol=1e-5)
+
+    # coupled channels
+    coupling = np.array([[0.0, 0.2], [0.2, 0.0]])
+
+    def coupled_interaction(r, V0, W0, R0, a0, zz):
+        diagonal = np.eye(2)[..., np.newaxis] * interaction(r, V0, W0, R0, a0, zz)
+        off_diagonal = coupling[..., np.newaxis] * potentials.woods_saxon_potential(
+            r, V0, 0, R0, a0
+        )
+        return diagonal - off_diagonal
+
+    sys_2 = ProjectileTargetSystem(
+        channel_radius=sys.channel_radius,
+        lmax=0,
+        mass_target=sys.mass_target,
+        mass_projectile=sys.mass_projectile,
+        Ztarget=20,
+        Zproj=1,
+        coupling=lambda l: np.eye(2),
+    )
+    channels_2, asymptotics_2 = sys_2.get_partial_wave_channels(
+        *kinematics.classical_kinematics(sys.mass_target, sys.mass_projectile, 25.0, 20)
+    )
+    _, S, _ = reference.solve(
+        channels_2[0], asymptotics_2[0], coupled_interaction, params[0]
+    )
+    _, Sp, _ = propagation.solve(
+        channels_2[0], asymptotics_2[0], coupled_interaction, params[0]
+    )
+    np.testing.assert_allclose(Sp, S, atol=1e-5)
+
+
+def phase_shift(E, l, Zz, args, channel_radius):
+    mass_target, mass_projectile = 15000.0, 938.0
+    _, kin = kinematics.classical_kinematics_cm(mass_target, mass_projectile, E, Zz)
+    sys = ProjectileTargetSystem(
+        kin.k * channel_radius, l, mass_target, mass_projectile, Zz, 1
+    )
+    ch, asym = sys.partial_wave_channels(l, *kin)
+    R, S, _ = solver.solve(ch, asym, interaction, args)
+    return R[0, 0], np.angle(S[0, 0]) / 2
+
+
+def test_poles():
+    mu = 15000.0 * 938.0 / (15000.0 + 938.0)
+    channel_radius = 15.0
+
+    # narrow neutron f-wave and proton f-wave resonances, with widths from
+    # the phase shift derivative at the resonance energy
+    for Zz, args, rtol in [
+        (0, (50.0, 0.0, 4.0, 0.65, 0), 1e-3),
+        (8, (45.0, 0.0, 4.0, 0.65, 8), 3e-2),
+    ]:
+        finder = rmatrix.PoleFinder(
+            solver, channel_radius, mu, 3, Zz, interaction, args
+        )
+
+        E = 2.0
+        R, _ = phase_shift(E, 3, Zz, args, channel_radius)
+        np.testing.assert_allclose(finder.rmatrix(E)[0][0, 0], R, rtol=1e-10)
+
+        poles = finder.find(0.01, 8.0)
+        assert len(poles) == 1
+        Er, width = poles[0].resonance_energy, poles[0].width
+        h = 1e-3 * width
+        ddelta = (
+            np.unwrap(
+                [
+                    2 * phase_shift(Er - h, 3, Zz, args, channel_radius)[1],
+                    2 * phase_shift(Er + h, 3, Zz, args, channel_radius)[1],
+                ]
+            )
+            / 2
+        )
+        np.testing.assert_allclose(
+            2 / ((ddelta[1] - ddelta[0]) / (2 * h)), width, rtol=rtol
+        )
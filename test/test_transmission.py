@@ -0,0 +1,55 @@
+import numpy as np
+
+from jitr import rmatrix, xs, batch
+from jitr.reactions import ProjectileTargetSystem, spin_half_orbit_coupling
+from jitr.utils import kinematics
+
+neutron, Zr90 = (1, 0), (90, 40)
+spec = batch.JobSpec(
+    projectiles=[neutron],
+    targets=[Zr90],
+    energies=list(np.geomspace(0.5, 50, 12)),
+    omp={"model": "KD"},
+    nbasis=40,
+    lmax=30,
+)
+
+
+def test_transmission_tables(tmp_path):
+    (table,) = batch.transmission_tables(spec, tmp_path / "tlj.bin", nworkers=1)
+    assert table.T.shape == (12, 31, 2)
+    # fewer partial waves are needed at lower energies
+    assert np.all(np.diff(table.lmax) >= 0) and table.lmax[-1] < spec.lmax
+
+    # compare to single energy solves
+    sys = ProjectileTargetSystem(
+        channel_radius=spec.channel_radius,
+        lmax=spec.lmax,
+        mass_target=kinematics.mass(*Zr90),
+        mass_projectile=kinematics.mass(*neutron),
+        Ztarget=Zr90[1],
+        Zproj=neutron[1],
+        coupling=spin_half_orbit_coupling,
+    )
+    omp = spec.global_omp()
+    for e in [0, 6, 11]:
+        Elab = spec.energies[e]
+        kin = kinematics.classical_kinematics(
+            sys.mass_target, sys.mass_projectile, Elab
+        )
+        ws = xs.elastic.IntegralWorkspace(neutron, Zr90, sys, kin, rmatrix.Solver(40))
+        args = omp.params(neutron, 0, *Zr90, kin.mu, Elab, kin.k)
+        tplus, tminus = ws.transmission_coefficients(*omp.interactions(neutron), *args)
+        n = tplus.size
+        np.testing.assert_allclose(table.T[e, :n, 0], tplus, atol=1e-12)
+        np.testing.assert_allclose(table.T[e, 1:n, 1], tminus[1:], atol=1e-12)
+        assert np.all(table.T[e, table.lmax[e] + 1 :] == 0)
+
+    # the binary table holds the same values in single precision
+    f = xs.transmission.TransmissionTableFile(tmp_path / "tlj.bin")
+    assert f.keys() == [(neutron, Zr90)]
+    stored = f[neutron, Zr90]
+    np.testing.assert_array_equal(stored.Elab, spec.energies)
+    np.testing.assert_array_equal(stored.lmax, table.lmax)
+    nl = table.lmax.max() + 1
+    np.testing.assert_allclose(stored.T, table.T[:, :nl], atol=1e-7)
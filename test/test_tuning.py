@@ -0,0 +1,95 @@
+import numpy as np
+
+from jitr import rmatrix, xs, tuning, batch
+from jitr.reactions import (
+    ProjectileTargetSystem,
+    spin_half_orbit_coupling,
+    KDGlobal,
+    KD_scalar,
+    KD_spin_orbit,
+)
+from jitr.utils import kinematics
+
+Ca48, neutron = (48, 20), (1, 0)
+
+
+def integral_xs(nbasis, channel_radius_fm, Elab, lmax=25):
+    sys = ProjectileTargetSystem(
+        channel_radius=0,
+        lmax=lmax,
+        mass_target=kinematics.mass(*Ca48),
+        mass_projectile=kinematics.mass(*neutron),
+        Ztarget=Ca48[1],
+        Zproj=neutron[1],
+        coupling=spin_half_orbit_coupling,
+    )
+    kin = kinematics.classical_kinematics(sys.mass_target, sys.mass_projectile, Elab)
+    sys.channel_radius = channel_radius_fm * kin.k
+    ws = xs.elastic.IntegralWorkspace(
+        neutron, Ca48, sys, kin, rmatrix.Solver(nbasis), smatrix_abs_tol=1e-12
+    )
+    _, scalar, spin_orbit = KDGlobal(neutron).get_params(*Ca48, kin.mu, Elab, kin.k)
+    return np.array(ws.xs(KD_scalar, KD_spin_orbit, scalar, spin_orbit))
+
+
+def test_tune(tmp_path):
+    rec = tuning.tune(
+        neutron,
+        Ca48,
+        10.0,
+        20.0,
+        rtol=1e-3,
+        nbasis=np.arange(10, 60, 5),
+        radii=[6.0, 10.0, 14.0],
+        nenergies=2,
+        nbasis_ref=80,
+        radius_ref=16.0,
+    )
+    assert rec is not None
+    # the nuclear potential doesn't vanish by 6 fm
+    assert rec.channel_radius_fm > 6.0
+    assert rec.nbasis < 60
+    assert rec.smatrix_error <= 1e-4 and rec.observable_error <= 1e-3
+
+    # the recommendation holds inside the band, not just at the sampled
+    # energies, against an independent solve
+    reference = integral_xs(80, 16.0, 15.0)
+    np.testing.assert_allclose(
+        integral_xs(rec.nbasis, rec.channel_radius_fm, 15.0), reference, rtol=1e-3
+    )
+    # while the next smaller basis is not converged
+    assert not np.allclose(
+        integral_xs(rec.nbasis - 10, rec.channel_radius_fm, 15.0),
+        reference,
+        rtol=1e-4,
+        atol=0,
+    )
+
+    table = tuning.RecommendationTable()
+    band = table.band(15.0)
+    assert table.band_range(band) == (10.0, 20.0)
+    table.add(neutron, Ca48, band, rec)
+    table.save(tmp_path / "table.json")
+    table = tuning.RecommendationTable.load(tmp_path / "table.json")
+    assert table.lookup(neutron, Ca48, 12.0) == rec
+    assert table.lookup(neutron, Ca48, 25.0) is None
+    assert table.lookup(neutron, (40, 20), 12.0) is None
+    assert table.lookup(neutron, (40, 20), 12.0, nearest=True) == rec
+
+    # batch jobs pick up the recommendations
+    spec = batch.JobSpec(
+        projectiles=[neutron],
+        targets=[Ca48],
+        energies=[12.0, 25.0],
+        observables=["t"],
+        nbasis=40,
+        lmax=10,
+        tuning=str(tmp_path / "table.json"),
+    )
+    evaluator = batch.ChunkEvaluator(spec, tmp_path)
+    assert evaluator.workspace(0).solver.kernel.quadrature.nbasis == rec.nbasis
+    assert evaluator.workspace(1).solver.kernel.quadrature.nbasis == 40
+    # with at least the lmax the recommendation was validated at
+    assert rec.lmax > 10
+    assert evaluator.workspace(0).sys.lmax == rec.lmax
+    assert evaluator.workspace(1).sys.lmax == 10